@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.join(BENCHMARK_DIR, "..", "site")
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+sys.path.insert(0, os.path.abspath(SITE_DIR))
+
+from generate import generate_files
+from schedule.parser.read import XLSXReader, DOCXReader
+from schedule.parser.handle import Handler, FENFilter, to_dict
+from schedule.parser.pipeline import JSON_NESTING, JSON_LAST_DATA
+from schedule.parser.profiling import Profiler
+
+READERS = {
+    ".xlsx": XLSXReader,
+    ".docx": DOCXReader
+}
+
+SCALES = [100, 500, 1000]
+
+IMPORTED_MODULES = [
+    "schedule.parser",
+    "schedule.parser.read",
+    "schedule.parser.handle",
+    "schedule.parser.pipeline",
+    "schedule.parser.batch",
+    "pandas",
+    "openpyxl",
+    "lxml.etree"
+]
+
+
+def best_of(function, repeat):
+    """
+    Run a function several times.
+
+    Returns:
+        tuple: The smallest wall time in seconds and the result of the last run.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def bench_file(path, extension, rows, repeat, fen_spec=None):
+    """
+    Time the reader, every Handler stage, FENFilter and to_dict on one file.
+
+    Returns:
+        list: A list of dictionaries with the keys "name", "format", "rows" and "seconds".
+    """
+    results = []
+
+    def result(name, seconds):
+        results.append({"name": name, "format": extension, "rows": rows, "seconds": seconds})
+
+    seconds, data = best_of(lambda: READERS[extension](path).read(), repeat)
+    result("read", seconds)
+
+    stages = dict()
+    for _ in range(repeat):
+        profiler = Profiler(memory=False)
+        handler = Handler(data.copy(), profiler=profiler)
+        handler.handle()
+        for record in profiler.summary():
+            stages[record["stage"]] = min(stages.get(record["stage"], record["seconds"]), record["seconds"])
+    for name, seconds in stages.items():
+        result(name, seconds)
+
+    if fen_spec:
+        seconds, _ = best_of(lambda: FENFilter(handler.data, fen_spec).filter_spec(), repeat)
+        result("fen_filter", seconds)
+
+    records = handler.data.to_dict("records")
+    seconds, _ = best_of(lambda: to_dict(records, JSON_NESTING, JSON_LAST_DATA), repeat)
+    result("to_dict", seconds)
+
+    return results
+
+
+def import_time(module):
+    """
+    Measure the time of importing a module in a fresh interpreter.
+
+    Returns:
+        float: The import time in seconds.
+    """
+    code = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)".format(
+        module=module)
+    output = subprocess.run([sys.executable, "-c", code], cwd=os.path.abspath(SITE_DIR),
+                            capture_output=True, text=True, check=True).stdout
+    return float(output)
+
+
+def import_times(repeat):
+    """
+    Measure the import time of the parser modules and their heavy dependencies.
+
+    Returns:
+        list: A list of dictionaries with the keys "name", "format", "rows", "fen" and "seconds".
+    """
+    results = []
+    for module in IMPORTED_MODULES:
+        print("import {module} ...".format(module=module), file=sys.stderr)
+        seconds = min(import_time(module) for _ in range(repeat))
+        results.append({"name": "import " + module, "format": "-", "rows": 0, "fen": False, "seconds": seconds})
+    return results
+
+
+def run(scales, repeat, directory):
+    results = import_times(repeat)
+    for rows in scales:
+        for fen in (False, True):
+            paths = generate_files(directory, rows, groups=max(4, rows // 100), fen=fen, seed=rows)
+            for extension, path in paths.items():
+                print("{name} ...".format(name=os.path.basename(path)), file=sys.stderr)
+                for r in bench_file(path, extension, rows, repeat, fen_spec="екон" if fen else None):
+                    r["fen"] = fen
+                    results.append(r)
+    return results
+
+
+def commit_id():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def result_key(result):
+    return result["name"], result["format"], result["rows"], result["fen"]
+
+
+def compare(base, results):
+    """
+    Format the ratio of new to base timings.
+    """
+    base_seconds = {result_key(r): r["seconds"] for r in base["results"]}
+    lines = ["{:<36} {:<6} {:>6} {:<5} {:>10} {:>10} {:>7}".format("name", "format", "rows", "fen", "base", "new", "ratio")]
+    for r in results:
+        old = base_seconds.get(result_key(r))
+        ratio = "{:.2f}".format(r["seconds"] / old) if old else "-"
+        lines.append("{:<36} {:<6} {:>6} {:<5} {:>10} {:>10.4f} {:>7}".format(
+            r["name"], r["format"], r["rows"], str(r["fen"]), "{:.4f}".format(old) if old else "-", r["seconds"], ratio))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark schedule readers and handler stages on synthetic files.")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES, help="numbers of rows to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best one is kept")
+    parser.add_argument("--output", help="result file, benchmark/results/<commit>.json by default")
+    parser.add_argument("--compare", help="result file of another commit to compare with")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(args.scales, args.repeat, directory)
+
+    commit = commit_id()
+    output = args.output or os.path.join(RESULTS_DIR, commit + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf8") as output_file:
+        json.dump({"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+                   "results": results}, output_file, ensure_ascii=False, indent=4)
+    print("saved to {output}".format(output=output), file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf8") as base_file:
+            print(compare(json.load(base_file), results))
+    else:
+        for r in results:
+            print("{:<36} {:<6} {:>6} {:<5} {:>10.4f}".format(r["name"], r["format"], r["rows"], str(r["fen"]), r["seconds"]))
+
+
+if __name__ == "__main__":
+    main()
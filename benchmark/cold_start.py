@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.abspath(os.path.join(BENCHMARK_DIR, "..", "site"))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+sys.path.insert(0, SITE_DIR)
+
+from bench import commit_id
+from generate import generate_files
+
+SCALES = [50, 200, 1000]
+
+# every run converts one file in a fresh interpreter, as a command line call or a serverless function does
+PATHS = {
+    "pandas": "from schedule.parser.pipeline import Pipeline as Converter",
+    "lite": "from schedule.parser.lite import LitePipeline as Converter"
+}
+
+CODE = """
+import contextlib, io, json, resource, sys, time
+start = time.perf_counter()
+{import_converter}
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    schedule = Converter(sys.argv[1]).to_dict()
+done = time.perf_counter()
+print(json.dumps({{"import": imported - start, "convert": done - imported,
+                  "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "modules": sorted(m for m in ("pandas", "numpy", "openpyxl", "lxml") if m in sys.modules)}}))
+"""
+
+
+def cold_start(path_name, file_path):
+    """
+    Convert a file in a fresh interpreter.
+
+    Returns:
+        dict: The wall time of the whole process, the import and conversion times in seconds,
+        the peak resident memory in kilobytes and the heavy modules that were imported.
+    """
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", CODE.format(import_converter=PATHS[path_name]), file_path],
+                            cwd=SITE_DIR, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run(scales, repeat, directory):
+    results = []
+    for rows in scales:
+        paths = generate_files(directory, rows, groups=max(4, rows // 100), seed=rows)
+        for extension, file_path in paths.items():
+            for path_name in PATHS:
+                print("{path} {name} ...".format(path=path_name, name=os.path.basename(file_path)), file=sys.stderr)
+                runs = [cold_start(path_name, file_path) for _ in range(repeat)]
+                best = min(runs, key=lambda r: r["seconds"])
+                results.append({"path": path_name, "format": extension, "rows": rows, **best})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare cold-start latency and peak memory of the pandas and the lite conversion paths.")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES, help="numbers of rows to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the fastest one is kept")
+    parser.add_argument("--output", help="result file, benchmark/results/cold_start-<commit>.json by default")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(args.scales, args.repeat, directory)
+
+    commit = commit_id()
+    output = args.output or os.path.join(RESULTS_DIR, "cold_start-" + commit + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf8") as output_file:
+        json.dump({"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+                   "results": results}, output_file, ensure_ascii=False, indent=4)
+    print("saved to {output}".format(output=output), file=sys.stderr)
+
+    print("{:<7} {:<6} {:>6} {:>9} {:>9} {:>9} {:>11}  {}".format(
+        "path", "format", "rows", "total", "import", "convert", "max_rss_mb", "modules"))
+    for r in results:
+        print("{:<7} {:<6} {:>6} {:>9.3f} {:>9.3f} {:>9.3f} {:>11.1f}  {}".format(
+            r["path"], r["format"], r["rows"], r["seconds"], r["import"], r["convert"], r["max_rss_kb"] / 1024,
+            ",".join(r["modules"])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import argparse
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+import openpyxl
+from openpyxl.cell.rich_text import TextBlock, CellRichText
+from openpyxl.cell.text import InlineFont
+
+
+DAYS_OF_WEEK = ["Понеділок", "Вівторок", "Середа", "Четвер", "П'ятниця", "Субота"]
+
+TIMES = ["8:30-9:50", "10:00-11:20", "11:40-13:00", "13:30-14:50", "15:00-16:20", "16:30-17:50", "18:00-19:20"]
+
+HEADERS = ["День", "Час", "Дисципліна, викладач", "Група", "Тижні", "Аудиторія"]
+
+COURSE_WORDS = ["Мікроекономіка", "Макроекономіка", "Статистика", "Філософія", "Історія", "Правознавство",
+                "Вища математика", "Маркетинг", "Фінансовий облік", "Менеджмент", "Соціологія", "Англійська мова",
+                "Економетрика", "Політологія", "Теорія ймовірностей", "Бухгалтерський облік"]
+
+FEN_SPECS = ["екон", "фін", "мен", "мар", "рб"]
+
+TITLES = ["доц.", "проф.", "ст. викл.", "викл.", "ас."]
+
+SURNAMES = ["Іваненко", "Петренко", "Сидоренко", "Коваленко", "Бондаренко", "Ткаченко", "Шевченко", "Кравченко",
+            "Олійник", "Мельник", "Савченко", "Руденко", "Марченко", "Гончаренко", "Лисенко", "Мороз"]
+
+INITIALS = "АБВГДІКЛМОПСТ"
+
+WORD_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def week_ranges(rng):
+    """
+    Generate a weeks string such as "1-7, 9, 11-14".
+    """
+    first = rng.randint(1, 4)
+    last = rng.randint(first + 3, 15)
+    if rng.random() < 0.3:
+        middle = rng.randint(first + 1, last - 1)
+        return "{first}-{middle}, {after}-{last}".format(first=first, middle=middle - 1, after=middle + 1, last=last)
+    return "{first}-{last}".format(first=first, last=last)
+
+
+def generate_rows(rows: int = 100, groups: int = 4, fen: bool = False, seed: int = 0):
+    """
+    Generate schedule rows resembling NaUKMA schedules.
+
+    Rows are ordered by day and time. Every row holds the day and time, a course and a lecturer,
+    a group, weeks and an auditory. Consecutive rows share a day and a time, forming the merged blocks of real files.
+
+    Parameters:
+        rows (int): The number of rows.
+
+        groups (int): The number of practice groups.
+
+        fen (bool): Whether to add FEN-style bracketed specialization names to courses and groups.
+
+        seed (int): The seed of the random generator, the same seed gives the same rows.
+
+    Returns:
+        list: A list of dictionaries with the keys "day", "time", "course", "lecturer", "group", "weeks" and "auditory".
+    """
+    rng = random.Random(seed)
+
+    slots = [(day, time) for day in DAYS_OF_WEEK for time in TIMES]
+    rows_per_slot = max(1, -(-rows // len(slots)))
+
+    schedule = []
+    for day, time in slots:
+        for _ in range(rows_per_slot):
+            if len(schedule) == rows:
+                return schedule
+
+            course = rng.choice(COURSE_WORDS)
+            group = "лекція" if rng.random() < 0.25 else str(rng.randint(1, groups))
+            if fen:
+                specs = rng.sample(FEN_SPECS, rng.randint(1, 3))
+                course += " ({specs})".format(specs=", ".join(specs))
+                if group != "лекція":
+                    group = "{spec} {group}".format(spec=specs[0], group=group)
+
+            schedule.append({
+                "day": day,
+                "time": time,
+                "course": course + " ",
+                "lecturer": "{title} {surname} {a}.{b}.".format(title=rng.choice(TITLES), surname=rng.choice(SURNAMES),
+                                                                a=rng.choice(INITIALS), b=rng.choice(INITIALS)),
+                "group": group,
+                "weeks": week_ranges(rng),
+                "auditory": "{building}-{room}".format(building=rng.randint(1, 9), room=rng.randint(100, 330))
+            })
+    return schedule
+
+
+def blocks(rows, key):
+    """
+    Split row indices into runs of consecutive rows sharing the value of a key.
+    """
+    start = 0
+    for i in range(1, len(rows) + 1):
+        if i == len(rows) or rows[i][key] != rows[start][key] or (key == "time" and rows[i]["day"] != rows[start]["day"]):
+            yield start, i - 1
+            start = i
+
+
+def split_tables(rows, tables):
+    """
+    Split rows into consecutive chunks of about the same size.
+    """
+    size = -(-len(rows) // tables) if rows else 0
+    return [rows[i * size:(i + 1) * size] for i in range(tables)]
+
+
+def write_xlsx(path, rows: list, tables: int = 1):
+    """
+    Write schedule rows to an XLSX file laid out like NaUKMA schedules.
+
+    Days and times are merged cells spanning their rows, courses are rich text with a bold course and an italic lecturer.
+
+    Parameters:
+        path (str): The path of the XLSX file.
+
+        rows (list): The rows made by `generate_rows`.
+
+        tables (int): The number of sheets to split the rows into.
+
+    """
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for i, sheet_rows in enumerate(split_tables(rows, tables)):
+        write_sheet(wb.create_sheet("Програма {n}".format(n=i + 1)), sheet_rows)
+    wb.save(path)
+
+
+def write_sheet(ws, rows):
+    ws.append(["Національний університет «Києво-Могилянська академія»"])
+    ws.append(["Розклад занять"])
+    ws.append(HEADERS)
+
+    first_row = ws.max_row + 1
+    for row in rows:
+        course = CellRichText(TextBlock(InlineFont(b=True), row["course"]), TextBlock(InlineFont(i=True), row["lecturer"]))
+        ws.append([row["day"], row["time"], course, row["group"], row["weeks"], row["auditory"]])
+
+    for key, column in (("day", "A"), ("time", "B")):
+        for start, end in blocks(rows, key):
+            if end > start:
+                ws.merge_cells("{c}{start}:{c}{end}".format(c=column, start=first_row + start, end=first_row + end))
+
+
+def docx_run(text, bold=False, italic=False):
+    properties = '<w:rFonts w:ascii="Times New Roman" w:hAnsi="Times New Roman"/>'
+    if bold:
+        properties += "<w:b/>"
+    if italic:
+        properties += "<w:i/>"
+    properties += '<w:sz w:val="20"/>'
+    return '<w:r><w:rPr>{properties}</w:rPr><w:t xml:space="preserve">{text}</w:t></w:r>'.format(
+        properties=properties, text=escape(text))
+
+
+def docx_cell(*runs):
+    return "<w:tc><w:p>{runs}</w:p></w:tc>".format(runs="".join(runs))
+
+
+def write_docx(path, rows: list, tables: int = 1):
+    """
+    Write schedule rows to a DOCX file laid out like NaUKMA schedules.
+
+    Days and times are written only in the first row of their block, courses are runs with a bold course
+    and an italic lecturer.
+
+    Parameters:
+        path (str): The path of the DOCX file.
+
+        rows (list): The rows made by `generate_rows`.
+
+        tables (int): The number of tables to split the rows into.
+
+    """
+    body = "".join("<w:p>{title}</w:p>{table}".format(title=docx_run("Розклад занять"), table=docx_table(table_rows))
+                   for table_rows in split_tables(rows, tables))
+
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="{ns}"><w:body>{body}</w:body></w:document>').format(ns=WORD_NAMESPACE, body=body)
+    write_docx_parts(path, document)
+
+
+def docx_table(rows):
+    table_rows = ["<w:tr>{cells}</w:tr>".format(cells="".join(docx_cell(docx_run(h, bold=True)) for h in HEADERS))]
+
+    previous = None
+    for row in rows:
+        new_day = previous is None or previous["day"] != row["day"]
+        new_time = new_day or previous["time"] != row["time"]
+        table_rows.append("<w:tr>{cells}</w:tr>".format(cells="".join([
+            docx_cell(docx_run(row["day"]) if new_day else ""),
+            docx_cell(docx_run(row["time"]) if new_time else ""),
+            docx_cell(docx_run(row["course"], bold=True), docx_run(row["lecturer"], italic=True)),
+            docx_cell(docx_run(row["group"])),
+            docx_cell(docx_run(row["weeks"])),
+            docx_cell(docx_run(row["auditory"]))
+        ])))
+        previous = row
+
+    return "<w:tbl>{rows}</w:tbl>".format(rows="".join(table_rows))
+
+
+def write_docx_parts(path, document):
+    content_types = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                     '<Default Extension="xml" ContentType="application/xml"/>'
+                     '<Override PartName="/word/document.xml" '
+                     'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                     '</Types>')
+
+    relationships = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                     '<Relationship Id="rId1" '
+                     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+                     'Target="word/document.xml"/>'
+                     '</Relationships>')
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", content_types)
+        docx.writestr("_rels/.rels", relationships)
+        docx.writestr("word/document.xml", document)
+
+
+def generate_files(directory, rows: int = 100, groups: int = 4, fen: bool = False, seed: int = 0):
+    """
+    Generate an XLSX and a DOCX schedule with the same rows.
+
+    Parameters:
+        directory (str): The directory to save the files to.
+
+        rows (int): The number of rows.
+
+        groups (int): The number of practice groups.
+
+        fen (bool): Whether to add FEN-style bracketed specialization names.
+
+        seed (int): The seed of the random generator.
+
+    Returns:
+        dict: A dictionary mapping extensions to the paths of the generated files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    schedule = generate_rows(rows, groups=groups, fen=fen, seed=seed)
+    name = "{prefix}_{rows}_{seed}".format(prefix="fen" if fen else "schedule", rows=rows, seed=seed)
+
+    paths = {".xlsx": os.path.join(directory, name + ".xlsx"), ".docx": os.path.join(directory, name + ".docx")}
+    write_xlsx(paths[".xlsx"], schedule)
+    write_docx(paths[".docx"], schedule)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic NaUKMA schedule files.")
+    parser.add_argument("directory", help="directory to save the files to")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--fen", action="store_true", help="add FEN-style specialization names")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for path in generate_files(args.directory, args.rows, groups=args.groups, fen=args.fen, seed=args.seed).values():
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.abspath(os.path.join(BENCHMARK_DIR, "..", "site"))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+sys.path.insert(0, SITE_DIR)
+
+from bench import commit_id
+from generate import generate_rows, write_xlsx
+
+SHEETS = [1, 4, 8]
+
+WORKERS = [1, 2, 4]
+
+# every run reads one file in a fresh interpreter, so the CPU time of the worker processes is counted alone
+CODE = """
+import json, os, sys, time
+from schedule.parser.read import XLSXReader
+start = time.perf_counter()
+before = os.times()
+rows = len(XLSXReader(sys.argv[1], workers=int(sys.argv[2])).read())
+after = os.times()
+print(json.dumps({"read": time.perf_counter() - start, "rows_read": rows,
+                  "cpu": sum(after[i] - before[i] for i in range(4))}))
+"""
+
+
+def read_file(file_path, workers: int):
+    """
+    Read an XLSX file in a fresh interpreter.
+
+    Returns:
+        dict: The wall time of the read and the CPU time of the reading process and its workers in seconds.
+    """
+    output = subprocess.run([sys.executable, "-c", CODE, file_path, str(workers)], cwd=SITE_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(rows, sheets_list, workers_list, repeat, directory):
+    results = []
+    for sheets in sheets_list:
+        file_path = os.path.join(directory, "schedule_{rows}_{sheets}.xlsx".format(rows=rows, sheets=sheets))
+        write_xlsx(file_path, generate_rows(rows, groups=max(4, rows // 100), seed=rows), tables=sheets)
+        for workers in workers_list:
+            print("{sheets} sheets, {workers} workers ...".format(sheets=sheets, workers=workers), file=sys.stderr)
+            runs = [read_file(file_path, workers) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r["read"])
+            results.append({"rows": rows, "sheets": sheets, "workers": workers, **best})
+
+    serial = {r["sheets"]: r for r in results if r["workers"] == 1}
+    for r in results:
+        r["speedup"] = serial[r["sheets"]]["read"] / r["read"]
+        r["cpu_ratio"] = r["cpu"] / serial[r["sheets"]]["cpu"]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare serial and parallel reading of multi-sheet XLSX files.")
+    parser.add_argument("--rows", type=int, default=4000, help="number of rows to generate")
+    parser.add_argument("--sheets", type=int, nargs="+", default=SHEETS, help="numbers of sheets to split rows into")
+    parser.add_argument("--workers", type=int, nargs="+", default=WORKERS, help="numbers of worker processes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the fastest one is kept")
+    parser.add_argument("--output", help="result file, benchmark/results/parallel_read-<commit>.json by default")
+    args = parser.parse_args(argv)
+
+    workers = sorted(set([1] + args.workers))
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(args.rows, args.sheets, workers, args.repeat, directory)
+
+    commit = commit_id()
+    output = args.output or os.path.join(RESULTS_DIR, "parallel_read-" + commit + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf8") as output_file:
+        json.dump({"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+                   "cpus": os.cpu_count(), "results": results}, output_file, ensure_ascii=False, indent=4)
+    print("saved to {output}".format(output=output), file=sys.stderr)
+
+    print("cpus: {cpus}".format(cpus=os.cpu_count()))
+    print("{:>6} {:>7} {:>7} {:>9} {:>9} {:>8} {:>9}".format(
+        "rows", "sheets", "workers", "read", "cpu", "speedup", "cpu_ratio"))
+    for r in results:
+        print("{:>6} {:>7} {:>7} {:>9.3f} {:>9.3f} {:>8.2f} {:>9.2f}".format(
+            r["rows"], r["sheets"], r["workers"], r["read"], r["cpu"], r["speedup"], r["cpu_ratio"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -74,10 +75,11 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# SCHEDULE_DATABASE points the project at another SQLite file, such as the temporary database of a load test
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SCHEDULE_DATABASE', BASE_DIR / 'db.sqlite3'),
     }
 }
 
@@ -122,3 +124,14 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Schedule file uploads
+# Worker processes converting uploaded files and the largest number of unfinished conversions
+
+SCHEDULE_UPLOAD_WORKERS = 2
+
+SCHEDULE_UPLOAD_MAX_JOBS = 16
+
+# Identity dictionary of the course and lecturer names of all imported files
+
+SCHEDULE_IDENTITIES = BASE_DIR / "identities.json"
@@ -0,0 +1,127 @@
+import os
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from .models import Courses
+from .parser.pipeline import Pipeline
+from .parser.diff import diff, VALUE_COLUMNS
+from .parser.identity import IdentityDictionary
+from .search import course_search
+from .sources import bump_version, drop_version
+from .timetable import course_timetables
+
+COURSE_COLUMNS = {
+    "course_name": "course_name",
+    "lecturer_name": "lector_name",
+    "group_name": "group_number",
+    "day_of_week": "day_of_week",
+    "weeks": "weeks",
+    "lesson_number": "lesson_number",
+    "auditory_name": "auditory_name",
+    "course_identity": "course_identity",
+    "lecturer_identity": "lector_identity"
+}
+
+IDENTITY_COLUMNS = ["course_identity", "lecturer_identity"]
+
+
+def identities_path():
+    return getattr(settings, "SCHEDULE_IDENTITIES", os.path.join(settings.BASE_DIR, "identities.json"))
+
+
+def frame_to_courses(data, source_file=None):
+    """
+    Convert handled schedule data into unsaved Courses objects.
+
+    Parameters:
+        data (pd.DataFrame): The data handled by Handler or Pipeline.
+
+        source_file (str): The path of the file the data was read from.
+
+    Returns:
+        list: A list of Courses objects.
+    """
+    courses = []
+    for row in data.to_dict("records"):
+        fields = {field: row[column] for column, field in COURSE_COLUMNS.items() if column not in IDENTITY_COLUMNS}
+        fields["course_name"] = fields["course_name"].strip()
+        fields["weeks"] = [int(week) for week in fields["weeks"]]
+        for column in IDENTITY_COLUMNS:
+            identity = row.get(column)
+            fields[COURSE_COLUMNS[column]] = None if identity is None or pd.isna(identity) else int(identity)
+        courses.append(Courses(source_file=source_file, row_key=row.get("row_key"), **fields))
+    return courses
+
+
+def imported_frame(source_file):
+    """
+    Load the courses imported from a schedule file as handled data.
+
+    Parameters:
+        source_file (str): The path of the file the courses were imported from.
+
+    Returns:
+        pd.DataFrame: The courses with handled column names, indexed by course_id.
+    """
+    rows = Courses.objects.filter(source_file=source_file).values("course_id", *COURSE_COLUMNS.values())
+    data = pd.DataFrame.from_records(list(rows), columns=["course_id", *COURSE_COLUMNS.values()])
+    return data.set_index("course_id").rename(columns={field: column for column, field in COURSE_COLUMNS.items()})
+
+
+def import_file(path, fen_spec=None):
+    """
+    Update the courses imported from a schedule file to its current content.
+
+    Only the difference with the previous import is written: new rows are inserted,
+    changed rows are updated in place and rows gone from the file are deleted.
+    Course and lecturer names are resolved to identities shared by all imported files.
+
+    Parameters:
+        path (str): The path to the schedule file.
+
+        fen_spec (str): The FEN specialization to filter data for. FEN mode is off if None.
+
+    Returns:
+        ScheduleDiff: The inserted, updated and deleted rows.
+    """
+    data = Pipeline(path, fen_mode=fen_spec is not None, spec=fen_spec) \
+        .select([column for column in COURSE_COLUMNS if column not in IDENTITY_COLUMNS])
+    # the dictionary is locked only while the names are resolved, not while the file is parsed
+    with IdentityDictionary.editing(identities_path()) as identities:
+        data = identities.encode(data)
+    data["course_name"] = data["course_name"].str.strip()
+
+    with transaction.atomic():
+        # rows imported before identities existed are updated to get them
+        delta = diff(imported_frame(path), data, value_columns=VALUE_COLUMNS + IDENTITY_COLUMNS)
+
+        Courses.objects.bulk_create(frame_to_courses(delta.inserted, source_file=path))
+
+        updated = frame_to_courses(delta.updated, source_file=path)
+        for course, course_id in zip(updated, delta.updated["old_index"]):
+            course.course_id = course_id
+        Courses.objects.bulk_update(updated, [*COURSE_COLUMNS.values(), "row_key"])
+
+        Courses.objects.filter(course_id__in=list(delta.deleted.index)).delete()
+        bump_version(path)
+
+    course_search.update_file(path, data)
+    course_timetables.update_file(path, data)
+    return delta
+
+
+def delete_file(path):
+    """
+    Delete the courses imported from a schedule file.
+
+    Parameters:
+        path (str): The path to the schedule file.
+
+    """
+    with transaction.atomic():
+        Courses.objects.filter(source_file=path).delete()
+        drop_version(path)
+    course_search.remove_file(path)
+    course_timetables.remove_file(path)
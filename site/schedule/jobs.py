@@ -0,0 +1,144 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+
+def convert_upload(content, fen_spec=None):
+    """
+    Read, handle and export an uploaded schedule file. Runs in a worker process.
+
+    Parameters:
+        content (bytes): The content of the uploaded file.
+
+        fen_spec (str): The FEN specialization to filter data for. FEN mode is off if None.
+
+    Returns:
+        dict: The schedule in the JSON structure of `file_to_json`.
+    """
+    from .parser.pipeline import Pipeline
+
+    return Pipeline(content, fen_mode=fen_spec is not None, spec=fen_spec).to_dict()
+
+
+class QueueFull(Exception):
+    """
+    Raised when a job is submitted while the queue holds its maximum number of unfinished jobs.
+    """
+
+
+class Job():
+    """
+    A class holding the state of a conversion job.
+
+    Attributes:
+        id (str): The job identifier.
+
+        filename (str): The name of the uploaded file.
+
+        future (Future): The future of the conversion.
+
+    """
+
+    def __init__(self, filename, future) -> None:
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.future = future
+
+    @property
+    def status(self):
+        """
+        str: One of "queued", "running", "done" and "failed".
+        """
+        if self.future.running():
+            return "running"
+        if not self.future.done():
+            return "queued"
+        return "failed" if self.future.exception() else "done"
+
+    @property
+    def error(self):
+        """
+        str or None: The error of a failed job.
+        """
+        if not self.future.done() or not self.future.exception():
+            return None
+        exception = self.future.exception()
+        return "{name}: {e}".format(name=type(exception).__name__, e=exception)
+
+    def to_dict(self):
+        return {"job_id": self.id, "filename": self.filename, "status": self.status, "error": self.error}
+
+
+class JobQueue():
+    """
+    A class for running conversions in a bounded pool of worker processes.
+
+    Parameters:
+        workers (int): The number of worker processes.
+
+        max_jobs (int): The largest number of unfinished jobs. Submitting more raises QueueFull.
+
+        keep_finished (int): The number of finished jobs whose results are kept.
+
+    Methods:
+        submit(self, content, filename, fen_spec=None):
+            Start converting a file.
+
+        get(self, job_id):
+            Get a job by its identifier.
+
+    """
+
+    def __init__(self, workers: int = 2, max_jobs: int = 16, keep_finished: int = 100) -> None:
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.keep_finished = keep_finished
+
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, content, filename, fen_spec=None):
+        """
+        Start converting a file.
+
+        Parameters:
+            content (bytes): The content of the uploaded file.
+
+            filename (str): The name of the uploaded file.
+
+            fen_spec (str): The FEN specialization to filter data for. FEN mode is off if None.
+
+        Returns:
+            Job: The submitted job.
+
+        Raises:
+            QueueFull: If the queue holds `max_jobs` unfinished jobs.
+        """
+        with self._lock:
+            if sum(not job.future.done() for job in self._jobs.values()) >= self.max_jobs:
+                raise QueueFull("{max_jobs} jobs are already waiting".format(max_jobs=self.max_jobs))
+
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+            job = Job(filename, self._executor.submit(convert_upload, content, fen_spec))
+            self._jobs[job.id] = job
+            self._forget_finished()
+            return job
+
+    def get(self, job_id):
+        """
+        Get a job by its identifier.
+
+        Returns:
+            Job or None: The job, or None if it is unknown or was forgotten.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.future.done()]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
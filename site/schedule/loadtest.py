@@ -0,0 +1,291 @@
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections, transaction
+
+from .models import Courses
+
+# Courses seeded by the load test are marked with this source file, so they are told apart from imported ones
+SOURCE_FILE = "loadtest:synthetic"
+
+ENDPOINTS = {
+    "group": "/schedule/groups/{value}/",
+    "room": "/schedule/rooms/{value}/"
+}
+
+PERCENTILES = [50, 95, 99]
+
+SERVERS = {
+    "runserver": [sys.executable, "manage.py", "runserver", "--noreload", "127.0.0.1:{port}"],
+    "uvicorn": [sys.executable, "-m", "uvicorn", "config.asgi:application", "--port", "{port}", "--log-level",
+                "warning"]
+}
+
+
+def seed_courses(rows: int, groups: int, rooms: int, seed: int = 0):
+    """
+    Replace the synthetic Courses of a previous load test with new ones.
+
+    Parameters:
+        rows (int): The number of courses to create.
+
+        groups (int): The number of distinct groups.
+
+        rooms (int): The number of distinct rooms.
+
+        seed (int): The seed of the random generator, the same seed gives the same courses.
+
+    Returns:
+        dict: A dictionary mapping "group" and "room" to the group and room names, the targets of the requests.
+    """
+    rng = random.Random(seed)
+    group_names = ["{n}".format(n=n) for n in range(1, groups + 1)]
+    room_names = ["{building}-{n:03d}".format(building=rng.randint(1, 9), n=n) for n in range(1, rooms + 1)]
+
+    courses = []
+    for i in range(rows):
+        first = rng.randint(1, 10)
+        courses.append(Courses(
+            course_name="Курс {n}".format(n=rng.randint(1, max(1, rows // 5))),
+            lector_name="доц. Викладач {n}".format(n=rng.randint(1, max(1, rows // 10))),
+            group_number=rng.choice(group_names),
+            day_of_week=rng.randint(0, 5),
+            weeks=list(range(first, first + rng.randint(1, 6))),
+            lesson_number=rng.randint(1, 7),
+            auditory_name=rng.choice(room_names),
+            source_file=SOURCE_FILE
+        ))
+
+    with transaction.atomic():
+        clear_courses()
+        Courses.objects.bulk_create(courses, batch_size=1000)
+
+    return {"group": group_names, "room": room_names}
+
+
+def clear_courses():
+    """
+    Delete the Courses seeded by load tests.
+    """
+    Courses.objects.filter(source_file=SOURCE_FILE).delete()
+
+
+@contextmanager
+def temporary_database():
+    """
+    Point the default database at a new temporary SQLite file with the project migrations for the block,
+    so synthetic courses never reach the project database.
+
+    Yields:
+        str: The path of the database file, for the SCHEDULE_DATABASE variable of a server.
+    """
+    connection = connections["default"]
+    if connection.vendor != "sqlite":
+        raise RuntimeError("a temporary database is only made for SQLite projects")
+
+    directory = tempfile.mkdtemp(prefix="loadtest-")
+    path = os.path.join(directory, "db.sqlite3")
+    name = connection.settings_dict["NAME"]
+    connection.close()
+    connection.settings_dict["NAME"] = path
+    try:
+        call_command("migrate", verbosity=0, interactive=False)
+        yield path
+    finally:
+        connection.close()
+        connection.settings_dict["NAME"] = name
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve(server: str = "runserver", port: int = None, timeout: float = 30.0, database: str = None):
+    """
+    Run the project with the development or an ASGI server for the duration of the block.
+
+    Parameters:
+        server (str): One of SERVERS.
+
+        port (int): The port to listen on. A free one if None.
+
+        timeout (float): The time in seconds to wait for the server to accept connections.
+
+        database (str): The SQLite file the server uses instead of the project database. Optional.
+
+    Yields:
+        str: The base URL of the server.
+    """
+    port = free_port() if port is None else port
+    command = [part.format(port=port) for part in SERVERS[server]]
+    environment = dict(os.environ)
+    if database is not None:
+        environment["SCHEDULE_DATABASE"] = database
+    process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=environment, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("{server} exited: {error}".format(
+                    server=server, error=process.stderr.read().decode(errors="replace")[-2000:]))
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("{server} did not start in {timeout} seconds".format(
+                        server=server, timeout=timeout))
+                time.sleep(0.1)
+        yield "http://127.0.0.1:{port}".format(port=port)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def plan_requests(targets: dict, requests: int, seed: int = 0):
+    """
+    Draw the requests of a load test, spread evenly over the endpoints with random targets.
+
+    Returns:
+        list: A list of (endpoint, path) tuples.
+    """
+    rng = random.Random(seed)
+    endpoints = sorted(targets)
+    plan = []
+    for i in range(requests):
+        endpoint = endpoints[i % len(endpoints)]
+        value = urllib.parse.quote(rng.choice(targets[endpoint]), safe="")
+        plan.append((endpoint, ENDPOINTS[endpoint].format(value=value)))
+    rng.shuffle(plan)
+    return plan
+
+
+def run_load(base_url: str, plan: list, concurrency: int = 16, timeout: float = 30.0):
+    """
+    Send the planned requests from concurrent clients.
+
+    Parameters:
+        base_url (str): The base URL of the server, such as "http://127.0.0.1:8000".
+
+        plan (list): The (endpoint, path) tuples made by `plan_requests`.
+
+        concurrency (int): The number of clients sending requests at the same time.
+
+        timeout (float): The time in seconds a request may take.
+
+    Returns:
+        tuple: A list of (endpoint, seconds, ok) samples and the wall time of the whole run in seconds.
+    """
+    samples = []
+    lock = threading.Lock()
+
+    def send(request):
+        endpoint, path = request
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(base_url + path, timeout=timeout) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        seconds = time.perf_counter() - start
+        with lock:
+            samples.append((endpoint, seconds, ok))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, plan))
+    return samples, time.perf_counter() - start
+
+
+def percentile(sorted_values: list, p: float):
+    """
+    Get the nearest-rank percentile of sorted values.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples: list, elapsed: float):
+    """
+    Compute the throughput and the latency percentiles of every endpoint.
+
+    Returns:
+        list: A list of dictionaries with the keys "endpoint", "requests", "errors", "throughput",
+        "mean_ms" and "p50_ms", "p95_ms", "p99_ms".
+    """
+    by_endpoint = dict()
+    for endpoint, seconds, ok in samples:
+        by_endpoint.setdefault(endpoint, []).append((seconds, ok))
+
+    results = []
+    for endpoint, values in sorted(by_endpoint.items()):
+        latencies = sorted(seconds * 1000 for seconds, _ in values)
+        result = {
+            "endpoint": endpoint,
+            "requests": len(values),
+            "errors": sum(not ok for _, ok in values),
+            "throughput": len(values) / elapsed if elapsed else None,
+            "mean_ms": sum(latencies) / len(latencies)
+        }
+        for p in PERCENTILES:
+            result["p{p}_ms".format(p=p)] = percentile(latencies, p)
+        results.append(result)
+    return results
+
+
+def commit_id():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def format_results(results: list, base: dict = None):
+    """
+    Format the results as a table, with the ratio of every p95 latency to the one of a base run if given.
+    """
+    base_p95 = {r["endpoint"]: r["p95_ms"] for r in base["results"]} if base else dict()
+    lines = ["{:<8} {:>8} {:>7} {:>10} {:>9} {:>9} {:>9} {:>9} {:>10}".format(
+        "endpoint", "requests", "errors", "req/s", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "p95 ratio")]
+    for r in results:
+        old = base_p95.get(r["endpoint"])
+        lines.append("{:<8} {:>8} {:>7} {:>10.1f} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f} {:>10}".format(
+            r["endpoint"], r["requests"], r["errors"], r["throughput"], r["mean_ms"], r["p50_ms"], r["p95_ms"],
+            r["p99_ms"], "{:.2f}".format(r["p95_ms"] / old) if old else "-"))
+    return "\n".join(lines)
+
+
+def save_results(path, results: list, options: dict):
+    """
+    Save the results of a run with its commit and options, so runs of different versions can be compared.
+    """
+    with open(path, "w", encoding="utf8") as results_file:
+        json.dump({"commit": commit_id(), "options": options, "results": results}, results_file,
+                  ensure_ascii=False, indent=4)
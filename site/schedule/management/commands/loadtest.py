@@ -0,0 +1,71 @@
+import json
+import os
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from schedule.loadtest import SERVERS, seed_courses, clear_courses, temporary_database, serve, plan_requests, \
+    run_load, summarize, format_results, save_results, commit_id
+
+
+class Command(BaseCommand):
+    help = "Seed Courses with synthetic data and measure the throughput and latency of the timetable endpoints. " \
+           "The data is seeded into a temporary database unless --project-database is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="base URL of a running server using the project database, "
+                                          "one is started if not given; needs --project-database")
+        parser.add_argument("--server", choices=sorted(SERVERS), default="runserver",
+                            help="server to start if --url is not given")
+        parser.add_argument("--rows", type=int, default=5000, help="number of synthetic courses")
+        parser.add_argument("--groups", type=int, default=200, help="number of synthetic groups")
+        parser.add_argument("--rooms", type=int, default=80, help="number of synthetic rooms")
+        parser.add_argument("--requests", type=int, default=2000, help="number of requests over all endpoints")
+        parser.add_argument("--concurrency", type=int, default=16, help="number of concurrent clients")
+        parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic data and the requests")
+        parser.add_argument("--project-database", action="store_true",
+                            help="seed the project database instead of a temporary one, where the synthetic courses "
+                                 "are visible to every running server until the run ends")
+        parser.add_argument("--keep-data", action="store_true",
+                            help="keep the synthetic courses in the project database after the run")
+        parser.add_argument("--output", help="result file, loadtest/<commit>.json in the project by default")
+        parser.add_argument("--compare", help="result file of another run to compare with")
+
+    def handle(self, *args, **options):
+        if options["url"] and not options["project_database"]:
+            raise CommandError("a server given by --url reads the project database, "
+                               "pass --project-database to seed it")
+        if options["keep_data"] and not options["project_database"]:
+            raise CommandError("--keep-data needs --project-database, the temporary database is removed after the run")
+
+        with nullcontext() if options["project_database"] else temporary_database() as database:
+            targets = seed_courses(options["rows"], options["groups"], options["rooms"], seed=options["seed"])
+            plan = plan_requests(targets, options["requests"], seed=options["seed"])
+
+            try:
+                with nullcontext(options["url"]) if options["url"] else \
+                        serve(options["server"], database=database) as base_url:
+                    # warm the server up before the clock starts
+                    run_load(base_url, plan[:len(targets)], concurrency=1)
+                    samples, elapsed = run_load(base_url, plan, concurrency=options["concurrency"])
+            finally:
+                if options["project_database"] and not options["keep_data"]:
+                    clear_courses()
+
+        results = summarize(samples, elapsed)
+
+        output = options["output"] or os.path.join(getattr(settings, "SCHEDULE_LOADTEST_DIR",
+                                                           os.path.join(settings.BASE_DIR, "loadtest")),
+                                                   commit_id() + ".json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        save_results(output, results, {key: options[key] for key in
+                                       ("url", "server", "rows", "groups", "rooms", "requests", "concurrency", "seed")})
+
+        base = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf8") as base_file:
+                base = json.load(base_file)
+
+        self.stdout.write(format_results(results, base))
+        self.stdout.write("saved to {output}".format(output=output))
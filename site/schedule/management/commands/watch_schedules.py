@@ -0,0 +1,49 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from schedule.importer import import_file, delete_file
+from schedule.models import Courses
+from schedule.parser.watch import Watcher, JSONSink, report_errors
+
+
+class Command(BaseCommand):
+    help = "Import schedule files into Courses and/or JSON files whenever they change."
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="directory with .xlsx, .docx and .doc schedule files")
+        parser.add_argument("--json-dir", help="also save JSON files to this directory")
+        parser.add_argument("--no-db", action="store_true", help="do not import into Courses")
+        parser.add_argument("--fen-spec", help='FEN specialization, one of ["мен","фін", "екон", "мар", "рб"]')
+        parser.add_argument("--debounce", type=float, default=2.0, help="seconds a file must stay unchanged")
+        parser.add_argument("--poll", action="store_true", help="rescan the directory instead of using inotify")
+        parser.add_argument("--state", help="JSON file to keep the content hashes of imported files in between runs, "
+                                            "watch_state.json in the project directory by default")
+
+    def handle(self, *args, **options):
+        on_change = []
+        on_delete = []
+        known = []
+
+        if not options["no_db"]:
+            on_change.append(lambda path: import_file(path, fen_spec=options["fen_spec"]))
+            on_delete.append(delete_file)
+            # files deleted while the watcher was off are deleted from Courses on start
+            known = Courses.objects.exclude(source_file=None).values_list("source_file", flat=True).distinct()
+        if options["json_dir"]:
+            sink = JSONSink(options["directory"], options["json_dir"], fen_spec=options["fen_spec"])
+            on_change.append(sink.on_change)
+            on_delete.append(sink.on_delete)
+
+        watcher = Watcher(options["directory"],
+                          report_errors(lambda path: [function(path) for function in on_change]),
+                          on_delete=report_errors(lambda path: [function(path) for function in on_delete]),
+                          debounce=options["debounce"],
+                          polling=options["poll"],
+                          state_path=options["state"] or os.path.join(settings.BASE_DIR, "watch_state.json"),
+                          known=known)
+
+        self.stdout.write("watching {directory} ({backend})".format(directory=watcher.directory,
+                                                                     backend=type(watcher.backend).__name__))
+        watcher.run()
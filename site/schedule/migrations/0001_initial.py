@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:39
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Courses',
+            fields=[
+                ('course_id', models.AutoField(primary_key=True, serialize=False)),
+                ('course_name', models.CharField(max_length=255)),
+                ('lector_name', models.CharField(max_length=255, null=True)),
+                ('group_number', models.CharField(max_length=255)),
+                ('day_of_week', models.IntegerField(validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(6)])),
+                ('weeks', models.JSONField()),
+                ('lesson_number', models.IntegerField()),
+                ('auditory_name', models.CharField(max_length=255)),
+                ('source_file', models.CharField(db_index=True, max_length=1024, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courses',
+            name='row_key',
+            field=models.CharField(db_index=True, max_length=32, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0002_courses_row_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='courses',
+            name='auditory_name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='courses',
+            name='group_number',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0003_courses_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courses',
+            name='course_identity',
+            field=models.IntegerField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='courses',
+            name='lector_identity',
+            field=models.IntegerField(db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0004_courses_identity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceFiles',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_file', models.CharField(max_length=1024, unique=True)),
+                ('version', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
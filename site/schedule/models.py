@@ -6,8 +6,18 @@ class Courses(models.Model):
     course_id = models.AutoField(primary_key=True)
     course_name = models.CharField(max_length=255, null=False)
     lector_name = models.CharField(max_length=255, null=True)
-    group_number = models.CharField(max_length=255, null=False)
+    group_number = models.CharField(max_length=255, null=False, db_index=True)
     day_of_week = models.IntegerField(null=False, validators=[MinValueValidator(0), MaxValueValidator(6)])
-    weeks = models.ArrayField(models.IntegerField(), null=False)
+    weeks = models.JSONField(null=False)
     lesson_number = models.IntegerField(null=False)
-    auditory_name = models.CharField(max_length=255, null=False)
+    auditory_name = models.CharField(max_length=255, null=False, db_index=True)
+    source_file = models.CharField(max_length=1024, null=True, db_index=True)
+    row_key = models.CharField(max_length=32, null=True, db_index=True)
+    course_identity = models.IntegerField(null=True, db_index=True)
+    lector_identity = models.IntegerField(null=True, db_index=True)
+
+
+class SourceFiles(models.Model):
+    # bumped on every import of the file, so processes holding indexes of Courses see rows changed in place
+    source_file = models.CharField(max_length=1024, unique=True)
+    version = models.IntegerField(default=0)
@@ -0,0 +1,40 @@
+"""
+Parser of NaUKMA schedule files (.xlsx, .docx, .doc).
+
+Submodules and their heavy dependencies (pandas, openpyxl, lxml, win32com, Levenshtein)
+are imported on first use of the names below, so importing the package is cheap.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "AbsoluteReader": "read",
+    "XLSXReader": "read",
+    "DOCXReader": "read",
+    "DOCReader": "read",
+    "Handler": "handle",
+    "FENFilter": "handle",
+    "to_dict": "handle",
+    "Pipeline": "pipeline",
+    "LitePipeline": "lite",
+    "Profiler": "profiling",
+    "Vocabulary": "vocabulary",
+    "BellSchedule": "bells",
+    "SnapshotStore": "snapshot",
+    "UtilizationCube": "analytics",
+    "TimetableIndex": "timetable",
+    "RoomCatalog": "rooms",
+    "RoomSolver": "rooms",
+    "IdentityDictionary": "identity",
+    "file_to_json": "to_json"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError("module {module!r} has no attribute {name!r}".format(module=__name__, name=name))
+    value = getattr(importlib.import_module("." + _EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,295 @@
+import argparse
+import json
+
+from .bells import BELLS
+
+# numpy and pandas are imported where they are used to keep importing this module cheap
+
+# Monday to Saturday, Sunday lessons widen the cube when there are any
+DAYS = 6
+
+ENTITY_COLUMNS = ["auditory_name", "lecturer_name", "group_name"]
+
+CUBE_COLUMNS = ["day_of_week", "lesson_number", "weeks"]
+
+
+class UtilizationCube():
+    """
+    A class holding the occupancy of rooms, lecturers or groups as a dense array of entity × day × lesson × week.
+
+    `counts[e, d, l, w]` is the number of distinct courses entity `e` has on day `d` (0 is Monday) in lesson `l + 1`
+    of week `w + 1`, so 0 is an idle slot and more than 1 a double booking. A course split into one row per group
+    counts once. Every report is a reduction over the array, no row is looped over after it is built.
+
+    Parameters:
+        by (str): The entity column, one of ENTITY_COLUMNS.
+
+        entities (list): The entity names, in the order of the first axis.
+
+        counts (np.ndarray): The occupancy counts.
+
+    Methods:
+        from_frame(cls, data, by, days, lessons, weeks):
+            Build the cube from handled data.
+
+        occupied(self):
+            Get the occupied slots.
+
+        utilization(self):
+            Get the share of occupied slots of every entity.
+
+        weekly(self):
+            Get the share of occupied slots of every entity in every week.
+
+        heatmap(self, entity):
+            Get the share of weeks every slot of an entity is occupied in.
+
+        summary(self):
+            Get the utilization, double bookings and peak week of every entity.
+
+        top_overloaded(self, n):
+            Get the most utilized entities.
+
+        idle_slots(self, entity):
+            Get the day and lesson slots never occupied in any week.
+
+        report(self, top):
+            Get the summary, the most utilized entities and the idle slots as a dictionary.
+
+        to_csv(self, path, table):
+            Save the summary or the weekly utilization as CSV.
+
+        to_json(self, path, top):
+            Save the report as JSON.
+
+    """
+
+    def __init__(self, by: str, entities: list, counts) -> None:
+        self.by = by
+        self.entities = list(entities)
+        self.counts = counts
+        self._positions = {entity: i for i, entity in enumerate(self.entities)}
+
+    @classmethod
+    def from_frame(cls, data, by: str = "auditory_name", days: int = DAYS, lessons: int = None, weeks: int = None):
+        """
+        Build the cube from handled data.
+
+        Parameters:
+            data (pd.DataFrame): The handled data with the entity column and the columns of CUBE_COLUMNS.
+                Rows without an entity are left out.
+
+            by (str): The entity column, one of ENTITY_COLUMNS.
+
+            days (int): The number of days, widened if the data has later days.
+
+            lessons (int): The number of lessons a day. The number of NaUKMA bells if None, widened if needed.
+
+            weeks (int): The number of weeks. The last week of the data if None.
+
+        Returns:
+            UtilizationCube: The cube.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if by not in ENTITY_COLUMNS:
+            raise ValueError("by should be one of {columns}".format(columns=ENTITY_COLUMNS))
+
+        columns = [by] + CUBE_COLUMNS + (["course_name"] if "course_name" in data.columns else [])
+        data = data[columns]
+        data = data[data[by].notna() & (data[by].astype(str).str.strip() != "")]
+
+        lengths = data["weeks"].map(len).to_numpy(dtype=np.int64)
+        slots = pd.DataFrame({
+            "entity": np.repeat(data[by].astype(str).to_numpy(), lengths),
+            "day": np.repeat(data["day_of_week"].to_numpy(dtype=np.int64), lengths),
+            "lesson": np.repeat(data["lesson_number"].to_numpy(dtype=np.int64), lengths) - 1,
+            "week": np.fromiter((week for row in data["weeks"] for week in row), dtype=np.int64,
+                                count=int(lengths.sum())) - 1,
+            "course": np.repeat(data["course_name"].astype(str).to_numpy(), lengths)
+            if "course_name" in data.columns else np.arange(int(lengths.sum()))
+        })
+        valid = (slots["week"] >= 0) & (slots["lesson"] >= 0) & (slots["day"] >= 0)
+        if weeks is not None:
+            valid &= slots["week"] < weeks
+        slots = slots[valid].drop_duplicates()
+
+        codes, entities = pd.factorize(slots["entity"], sort=True)
+        shape = (
+            len(entities),
+            max(days, int(slots["day"].max()) + 1 if len(slots) else 0),
+            max(len(BELLS) if lessons is None else lessons, int(slots["lesson"].max()) + 1 if len(slots) else 0),
+            max(1, int(slots["week"].max()) + 1 if len(slots) else 0) if weeks is None else weeks
+        )
+
+        flat = np.ravel_multi_index((codes, slots["day"].to_numpy(), slots["lesson"].to_numpy(),
+                                     slots["week"].to_numpy()), shape)
+        counts = np.bincount(flat, minlength=int(np.prod(shape))).astype(np.uint16).reshape(shape)
+        return cls(by, entities, counts)
+
+    def occupied(self):
+        """
+        Get the occupied slots.
+
+        Returns:
+            np.ndarray: A boolean array with the shape of `counts`.
+        """
+        return self.counts > 0
+
+    def utilization(self):
+        """
+        Get the share of occupied slots of every entity over all days, lessons and weeks.
+
+        Returns:
+            pd.Series: The shares from 0 to 1, indexed by entity.
+        """
+        import pandas as pd
+
+        return pd.Series(self.occupied().mean(axis=(1, 2, 3)), index=pd.Index(self.entities, name=self.by),
+                         name="utilization")
+
+    def weekly(self):
+        """
+        Get the share of occupied slots of every entity in every week.
+
+        Returns:
+            pd.DataFrame: The shares from 0 to 1, indexed by entity, with one column per week number.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.occupied().mean(axis=(1, 2)), index=pd.Index(self.entities, name=self.by),
+                            columns=range(1, self.counts.shape[3] + 1))
+
+    def heatmap(self, entity: str):
+        """
+        Get the share of weeks every slot of an entity is occupied in.
+
+        Returns:
+            np.ndarray: A day × lesson array of shares from 0 to 1.
+        """
+        return self.occupied()[self._positions[entity]].mean(axis=2)
+
+    def summary(self):
+        """
+        Get the utilization, double bookings and peak week of every entity.
+
+        Returns:
+            pd.DataFrame: Indexed by entity, with the columns "occupied_slots", "utilization", "double_booked",
+            "peak_week" and "peak_week_utilization".
+        """
+        import pandas as pd
+
+        occupied = self.occupied()
+        weekly = occupied.mean(axis=(1, 2))
+        return pd.DataFrame({
+            "occupied_slots": occupied.sum(axis=(1, 2, 3)),
+            "utilization": occupied.mean(axis=(1, 2, 3)),
+            "double_booked": (self.counts > 1).sum(axis=(1, 2, 3)),
+            "peak_week": weekly.argmax(axis=1) + 1,
+            "peak_week_utilization": weekly.max(axis=1)
+        }, index=pd.Index(self.entities, name=self.by))
+
+    def top_overloaded(self, n: int = 10):
+        """
+        Get the most utilized entities, double bookings breaking ties.
+
+        Returns:
+            pd.DataFrame: The first `n` rows of `summary`, most utilized first.
+        """
+        return self.summary().sort_values(["utilization", "double_booked"], ascending=False, kind="stable").head(n)
+
+    def idle_slots(self, entity: str = None):
+        """
+        Get the day and lesson slots never occupied in any week.
+
+        Parameters:
+            entity (str): The entity to report. All entities if None.
+
+        Returns:
+            pd.DataFrame: The columns "entity", "day_of_week" and "lesson_number", one row per idle slot.
+        """
+        import numpy as np
+        import pandas as pd
+
+        idle = ~self.occupied().any(axis=3)
+        if entity is not None:
+            position = self._positions[entity]
+            idle = idle[position:position + 1]
+            entities = np.array([entity], dtype=object)
+        else:
+            entities = np.array(self.entities, dtype=object)
+
+        e, d, lesson = np.nonzero(idle)
+        return pd.DataFrame({"entity": entities[e], "day_of_week": d, "lesson_number": lesson + 1})
+
+    def report(self, top: int = 10):
+        """
+        Get the summary, the most utilized entities and the idle slots as a dictionary of JSON types.
+        """
+        def records(frame):
+            return json.loads(frame.reset_index().to_json(orient="records", force_ascii=False))
+
+        idle = self.idle_slots()
+        return {
+            "by": self.by,
+            "shape": dict(zip(["entities", "days", "lessons", "weeks"], map(int, self.counts.shape))),
+            "summary": records(self.summary()),
+            "top_overloaded": records(self.top_overloaded(top)),
+            "idle_slots": {entity: [[int(d), int(l)] for d, l in zip(slots["day_of_week"], slots["lesson_number"])]
+                           for entity, slots in idle.groupby("entity", sort=False)}
+        }
+
+    def to_csv(self, path, table: str = "summary"):
+        """
+        Save the summary or the weekly utilization as CSV.
+
+        Parameters:
+            path (str): The CSV file.
+
+            table (str): "summary" for `summary`, "weekly" for `weekly`.
+
+        """
+        tables = {"summary": self.summary, "weekly": self.weekly}
+        if table not in tables:
+            raise ValueError("table should be one of {tables}".format(tables=list(tables)))
+        tables[table]().to_csv(path, encoding="utf8")
+
+    def to_json(self, path, top: int = 10):
+        """
+        Save the report as JSON.
+        """
+        with open(path, "w", encoding="utf8") as json_file:
+            json.dump(self.report(top), json_file, ensure_ascii=False, indent=4)
+
+
+def main(argv=None):
+    import pandas as pd
+    from .batch import schedule_files
+    from .pipeline import Pipeline
+
+    parser = argparse.ArgumentParser(description="Report room, lecturer or group utilization of schedule files.")
+    parser.add_argument("input_dir", help="directory with .xlsx, .docx and .doc schedule files")
+    parser.add_argument("--by", choices=ENTITY_COLUMNS, default="auditory_name", help="entity column")
+    parser.add_argument("--top", type=int, default=10, help="number of most utilized entities to print")
+    parser.add_argument("--csv", help="save the summary to this CSV file")
+    parser.add_argument("--weekly-csv", help="save the weekly utilization to this CSV file")
+    parser.add_argument("--json", help="save the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    columns = [args.by, "course_name"] + CUBE_COLUMNS
+    frames = [Pipeline(path).select(list(dict.fromkeys(columns))) for path in schedule_files(args.input_dir)]
+    data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+    cube = UtilizationCube.from_frame(data, by=args.by)
+
+    if args.csv:
+        cube.to_csv(args.csv)
+    if args.weekly_csv:
+        cube.to_csv(args.weekly_csv, table="weekly")
+    if args.json:
+        cube.to_json(args.json, top=args.top)
+    print(cube.top_overloaded(args.top).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import time
+
+from .profiling import Profiler
+from .errors import ErrorReport
+
+EXTENSIONS = {".xlsx", ".docx", ".doc"}
+
+
+def schedule_files(directory):
+    """
+    Find the schedule files in a directory.
+
+    Parameters:
+        directory (str): The directory to search recursively.
+
+    Returns:
+        list: Sorted paths of .xlsx, .docx and .doc files, without Office lock files.
+    """
+    files = []
+    for root, dirs, names in os.walk(directory):
+        for name in names:
+            if os.path.splitext(name)[1] in EXTENSIONS and not name.startswith("~"):
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+
+def convert_directory(input_dir, output_dir, fen_spec=None, profiler=None, tolerant: bool = False):
+    """
+    Convert every schedule file of a directory to JSON.
+
+    Parameters:
+        input_dir (str): The directory with schedule files.
+
+        output_dir (str): The directory to save JSON files to, keeping the relative paths of the inputs.
+
+        fen_spec (str): The FEN specialization to filter data for. FEN mode is off if None.
+
+        profiler (Profiler): The profiler recording the stages of every file. Nothing is recorded if None.
+
+        tolerant (bool): Whether to skip the rows that fail instead of the whole file.
+            The skipped rows of a file are saved next to its JSON file as "<name>.errors.json".
+
+    Returns:
+        list: A list of dictionaries with the keys "file", "rows", "bad_rows", "seconds" and "error", one per file.
+    """
+    from .pipeline import Pipeline
+
+    results = []
+    for path in schedule_files(input_dir):
+        relative_path = os.path.relpath(path, input_dir)
+        json_path = os.path.join(output_dir, os.path.splitext(relative_path)[0] + ".json")
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+
+        result = {"file": relative_path, "rows": None, "bad_rows": None, "seconds": None, "error": None}
+        start = time.perf_counter()
+        try:
+            errors = ErrorReport() if tolerant else None
+            pipeline = Pipeline(path, fen_mode=fen_spec is not None, spec=fen_spec, profiler=profiler, errors=errors)
+            pipeline.to_json(json_path)
+            result["rows"] = len(pipeline.stage("rows"))
+            if errors is not None:
+                result["bad_rows"] = len(errors)
+                if errors:
+                    errors.to_json(os.path.splitext(json_path)[0] + ".errors.json")
+        except Exception as e:
+            result["error"] = "{name}: {e}".format(name=type(e).__name__, e=e)
+        result["seconds"] = time.perf_counter() - start
+        results.append(result)
+    return results
+
+
+def format_table(rows, columns):
+    """
+    Format a list of dictionaries as a plain text table.
+
+    Parameters:
+        rows (list): The dictionaries to format.
+
+        columns (list): The keys to show, in order.
+
+    Returns:
+        str: The table.
+    """
+
+    def cell(value):
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return "{:.3f}".format(value)
+        return str(value)
+
+    table = [columns] + [[cell(row[column]) for column in columns] for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    return "\n".join("  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip() for line in table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a directory of schedule files to JSON.")
+    parser.add_argument("input_dir", help="directory with .xlsx, .docx and .doc schedule files")
+    parser.add_argument("output_dir", help="directory to save JSON files to")
+    parser.add_argument("--fen-spec", help='FEN specialization, one of ["мен","фін", "екон", "мар", "рб"]')
+    parser.add_argument("--profile", action="store_true", help="record time, rows and peak memory of every stage")
+    parser.add_argument("--profile-dir", help="dump cProfile statistics of every stage to this directory")
+    parser.add_argument("--records", help="save the stage records to this JSON lines file")
+    parser.add_argument("--tolerant", action="store_true",
+                        help="skip failing rows instead of failing files, saving them to <name>.errors.json")
+    args = parser.parse_args(argv)
+
+    profiler = None
+    if args.profile or args.profile_dir or args.records:
+        profiler = Profiler(profile_dir=args.profile_dir)
+
+    results = convert_directory(args.input_dir, args.output_dir, fen_spec=args.fen_spec, profiler=profiler,
+                                tolerant=args.tolerant)
+
+    print(format_table(results, ["file", "rows"] + (["bad_rows"] if args.tolerant else []) + ["seconds", "error"]))
+    print("{ok} of {total} files converted".format(ok=sum(not r["error"] for r in results), total=len(results)))
+
+    if profiler:
+        print()
+        print(format_table(profiler.summary(), ["stage", "calls", "seconds", "rows_in", "rows_out", "peak_memory"]))
+
+        if args.records:
+            with open(args.records, "w", encoding="utf8") as records_file:
+                for record in profiler.records:
+                    records_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return 0 if all(not r["error"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+import json
+import re
+
+# NaUKMA bell schedule, lesson i + 1 starts at BELLS[i][0] and ends at BELLS[i][1]
+BELLS = [
+    ("8:30", "9:50"),
+    ("10:00", "11:20"),
+    ("11:40", "13:00"),
+    ("13:30", "14:50"),
+    ("15:00", "16:20"),
+    ("16:30", "17:50"),
+    ("18:00", "19:20"),
+    ("19:30", "20:50")
+]
+
+LESSON_COLUMNS = ["lesson_number", "lesson_start", "lesson_end"]
+
+TIME = re.compile(r"([01]?[0-9]|2[0-3])[:.]([0-5][0-9])")
+
+TIME_RANGE = re.compile(r"^\s*{time}\s*[-–—]\s*{time}\s*$".format(time=TIME.pattern))
+
+
+def to_minutes(time: str):
+    """
+    Convert a time such as "8:30" or "8.30" to minutes since midnight.
+
+    Returns:
+        int or None: The minutes, or None if the text does not start with a time.
+    """
+    match = TIME.match(time.strip())
+    if not match:
+        return None
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def is_time_range(text: str):
+    """
+    Check if a text is a time range such as "8:30-9:50".
+    """
+    return TIME_RANGE.match(text) is not None
+
+
+class BellSchedule():
+    """
+    A class for mapping the time cells of schedules to lesson numbers.
+
+    The bells are parsed once into minutes since midnight. A time cell maps to the lesson starting at its start time,
+    or to the lesson running at its start time if no lesson starts then. Every distinct time string is parsed once.
+
+    Parameters:
+        bells (list): Pairs of lesson start and end times such as ("8:30", "9:50"), in lesson order. Default is BELLS.
+
+    Attributes:
+        bells (list): Pairs of lesson start and end minutes, in lesson order.
+
+    Methods:
+        from_file(cls, path):
+            Load a bell schedule from a JSON file.
+
+        lesson(self, time):
+            Get the lesson of a time cell.
+
+        lookup(self, times):
+            Get the lessons of a column of time cells.
+
+    """
+
+    def __init__(self, bells: list = None) -> None:
+        """
+        Initialize a BellSchedule instance.
+
+        Parameters:
+            bells (list): Pairs of lesson start and end times such as ("8:30", "9:50"), in lesson order.
+                Default is BELLS.
+
+        Raises:
+            ValueError: If a bell is not a valid time.
+        """
+        bells = BELLS if bells is None else bells
+
+        self.bells = []
+        for start, end in bells:
+            start_minutes, end_minutes = to_minutes(start), to_minutes(end)
+            if start_minutes is None or end_minutes is None or end_minutes <= start_minutes:
+                raise ValueError("invalid bell {start}-{end}".format(start=start, end=end))
+            self.bells.append((start_minutes, end_minutes))
+
+        self._by_start = {start: number for number, (start, end) in enumerate(self.bells, start=1)}
+        self._cache = dict()
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load a bell schedule from a JSON file holding a list of [start, end] pairs.
+        """
+        with open(path, encoding="utf8") as bells_file:
+            return cls(json.load(bells_file))
+
+    def lesson(self, time):
+        """
+        Get the lesson of a time cell.
+
+        Parameters:
+            time (str): The time cell, such as "8:30-9:50".
+
+        Returns:
+            tuple or None: The lesson number and the lesson start and end minutes, or None if the time is unknown.
+        """
+        if time in self._cache:
+            return self._cache[time]
+
+        lesson = None
+        start = to_minutes(time) if isinstance(time, str) else None
+        if start is not None:
+            number = self._by_start.get(start)
+            if number is None:
+                number = next((n for n, (s, e) in enumerate(self.bells, start=1) if s <= start < e), None)
+            if number is not None:
+                lesson = (number,) + self.bells[number - 1]
+
+        self._cache[time] = lesson
+        return lesson
+
+    def lookup(self, times):
+        """
+        Get the lessons of a column of time cells, parsing every distinct time once.
+
+        Parameters:
+            times (pd.Series): The time cells.
+
+        Returns:
+            pd.DataFrame: The "lesson_number", "lesson_start" and "lesson_end" columns with the index of `times`.
+            All three are -1 for unknown times.
+        """
+        import numpy as np
+        import pandas as pd
+
+        codes, uniques = pd.factorize(times)
+        # the last row is taken for missing values, whose code is -1
+        table = np.array([self.lesson(time) or (-1, -1, -1) for time in uniques] + [(-1, -1, -1)],
+                         dtype=np.int64).reshape(-1, len(LESSON_COLUMNS))
+        return pd.DataFrame(table[codes], index=times.index, columns=LESSON_COLUMNS)
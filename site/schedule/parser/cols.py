@@ -7,4 +7,20 @@ TIME = 1
 COURSE = 2
 GROUPS = 3
 WEEKS = 4
-LECT_HALL = 5
\ No newline at end of file
+LECT_HALL = 5
+
+# Column names of the data frames made by the readers, in the order above
+NAMES = [
+    "day_of_week_name",
+    "time",
+    "course_lecturer_rich_text",
+    "group_name",
+    "weeks",
+    "auditory_name"
+]
+
+# Column with the sheet or table each row was read from
+TABLE_NAME = "table_name"
+
+# Key of DataFrame.attrs set by the readers, whose column layouts already skipped the header rows
+HEADERS_SKIPPED = "headers_skipped"
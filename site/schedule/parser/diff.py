@@ -0,0 +1,137 @@
+import hashlib
+import json
+
+KEY_COLUMNS = ["course_name", "group_name", "day_of_week", "lesson_number"]
+
+VALUE_COLUMNS = ["lecturer_name", "weeks", "auditory_name"]
+
+
+def normalize(value):
+    """
+    Normalize a cell value so that equal schedule values hash equally.
+
+    Strings are stripped, week lists are sorted and numbers become int.
+    """
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple, set)):
+        return sorted(int(v) for v in value)
+    try:
+        missing = value is None or bool(value != value)
+    except TypeError:
+        # pd.NA of nullable integer columns has no truth value
+        missing = True
+    if missing:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def stable_hash(values):
+    """
+    Hash a list of values independently of the Python process.
+
+    Returns:
+        str: The first 16 hex digits of the SHA-1 of the normalized values.
+    """
+    encoded = json.dumps([normalize(v) for v in values], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf8")).hexdigest()[:16]
+
+
+def add_row_keys(data, key_columns: list = None, value_columns: list = None):
+    """
+    Add a stable row key and a content hash to every row.
+
+    The key hashes (course, group, day, lesson number). Rows sharing them, such as a course taught
+    in different rooms on alternate weeks, are told apart by their content hash order.
+
+    Parameters:
+        data (pd.DataFrame): The handled data.
+
+        key_columns (list): The columns identifying a row. Default is KEY_COLUMNS.
+
+        value_columns (list): The columns whose change makes a row updated. Default is VALUE_COLUMNS.
+
+    Returns:
+        pd.DataFrame: A copy of the data with the "row_key" and "row_hash" columns.
+    """
+    key_columns = KEY_COLUMNS if key_columns is None else key_columns
+    value_columns = VALUE_COLUMNS if value_columns is None else value_columns
+
+    data = data.copy()
+    data["row_key"] = [stable_hash(values) for values in zip(*(data[c] for c in key_columns))] if len(data) else []
+    data["row_hash"] = [stable_hash(values) for values in zip(*(data[c] for c in value_columns))] if len(data) else []
+
+    occurrence = data.sort_values(["row_key", "row_hash"], kind="stable").groupby("row_key").cumcount()
+    occurrence = occurrence.reindex(data.index)
+    data["row_key"] = [key if n == 0 else "{key}:{n}".format(key=key, n=n)
+                       for key, n in zip(data["row_key"], occurrence)]
+    return data
+
+
+class ScheduleDiff():
+    """
+    A class holding the difference between two versions of a schedule.
+
+    Attributes:
+        inserted (pd.DataFrame): The rows of the new version whose key is not in the old one.
+
+        updated (pd.DataFrame): The rows of the new version whose key is in the old one with other values.
+            The "old_index" column holds the index of the matching old row.
+
+        deleted (pd.DataFrame): The rows of the old version whose key is not in the new one.
+
+    """
+
+    def __init__(self, inserted, updated, deleted) -> None:
+        self.inserted = inserted
+        self.updated = updated
+        self.deleted = deleted
+
+    def __bool__(self):
+        return bool(len(self.inserted) or len(self.updated) or len(self.deleted))
+
+    def summary(self):
+        """
+        Count the changed rows.
+
+        Returns:
+            dict: The numbers of inserted, updated and deleted rows.
+        """
+        return {"inserted": len(self.inserted), "updated": len(self.updated), "deleted": len(self.deleted)}
+
+
+def diff(old, new, key_columns: list = None, value_columns: list = None):
+    """
+    Compare two versions of handled schedule data row by row.
+
+    Parameters:
+        old (pd.DataFrame): The previously imported data.
+
+        new (pd.DataFrame): The newly handled data.
+
+        key_columns (list): The columns identifying a row. Default is KEY_COLUMNS.
+
+        value_columns (list): The columns whose change makes a row updated. Default is VALUE_COLUMNS.
+
+    Returns:
+        ScheduleDiff: The inserted, updated and deleted rows, with "row_key" and "row_hash" columns.
+    """
+    old = add_row_keys(old, key_columns, value_columns)
+    new = add_row_keys(new, key_columns, value_columns)
+
+    old_index = dict(zip(old["row_key"], old.index))
+    old_hashes = dict(zip(old["row_key"], old["row_hash"]))
+    new_keys = set(new["row_key"])
+
+    is_inserted = ~new["row_key"].isin(old_index.keys())
+    is_updated = ~is_inserted & (new["row_hash"] != new["row_key"].map(old_hashes))
+
+    updated = new[is_updated].copy()
+    updated["old_index"] = updated["row_key"].map(old_index)
+
+    return ScheduleDiff(inserted=new[is_inserted],
+                        updated=updated,
+                        deleted=old[~old["row_key"].isin(new_keys)])
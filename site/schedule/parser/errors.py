@@ -0,0 +1,101 @@
+import json
+from collections import Counter
+
+
+def describe(exception):
+    """
+    Describe an exception as "Name: message".
+    """
+    return "{name}: {e}".format(name=type(exception).__name__, e=exception)
+
+
+class ErrorReport():
+    """
+    A class collecting the rows that failed to be read or handled, so that the other rows carry on.
+
+    Readers, Handler and Pipeline given an ErrorReport quarantine a failing row with its reason
+    instead of raising and losing the whole file.
+
+    Attributes:
+        errors (list): A list of dictionaries, one per failed row, with the keys
+            "stage", "row", "table_name", "value" and "reason".
+
+    Methods:
+        add(self, stage, reason, row=None, table_name=None, value=None):
+            Record a failed row.
+
+        add_rows(self, stage, data, column, reasons):
+            Record the failed rows of a data frame.
+
+        summary(self):
+            Count the failed rows by stage and reason.
+
+        to_json(self, json_path):
+            Save the errors as JSON.
+
+    """
+
+    def __init__(self) -> None:
+        self.errors = []
+
+    def __len__(self):
+        return len(self.errors)
+
+    def add(self, stage: str, reason: str, row=None, table_name=None, value=None):
+        """
+        Record a failed row.
+
+        Parameters:
+            stage (str): The stage the row failed in, such as "read" or "weeks".
+
+            reason (str): Why the row failed.
+
+            row: The row number or index label.
+
+            table_name (str): The sheet or table of the row.
+
+            value: The value that failed.
+
+        """
+        self.errors.append({
+            "stage": stage,
+            "row": row if row is None or isinstance(row, str) else int(row),
+            "table_name": table_name,
+            "value": value if value is None or isinstance(value, (str, int, float)) else str(value),
+            "reason": reason
+        })
+
+    def add_rows(self, stage: str, data, column: str, reasons):
+        """
+        Record the failed rows of a data frame.
+
+        Parameters:
+            stage (str): The stage the rows failed in.
+
+            data (pd.DataFrame): The failed rows, indexed by their position in the read data.
+
+            column (str): The column whose value failed.
+
+            reasons (iterable): The reason of every row.
+
+        """
+        table_names = data["table_name"] if "table_name" in data.columns else [None] * len(data)
+        for row, table_name, value, reason in zip(data.index, table_names, data[column], reasons):
+            self.add(stage, reason, row=row, table_name=table_name, value=value)
+
+    def summary(self):
+        """
+        Count the failed rows by stage and reason.
+
+        Returns:
+            list: A list of dictionaries with the keys "stage", "reason" and "rows", most frequent first.
+        """
+        counts = Counter((error["stage"], error["reason"]) for error in self.errors)
+        return [{"stage": stage, "reason": reason, "rows": rows} for (stage, reason), rows in counts.most_common()]
+
+    def to_json(self, json_path):
+        """
+        Save the errors as JSON.
+        """
+        with open(json_path, "w", encoding="utf8") as json_file:
+            json.dump(self.errors, json_file, ensure_ascii=False, indent=4)
@@ -0,0 +1,61 @@
+import re
+from functools import lru_cache
+
+LECTURE = "лекція"
+
+# Grammar of a group cell:
+#   cell  := "лекц..." | item (separator item)*
+#   item  := [spec] number ["-" number] ["(" note ")"]
+# Group words such as "гр." or "група" are dropped first, a spec applies to the numbers after it until another spec.
+LECTURE_PATTERN = re.compile(r"^\s*лекц", re.IGNORECASE)
+
+GROUP_WORD = re.compile(r"(?<![^\W\d_])гр(?:уп[аи])?\b\.?", re.IGNORECASE)
+
+SEPARATOR = re.compile(r"[,;]|\s+(?:та|і|и)\s+")
+
+ITEM = re.compile(r"^(?:(?P<spec>[^\W\d_]+)\.?\s*)?(?P<first>\d+)(?:\s*[-–]\s*(?P<last>\d+))?\s*(?:\((?P<note>[^)]*)\))?$")
+
+# the longest range "1-20" expanded into groups, longer ones are not group ranges
+MAX_RANGE = 20
+
+
+@lru_cache(maxsize=4096)
+def parse_groups(text: str):
+    """
+    Parse a group cell into group names.
+
+    "1,2 гр." gives ("1", "2"), "1гр. (с)" gives ("1",), "екон 1, 2" gives ("екон 1", "екон 2") and
+    "Лекція" gives ("лекція",). A cell that does not follow the grammar is kept as one group.
+
+    Parameters:
+        text (str): The group cell.
+
+    Returns:
+        tuple: The group names.
+    """
+    text = " ".join(text.split())
+    if LECTURE_PATTERN.match(text):
+        return (LECTURE,)
+
+    groups = []
+    spec = None
+    for item in SEPARATOR.split(GROUP_WORD.sub(" ", text)):
+        item = " ".join(item.split()).strip(" .")
+        if not item:
+            continue
+
+        match = ITEM.match(item)
+        if match is None:
+            return (text,)
+
+        if match.group("spec"):
+            spec = match.group("spec").lower()
+        first = int(match.group("first"))
+        last = int(match.group("last") or first)
+        if not first <= last <= first + MAX_RANGE:
+            return (text,)
+
+        groups.extend(str(number) if spec is None else "{spec} {number}".format(spec=spec, number=number)
+                      for number in range(first, last + 1))
+
+    return tuple(groups) if groups else (text,)
@@ -1,13 +1,49 @@
 import re
 from collections import defaultdict
+from contextlib import contextmanager
 import string
 import json
 
 import itertools
-import pandas as pd
-import Levenshtein
+import warnings
 
-import cols
+from . import cols
+from .bells import BellSchedule, LESSON_COLUMNS
+from .groups import parse_groups
+from .vocabulary import Vocabulary, memory_usage
+from .profiling import NULL_PROFILER
+from .errors import describe
+
+# pandas and Levenshtein are imported where they are used to keep importing this module cheap
+
+
+HEADERS = {
+    "День",
+    "Час",
+    "Дисципліна, викладач",
+    "Група",
+    "Тижні",
+    "Аудиторія"
+}
+
+
+def is_header_row(values):
+    """
+    Check if a row repeats the table header.
+
+    Parameters:
+        values (iterable): The values of the row.
+
+    Returns:
+        bool: True if any value is close to a header, with a Levenshtein ratio above 0.8.
+    """
+    import Levenshtein
+
+    for value in values:
+        value = str(value).lower()
+        if any(Levenshtein.ratio(value, header.lower()) > 0.8 for header in HEADERS):
+            return True
+    return False
 
 
 def group_by(data, column):
@@ -65,6 +101,18 @@ class Handler():
 
         spec (str): The specialization (required if in FEN mode). One of ["мен","фін", "екон", "мар", "рб"].
 
+        vocabulary (Vocabulary): The shared vocabulary to encode string columns with. Strings are kept as is if None.
+
+        profiler (Profiler): The profiler recording every step of `handle`. Nothing is recorded if None.
+
+        bells (BellSchedule): The bell schedule mapping times to lessons. Default is the NaUKMA bell schedule.
+
+        errors (ErrorReport): The report collecting failing rows. If given, failing rows are removed and recorded
+            instead of raising.
+
+        identities (IdentityDictionary): The dictionary adding course and lecturer identity columns.
+            No identity columns are added if None.
+
     Attributes:
         data (list): The data to be processed.
 
@@ -72,7 +120,24 @@ class Handler():
 
         spec (str): The specialization to filter data for (only relevant in FEN mode).  One of ["мен","фін", "екон", "мар", "рб"].
 
+        vocabulary (Vocabulary): The shared vocabulary to encode string columns with.
+
+        memory_report (dict): Memory usage of the encoded columns before and after encoding.
+
+        profiler (Profiler): The profiler recording every step of `handle`.
+
+        bells (BellSchedule): The bell schedule mapping times to lessons.
+
+        unknown_times (dict): A dictionary mapping the times missing from the bell schedule to their number of rows.
+
+        errors (ErrorReport): The report collecting failing rows, None if errors are raised.
+
+        identities (IdentityDictionary): The dictionary adding course and lecturer identity columns.
+
     Methods:
+        join_course_lecturer(self):
+            Join the rich text of the course column into plain text.
+
         remove_without_course(self):
             Remove rows with missing or empty course information.
 
@@ -85,22 +150,38 @@ class Handler():
         weeks_to_list(self, weeks: str):
             Convert a string of weeks to a list of integers.
 
+        remove_unknown_times(self):
+            Remove rows whose time is not in the bell schedule.
+
+        lesson_times(self):
+            Add the lesson number, start and end columns.
+
         groups_to_list(self, groups: str):
             Convert a string of groups to a list of group names.
 
         split_groups(self):
-            Split rows with multiple groups into separate rows.
+            Split rows with multiple groups into separate rows, keeping the cell in "group_text".
+
+        split_course_lecturer_column(self):
+            Split the course column into "course_name" and "lecturer_name", using font runs where they are unambiguous.
+
+        convert(self, data, column, function, stage):
+            Apply a conversion to every distinct value of a column, collecting the failing rows.
 
         handle_by_column(self, column, function):
             Apply a function to a specific column in the data.
 
+        to_categorical(self, vocabulary):
+            Convert string columns to categorical columns with a shared vocabulary.
+
         handle(self, fen_mode: bool = False, spec: str = None):
             Main data processing routine, including various data transformations.
             If in FEN mode, it filters the data based on the provided specialization.
 
     """
 
-    def __init__(self, data: pd.DataFrame, fen_mode: bool = False, spec=None) -> None:
+    def __init__(self, data: "pd.DataFrame", fen_mode: bool = False, spec=None, vocabulary: Vocabulary = None,
+                 profiler=None, bells: BellSchedule = None, errors=None, identities=None) -> None:
         """
         Initialize a Handler instance.
 
@@ -111,10 +192,45 @@ class Handler():
 
             spec (str): The specialization (required if in FEN mode).  One of ["мен","фін", "екон", "мар", "рб"].
 
+            vocabulary (Vocabulary): The shared vocabulary to encode string columns with. Strings are kept as is if None.
+
+            profiler (Profiler): The profiler recording every step of `handle`. Nothing is recorded if None.
+
+            bells (BellSchedule): The bell schedule mapping times to lessons. Default is the NaUKMA bell schedule.
+
+            errors (ErrorReport): The report collecting failing rows. If given, failing rows are removed and recorded
+                instead of raising.
+
+            identities (IdentityDictionary): The dictionary adding course and lecturer identity columns.
+                No identity columns are added if None.
+
         """
         self.data = data
         self.fen_mode = fen_mode
         self.spec = spec
+        self.vocabulary = vocabulary
+        self.memory_report = None
+        self.profiler = NULL_PROFILER if profiler is None else profiler
+        self.bells = BellSchedule() if bells is None else bells
+        self.unknown_times = dict()
+        self.errors = errors
+        self.identities = identities
+        # frames not made by the readers may still start with their header rows
+        self.headers_skipped = data is not None and bool(data.attrs.get(cols.HEADERS_SKIPPED))
+
+    def join_course_lecturer(self):
+        """
+        Join the rich text of the course column into plain text.
+
+        Readers keep the course column as a list of text runs in "course_lecturer_rich_text",
+        while the other steps work with the plain text in "course_lecturer".
+        """
+        if "course_lecturer_rich_text" not in self.data.columns:
+            return
+
+        self.data["course_lecturer"] = self.data["course_lecturer_rich_text"].map(
+            lambda runs: "".join(run if isinstance(run, str) else run.text for run in runs)
+            if isinstance(runs, list) else runs)
 
     def remove_without_course(self):
         """
@@ -131,7 +247,7 @@ class Handler():
         """
 
         self.data.fillna(replace_value, inplace=True)
-        self.data.map(lambda x: replace_value if (not x) or x.isspace() else x)
+        self.data = self.data.map(lambda x: replace_value if isinstance(x, str) and ((not x) or x.isspace()) else x)
 
     def day_of_week_to_index(self, day_of_week: str):
         """
@@ -143,6 +259,8 @@ class Handler():
         Returns:
             str: The normalized day of the week.
         """
+        import Levenshtein
+
         days_of_week = [
             "Понеділок",
             "Вівторок",
@@ -182,34 +300,102 @@ class Handler():
         return list(weeks_set)
 
     def time_to_lesson_number(self, time:str):
-        time_intervals = [
-            "8", "10", "11", "13", "15", "16", "18", "19"]
-        for i, t in enumerate(time_intervals):
-            if time.strip().startswith(t):
-                return i+1
+        lesson = self.bells.lesson(time)
+        if lesson is None:
+            raise Exception("time '{time}' not found in the bell schedule".format(time=time))
+        return lesson[0]
+
+    def groups_to_list(self, groups: str):
+        """
+        Convert a string of groups to a list of group names.
+
+        Parameters:
+            groups (str): The group cell, such as "1,2 гр.".
+
+        Returns:
+            list of str: The group names, such as ["1", "2"].
+        """
+        return list(parse_groups(groups))
+
+    def split_groups(self):
+        """
+        Split rows with multiple groups into separate rows.
+
+        Every distinct group cell is parsed once, rows are repeated once per group with the group name
+        in "group_name" and the original cell in "group_text". The index is renumbered.
+        """
+        groups, failed = self.convert(self.data, "group_name", self.groups_to_list, "split_groups")
+        self.data = self.data[~failed]
+        self.data["group_text"] = self.data["group_name"]
+        self.data["group_name"] = groups
+        self.data = self.data.explode("group_name", ignore_index=True)
+
+    def remove_unknown_times(self):
+        """
+        Remove rows whose time is not in the bell schedule.
+
+        The removed times are counted in `unknown_times` and reported in one warning, or in `errors` if given.
+        """
+        known = (self.bells.lookup(self.data["time"])["lesson_number"] > 0).to_numpy()
+        if known.all():
+            return
+
+        unknown = self.data.loc[~known, "time"].value_counts()
+        self.unknown_times = {str(time): int(count) for time, count in unknown.items()}
+        if self.errors is not None:
+            self.errors.add_rows("lesson_number", self.data[~known], "time",
+                                 ["time not in the bell schedule"] * int((~known).sum()))
         else:
-            raise Exception("time '{time}' not found in time_intervals".format(time=time))
+            warnings.warn("{rows} rows with times missing from the bell schedule were removed: {times}".format(
+                rows=int(unknown.sum()), times=", ".join(map(repr, self.unknown_times))))
+        self.data = self.data[known]
+
+    def lesson_times(self):
+        """
+        Add the "lesson_number", "lesson_start" and "lesson_end" columns, in minutes since midnight.
+
+        Rows with unknown times get -1, call `remove_unknown_times` first to drop them.
+        """
+        lessons = self.bells.lookup(self.data["time"])
+        for column in LESSON_COLUMNS:
+            self.data[column] = lessons[column]
 
     def remove_headers(self):
-        headers = {
-            "День",
-            "Час",
-            "Дисципліна, викладач",
-            "Група",
-            "Тижні",
-            "Аудиторія"
-        }
+        """
+        Remove rows repeating the table header, by fuzzy matching every cell.
 
+        The readers skip header rows by the column layout of each table, this is for data read otherwise.
+        """
         for index, row in self.data.iterrows():
-            for column_name in self.data.columns:
-                value_to_check = str(row[column_name])
-                if any(Levenshtein.ratio(value_to_check.lower(), header.lower()) > 0.8 for header in headers):
-                    # If the Levenshtein distance ratio is above a certain threshold (e.g., 0.8), remove the row
-                    self.data = self.data.drop(index)
-                    break
+            if is_header_row(row):
+                self.data = self.data.drop(index)
+
+    def remove_leading_headers(self):
+        """
+        Remove the first row of every table if it repeats the header, by fuzzy matching its cells.
 
+        This is the cheap check `handle` runs on data not made by the readers, such as frames built by hand.
+        """
+        tables = self.data.groupby(cols.TABLE_NAME, sort=False) if cols.TABLE_NAME in self.data.columns else None
+        first_rows = self.data.head(1) if tables is None else tables.head(1)
+        self.data = self.data.drop([index for index, row in first_rows.iterrows() if is_header_row(row)])
 
     def split_course_lecturer(self, input_string):
+        import pandas as pd
+
+        course, lecturer = self.split_course_lecturer_text(input_string)
+        return pd.Series({'course': course, 'lecturer': lecturer})
+
+    def split_course_lecturer_text(self, input_string):
+        """
+        Split a course cell into the course and the lecturer by lecturer titles.
+
+        Parameters:
+            input_string (str): The text of the course cell.
+
+        Returns:
+            tuple: The course name and the lecturer name, or None if there is no lecturer.
+        """
 
         # Define the delimiters as a regular expression pattern
         delimiters = r'викл\.|доц\.|ст\.|проф\.|ас\.'
@@ -218,7 +404,114 @@ class Handler():
 
         parts = re.split(delimiters, input_string, 1)
 
-        return pd.Series({'course': parts[0], 'lecturer': delims[0]+parts[1] if len(parts) > 1 else None})
+        return parts[0], delims[0]+parts[1] if len(parts) > 1 else None
+
+    def split_course_lecturer_runs(self, runs):
+        """
+        Split a course cell into the course and the lecturer by font style.
+
+        Schedules write the course in bold and the lecturer in italic. The runs are used only if they
+        hold bold text followed by italic text, otherwise the cell is ambiguous.
+
+        Parameters:
+            runs (list): The TextRun objects of the course cell.
+
+        Returns:
+            tuple or None: The course name and the lecturer name, or None if the runs are ambiguous.
+        """
+        course = []
+        lecturer = []
+        for run in runs:
+            if run.text.isspace():
+                (lecturer if lecturer else course).append(run.text)
+            elif run.italic and course:
+                lecturer.append(run.text)
+            elif run.bold and not run.italic and not lecturer:
+                course.append(run.text)
+            else:
+                return None
+
+        if not course or not lecturer:
+            return None
+        return "".join(course), "".join(lecturer)
+
+    def split_course_lecturer_column(self):
+        """
+        Split the course column into "course_name" and "lecturer_name".
+
+        Font runs of the readers are used where they are unambiguous, the text is split
+        by lecturer titles otherwise, once per distinct text. Failing rows are removed if `errors` is given.
+        """
+        if "course_lecturer_rich_text" in self.data.columns:
+            all_runs = self.data["course_lecturer_rich_text"]
+        else:
+            all_runs = [None] * len(self.data)
+
+        split_texts = dict()
+        courses = []
+        lecturers = []
+        failed = []
+        for runs, text in zip(all_runs, self.data["course_lecturer"]):
+            try:
+                split = None
+                if isinstance(runs, list) and runs and not isinstance(runs[0], str):
+                    split = self.split_course_lecturer_runs(runs)
+                if split is None:
+                    if text not in split_texts:
+                        split_texts[text] = self.split_course_lecturer_text(text)
+                    split = split_texts[text]
+            except Exception as e:
+                if self.errors is None:
+                    raise
+                failed.append(describe(e))
+                split = (None, None)
+            else:
+                failed.append(None)
+            courses.append(split[0])
+            lecturers.append(split[1])
+
+        self.data["course_name"] = courses
+        self.data["lecturer_name"] = lecturers
+
+        if any(failed):
+            is_failed = [reason is not None for reason in failed]
+            self.errors.add_rows("split_course_lecturer", self.data[is_failed], "course_lecturer",
+                                 [reason for reason in failed if reason is not None])
+            self.data = self.data[[not f for f in is_failed]]
+
+    def convert(self, data, column: str, function, stage: str):
+        """
+        Apply a conversion to every distinct value of a column, collecting the failing rows.
+
+        Parameters:
+            data (pd.DataFrame): The rows to convert.
+
+            column (str): The column to convert.
+
+            function (callable): The conversion of one value.
+
+            stage (str): The stage name recorded with failing rows.
+
+        Returns:
+            tuple: The converted values of the rows that did not fail, and a boolean mask of the failed rows.
+
+        Raises:
+            Exception: The error of the first failing value, if `errors` is None.
+        """
+        results = dict()
+        failures = dict()
+        for value in data[column].unique():
+            try:
+                results[value] = function(value)
+            except Exception as e:
+                if self.errors is None:
+                    raise
+                failures[value] = describe(e)
+
+        failed = data[column].isin(list(failures)).to_numpy()
+        if failures:
+            self.errors.add_rows(stage, data[failed], column, data.loc[failed, column].map(failures))
+        return data.loc[~failed, column].map(results), failed
 
     def handle(self, fen_mode: bool = False, spec: str = None):
         """
@@ -231,28 +524,81 @@ class Handler():
             spec (str): The specialization (required if in FEN mode).  One of ["мен","фін", "екон", "мар", "рб"].
 
         """
-        self.remove_without_course()
-        self.fill_empty(replace_value="")
+        with self._stage("join_course_lecturer"):
+            self.join_course_lecturer()
+        with self._stage("remove_without_course"):
+            self.remove_without_course()
+        with self._stage("fill_empty"):
+            self.fill_empty(replace_value="")
 
         # time_pattern = re.compile(r'^([01]?[0-9]|2[0-3])[:\.][0-5][0-9]-([01]?[0-9]|2[0-3])[:\.][0-5][0-9]$')
         # self.data = self.data[~self.data["time_column"].str.match(time_pattern)]
 
-        self.remove_headers()
+        # header rows are skipped by the readers, see ColumnLayout
+        if not self.headers_skipped:
+            with self._stage("remove_headers"):
+                self.remove_leading_headers()
 
-        self.data["day_of_week"] = self.data["day_of_week_name"].map(self.day_of_week_to_index)
-        self.data["weeks"] = self.data["weeks"].map(self.weeks_to_list)
+        with self._stage("day_of_week"):
+            days, failed = self.convert(self.data, "day_of_week_name", self.day_of_week_to_index, "day_of_week")
+            self.data = self.data[~failed]
+            self.data["day_of_week"] = days
+        with self._stage("weeks"):
+            weeks, failed = self.convert(self.data, "weeks", self.weeks_to_list, "weeks")
+            self.data = self.data[~failed]
+            self.data["weeks"] = weeks
 
-        self.data["lesson_number"] = self.data["time"].map(self.time_to_lesson_number)
+        with self._stage("lesson_number"):
+            self.remove_unknown_times()
+            self.lesson_times()
 
         # Split course_name and lector_name
-        self.data[['course_name', 'lecturer_name']] = self.data['course_lecturer'].apply(self.split_course_lecturer)
+        with self._stage("split_course_lecturer"):
+            self.split_course_lecturer_column()
 
         if self.fen_mode:
-            fen_filter = FENFilter(self.data, self.spec)
-            if self.spec not in fen_filter.FEN_SPEC_CUT:
-                raise Exception(
-                    'Parameter "spec" must be one of {fen_spec}'.format(fen_spec=list(fen_filter.FEN_SPEC_CUT)))
-            self.data = fen_filter.filter_spec()
+            with self._stage("fen_filter"):
+                fen_filter = FENFilter(self.data, self.spec)
+                if self.spec not in fen_filter.FEN_SPEC_CUT:
+                    raise Exception(
+                        'Parameter "spec" must be one of {fen_spec}'.format(fen_spec=list(fen_filter.FEN_SPEC_CUT)))
+                self.data = fen_filter.filter_spec()
+
+        with self._stage("split_groups"):
+            self.split_groups()
+
+        if self.identities is not None:
+            with self._stage("identities"):
+                self.data = self.identities.encode(self.data)
+
+        if self.vocabulary is not None:
+            with self._stage("to_categorical"):
+                self.to_categorical(self.vocabulary)
+
+    @contextmanager
+    def _stage(self, name: str):
+        with self.profiler.stage("handle." + name, rows_in=len(self.data)) as record:
+            yield
+            record["rows_out"] = len(self.data)
+
+    def to_categorical(self, vocabulary: Vocabulary):
+        """
+        Convert string columns to categorical columns with a shared vocabulary.
+
+        Parameters:
+            vocabulary (Vocabulary): The vocabulary to encode the columns with.
+
+        Returns:
+            dict: Memory usage in bytes of the encoded columns, under the keys "before" and "after".
+        """
+        columns = [column for column in vocabulary.columns if column in self.data.columns]
+
+        before = memory_usage(self.data, columns)
+        self.data = vocabulary.encode(self.data)
+        after = memory_usage(self.data, columns)
+
+        self.memory_report = {"before": before, "after": after}
+        return self.memory_report
 
 
 class FENFilter():
@@ -370,6 +716,8 @@ class FENFilter():
             str or None: The abbreviation of the specialization if found, or None if not found.
 
         """
+        import Levenshtein
+
         app_word = None
         app_word_l_dist = 0
 
@@ -380,59 +728,3 @@ class FENFilter():
                     app_word_l_dist = l_dist
                     app_word = spec
         return self.FEN_SPEC[app_word] if app_word else None
-
-
-if __name__ == "__main__":
-    from read import *
-
-    from pprint import pprint
-    import numpy as np
-    import pandas as pd
-
-    # handler = Handler(AbsoluteReader("../files\Економіка_БП-3_Осінь_2023–2024.doc").read(),
-    #                   fen_mode=True,
-    #                   spec="фін")
-
-    #handler = Handler(AbsoluteReader("../files\Філософія_БП-1_Осінь_2023–2024.docx").read())
-    handler = Handler(AbsoluteReader("files/Право_БП-1_Осінь_2023–2024.xlsx").read())
-
-    handler.handle()
-    print(handler.data.to_markdown())
-    # schedule = to_dict(handler.data, [cols.COURSE, cols.GROUPS, cols.DAYS_OF_WEEKS], {"час": cols.TIME,
-    #                                                                                   "аудиторія": cols.LECT_HALL,
-    #                                                                                   "тижні": cols.WEEKS})
-
-    # with open("data.json", 'w', encoding='utf8') as json_file:
-    #     json.dump(schedule, json_file, ensure_ascii=False, indent=4)
-
-    # schedule = remove_none((remove_without_course(read_docx("./files/doc/3.docx"))))
-    # my_array = np.array(schedule)
-
-    # handler = Handler(AbsoluteReader("./files\Економіка_БП-3_Осінь_2023–2024.doc").read(),
-    #                            fen_mode=True,
-    #                            spec="екон")
-    # handler.handle()
-    # schedule = handler.data
-    # my_array = np.array(list(map(lambda x: list(map(str, x)),schedule)))
-
-    # df = pd.DataFrame(my_array, columns = ['День','Час','Дисципліна, викладач', "Група", "Тижні", "Аудиторія"])
-
-    # print(df.to_markdown())
-    # print()
-    # print()
-
-    # !
-
-    # schedule = group_by(handle(read_docx("./files/doc/3.docx"), 
-    #                            fen_mode=True,
-    #                            spec="екон"),cols.COURSE)
-
-    # for key,item in schedule.items():
-    #     my_array = np.array(list(map(lambda x: list(map(str, x)),item)))
-
-    #     df = pd.DataFrame(my_array, columns = ['День','Час','Дисципліна, викладач', "Група", "Тижні", "Аудиторія"])
-
-    #     print(key)
-    #     print(df.to_markdown())
-    #     print()
-    #     print()
@@ -0,0 +1,299 @@
+import argparse
+import datetime
+import os
+import re
+
+from .diff import stable_hash
+
+ICS_COLUMNS = ["course_name", "lecturer_name", "group_name", "auditory_name", "day_of_week", "lesson_start",
+               "lesson_end", "weeks"]
+
+# the columns identifying an event: a lesson held for several groups is one event
+EVENT_COLUMNS = [column for column in ICS_COLUMNS if column != "group_name"]
+
+TIMEZONE = "Europe/Kyiv"
+
+# Kyiv time with the EU daylight saving rules, referenced by TZID in the events
+VTIMEZONE = [
+    "BEGIN:VTIMEZONE",
+    "TZID:" + TIMEZONE,
+    "BEGIN:STANDARD",
+    "DTSTART:19701025T040000",
+    "RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU",
+    "TZOFFSETFROM:+0300",
+    "TZOFFSETTO:+0200",
+    "TZNAME:EET",
+    "END:STANDARD",
+    "BEGIN:DAYLIGHT",
+    "DTSTART:19700329T030000",
+    "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU",
+    "TZOFFSETFROM:+0200",
+    "TZOFFSETTO:+0300",
+    "TZNAME:EEST",
+    "END:DAYLIGHT",
+    "END:VTIMEZONE"
+]
+
+
+def escape_text(value):
+    """
+    Escape a TEXT property value, see RFC 5545 section 3.3.11.
+    """
+    value = " ".join(str(value).split())
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+
+
+def fold(line):
+    """
+    Fold a content line into lines of at most 75 octets, see RFC 5545 section 3.1.
+    """
+    encoded = line.encode("utf8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # do not split a UTF-8 sequence
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf8"))
+        encoded = encoded[cut:]
+        limit = 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def week_rule(weeks):
+    """
+    Compress a list of week numbers into a weekly recurrence.
+
+    Parameters:
+        weeks (list): The week numbers.
+
+    Returns:
+        tuple: The first week, the number of weeks from the first to the last one and the skipped weeks between them.
+    """
+    weeks = sorted(set(int(week) for week in weeks))
+    present = set(weeks)
+    return weeks[0], weeks[-1] - weeks[0] + 1, [week for week in range(weeks[0], weeks[-1]) if week not in present]
+
+
+def format_datetime(value):
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+class CalendarWriter():
+    """
+    A class for writing handled schedule rows as iCalendar events.
+
+    Every row becomes one weekly recurring event from its first to its last week, with the skipped weeks
+    as exception dates, so the size of a calendar grows with the number of rows and not with rows times weeks.
+
+    Parameters:
+        semester_start (datetime.date): A day of the first week of the semester.
+
+        timestamp (datetime.datetime): The DTSTAMP of the events, in UTC. Default is the current time.
+
+    Methods:
+        lines(self, rows, name=None):
+            Generate the content lines of a calendar.
+
+        write(self, rows, path, name=None):
+            Save a calendar to an .ics file.
+
+    """
+
+    def __init__(self, semester_start: datetime.date, timestamp: datetime.datetime = None) -> None:
+        """
+        Initialize a CalendarWriter instance.
+
+        Parameters:
+            semester_start (datetime.date): A day of the first week of the semester.
+
+            timestamp (datetime.datetime): The DTSTAMP of the events, in UTC. Default is the current time.
+
+        """
+        self.first_monday = semester_start - datetime.timedelta(days=semester_start.weekday())
+        timestamp = datetime.datetime.now(datetime.timezone.utc) if timestamp is None else timestamp
+        self.timestamp = timestamp.strftime("%Y%m%dT%H%M%SZ")
+
+    def lesson_datetime(self, week, day_of_week, minutes):
+        day = self.first_monday + datetime.timedelta(weeks=week - 1, days=int(day_of_week))
+        return datetime.datetime.combine(day, datetime.time(*divmod(int(minutes), 60)))
+
+    def event(self, row):
+        """
+        Generate the content lines of the event of a row.
+
+        Parameters:
+            row (dict): A handled row with the ICS_COLUMNS keys.
+
+        Returns:
+            list: The content lines, empty if the row has no weeks.
+        """
+        if not len(row["weeks"]):
+            return []
+
+        first_week, count, skipped = week_rule(row["weeks"])
+        start = self.lesson_datetime(first_week, row["day_of_week"], row["lesson_start"])
+        end = self.lesson_datetime(first_week, row["day_of_week"], row["lesson_end"])
+
+        lines = [
+            "BEGIN:VEVENT",
+            "UID:{uid}@schedule".format(uid=stable_hash([row[column] for column in EVENT_COLUMNS])),
+            "DTSTAMP:" + self.timestamp,
+            "DTSTART;TZID={tz}:{start}".format(tz=TIMEZONE, start=format_datetime(start)),
+            "DTEND;TZID={tz}:{end}".format(tz=TIMEZONE, end=format_datetime(end)),
+            "SUMMARY:" + escape_text(row["course_name"])
+        ]
+        if count > 1:
+            lines.append("RRULE:FREQ=WEEKLY;COUNT={count}".format(count=count))
+        if skipped:
+            lines.append("EXDATE;TZID={tz}:{dates}".format(tz=TIMEZONE, dates=",".join(
+                format_datetime(self.lesson_datetime(week, row["day_of_week"], row["lesson_start"]))
+                for week in skipped)))
+        if row["auditory_name"]:
+            lines.append("LOCATION:" + escape_text(row["auditory_name"]))
+        description = [str(row[column]).strip() for column in ("lecturer_name", "group_name") if row[column]]
+        if description:
+            lines.append("DESCRIPTION:" + escape_text(", ".join(description)))
+        lines.append("END:VEVENT")
+        return lines
+
+    def lines(self, rows, name: str = None):
+        """
+        Generate the content lines of a calendar, folded and terminated by CRLF.
+
+        Parameters:
+            rows (iterable): Handled rows as dictionaries with the ICS_COLUMNS keys.
+
+            name (str): The calendar name shown by calendar apps. Optional.
+
+        Yields:
+            str: The content lines.
+        """
+        header = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//NaUKMA//schedule parser//UK", "CALSCALE:GREGORIAN"]
+        if name:
+            header.append("X-WR-CALNAME:" + escape_text(name))
+        for line in header + VTIMEZONE:
+            yield fold(line)
+
+        for row in rows:
+            for line in self.event(row):
+                yield fold(line)
+
+        yield fold("END:VCALENDAR")
+
+    def write(self, rows, path, name: str = None):
+        """
+        Save a calendar to an .ics file, writing it line by line.
+
+        Parameters:
+            rows (iterable): Handled rows as dictionaries with the ICS_COLUMNS keys.
+
+            path (str): The path to the output .ics file.
+
+            name (str): The calendar name shown by calendar apps. Optional.
+
+        """
+        with open(path, "w", encoding="utf8", newline="") as ics_file:
+            ics_file.writelines(self.lines(rows, name))
+
+
+def file_name(value):
+    """
+    Make a file name from a group or lecturer name.
+    """
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(value).strip()).strip("._") or "_"
+
+
+def merge_groups(rows):
+    """
+    Merge the rows of a lesson held for several groups, such as the rows a "1,2 гр." cell is split into,
+    into one row with the groups joined by ", ".
+
+    Parameters:
+        rows (list): Handled rows as dictionaries with the ICS_COLUMNS keys.
+
+    Returns:
+        list: The merged rows, in the order of their first rows.
+    """
+    merged = dict()
+    groups = dict()
+    for row in rows:
+        key = stable_hash([row[column] for column in EVENT_COLUMNS])
+        if key not in merged:
+            merged[key] = dict(row)
+            groups[key] = []
+        group = row["group_name"]
+        if group and str(group).strip() not in groups[key]:
+            groups[key].append(str(group).strip())
+
+    for key, row in merged.items():
+        row["group_name"] = ", ".join(groups[key])
+    return list(merged.values())
+
+
+def write_calendars(data, directory, semester_start: datetime.date, by: str = "group_name",
+                    timestamp: datetime.datetime = None):
+    """
+    Save one .ics file per value of a column, such as one per group or one per lecturer.
+
+    Parameters:
+        data (pd.DataFrame): The handled data with the ICS_COLUMNS columns.
+
+        directory (str): The directory to save the .ics files to.
+
+        semester_start (datetime.date): A day of the first week of the semester.
+
+        by (str): The column to split the calendars by. Default is "group_name".
+
+        timestamp (datetime.datetime): The DTSTAMP of the events, in UTC. Default is the current time.
+
+    Calendars split by another column than the groups have one event per lesson, with the groups of its rows
+    listed in the description. Values with the same file name, such as "1 гр." and "1/гр.", get numbered files: "1_гр.ics", "1_гр_2.ics".
+
+    Returns:
+        dict: A dictionary mapping the values of the column to the paths of their .ics files.
+    """
+    writer = CalendarWriter(semester_start, timestamp)
+    os.makedirs(directory, exist_ok=True)
+
+    paths = dict()
+    # names are compared case-insensitively, as file systems may do
+    used = set()
+    for value, rows in data[ICS_COLUMNS].groupby(data[by].astype(str), sort=True):
+        name = unique = file_name(value)
+        number = 1
+        while unique.casefold() in used:
+            number += 1
+            unique = "{name}_{number}".format(name=name, number=number)
+        used.add(unique.casefold())
+
+        path = os.path.join(directory, unique + ".ics")
+        rows = rows.to_dict("records")
+        writer.write(rows if by == "group_name" else merge_groups(rows), path, name=value)
+        paths[value] = path
+    return paths
+
+
+def main(argv=None):
+    from .pipeline import Pipeline
+
+    parser = argparse.ArgumentParser(description="Export a schedule file to iCalendar files.")
+    parser.add_argument("path", help=".xlsx, .docx or .doc schedule file")
+    parser.add_argument("output_dir", help="directory to save .ics files to")
+    parser.add_argument("--semester-start", required=True, type=datetime.date.fromisoformat,
+                        help="a day of the first week of the semester, YYYY-MM-DD")
+    parser.add_argument("--by", default="group_name", choices=["group_name", "lecturer_name", "auditory_name"])
+    parser.add_argument("--fen-spec", help='FEN specialization, one of ["мен","фін", "екон", "мар", "рб"]')
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline(args.path, fen_mode=args.fen_spec is not None, spec=args.fen_spec)
+    for path in pipeline.to_ics(args.output_dir, args.semester_start, by=args.by).values():
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
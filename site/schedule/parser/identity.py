@@ -0,0 +1,317 @@
+import argparse
+import os
+from contextlib import contextmanager
+
+from .search import normalize
+
+# Levenshtein and pandas are imported where they are used to keep importing this module cheap
+
+IDENTITY_VERSION = 1
+
+# identity columns added to handled data for the name columns
+IDENTITY_COLUMNS = {
+    "course_name": "course_identity",
+    "lecturer_name": "lecturer_identity"
+}
+
+# the smallest Levenshtein ratio of the fuzzy parts of two names of the same entity: a missing letter is one edit
+# and a wrong letter two, so "Макроекономіка" and "Мікроекономіка" stay apart
+THRESHOLDS = {
+    "course_name": 0.95,
+    "lecturer_name": 0.9
+}
+
+# academic titles, left out of lecturer keys so a promoted lecturer keeps their identity
+TITLES = {"викл", "доц", "ст", "проф", "ас"}
+
+# the length of the word prefixes names are blocked by
+BLOCK_PREFIX = 3
+
+
+def name_key(field: str, text):
+    """
+    Get the key of a name: normalized, without titles for lecturers.
+
+    "доц. Іваненко І. І." and "проф. Іваненко І.І." both become "іваненко і і".
+
+    Returns:
+        str: The key, empty for missing names.
+    """
+    if not isinstance(text, str):
+        return ""
+    words = normalize(text).split()
+    if field == "lecturer_name":
+        words = [word for word in words if word not in TITLES]
+    return " ".join(words)
+
+
+def key_parts(field: str, key: str):
+    """
+    Split a key into the words that must match exactly, such as initials, numbers and specializations
+    ("і", "2", "мен"), and the text of the longer words, which may differ by typos.
+
+    Returns:
+        tuple: The exact words, in order for lecturers, whose initials are ordered, and sorted for courses,
+        whose specializations are not, and the fuzzy text.
+    """
+    exact = []
+    fuzzy = []
+    for word in key.split():
+        if len(word) <= BLOCK_PREFIX or any(character.isdigit() for character in word):
+            exact.append(word)
+        else:
+            fuzzy.append(word)
+    return tuple(exact if field == "lecturer_name" else sorted(exact)), " ".join(fuzzy)
+
+
+def blocks_of(field: str, key: str):
+    """
+    Get the blocks of a key: the prefixes of its longer words, or the key itself if it has none.
+    Names are only compared with the names sharing a block with them.
+    """
+    exact, fuzzy = key_parts(field, key)
+    if not fuzzy:
+        return {"=" + key}
+    return {word[:BLOCK_PREFIX] for word in fuzzy.split()}
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive lock on "<path>.lock" while the block runs, where the platform supports it.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(os.fspath(path) + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class IdentityDictionary():
+    """
+    A class assigning stable integer identities to course and lecturer names across schedule files.
+
+    A name is resolved by its key, so spacing, case, punctuation and titles do not matter. A key seen for the first
+    time is compared with the known keys sharing a block with it (a prefix of one of its longer words), so resolving
+    does not compare a name with every known name. Two keys name the same entity when their initials, numbers and
+    other short words are equal and the rest of them is at least THRESHOLDS similar. Otherwise the key gets
+    the next identity. Identities are never reused or renumbered, so they stay valid in saved data.
+
+    Methods:
+        load(cls, path):
+            Load a dictionary from a JSON file.
+
+        editing(cls, path):
+            Lock, load and save a dictionary file around a block.
+
+        save(self, path):
+            Save the dictionary as JSON.
+
+        resolve(self, field, text):
+            Get the identity of a name.
+
+        name(self, field, identity):
+            Get the name first seen for an identity.
+
+        encode(self, data):
+            Add identity columns to handled data.
+
+    """
+
+    def __init__(self, thresholds: dict = None) -> None:
+        self.thresholds = dict(THRESHOLDS if thresholds is None else thresholds)
+        self.path = None
+
+        self._names = {field: dict() for field in IDENTITY_COLUMNS}
+        self._keys = {field: dict() for field in IDENTITY_COLUMNS}
+        self._parts = {field: dict() for field in IDENTITY_COLUMNS}
+        self._blocks = {field: dict() for field in IDENTITY_COLUMNS}
+        self._texts = {field: dict() for field in IDENTITY_COLUMNS}
+
+    def __len__(self):
+        return sum(len(names) for names in self._names.values())
+
+    def size(self, field: str):
+        """
+        Get the number of identities of a field.
+        """
+        return len(self._names[field])
+
+    def keys(self):
+        """
+        Get the number of known keys, which grows with every new spelling of a name.
+        """
+        return sum(len(keys) for keys in self._keys.values())
+
+    @classmethod
+    def load(cls, path, thresholds: dict = None):
+        """
+        Load a dictionary from a JSON file, or start an empty one if the file does not exist.
+        """
+        from .shard import load_json
+
+        identities = cls(thresholds)
+        identities.path = path
+        if not os.path.exists(path):
+            return identities
+
+        content = load_json(path)
+        if content.get("version") != IDENTITY_VERSION:
+            raise ValueError("unsupported identity dictionary version {version}".format(
+                version=content.get("version")))
+        for field, entries in content["fields"].items():
+            identities._names[field] = {int(identity): name for identity, name in entries["names"].items()}
+            for key, identity in entries["keys"].items():
+                identities._add_key(field, key, identity)
+        return identities
+
+    @classmethod
+    @contextmanager
+    def editing(cls, path, thresholds: dict = None):
+        """
+        Lock a dictionary file, load it, run the block and save the names it resolved.
+
+        Processes importing files at the same time take turns, so they never give one identity to different names.
+        """
+        with file_lock(path):
+            identities = cls.load(path, thresholds)
+            known = identities.keys()
+            yield identities
+            if identities.keys() != known:
+                identities.save(path)
+
+    def save(self, path=None):
+        """
+        Save the dictionary as JSON, atomically.
+        """
+        from .shard import save_json
+
+        path = self.path if path is None else path
+        save_json(path, {
+            "version": IDENTITY_VERSION,
+            "fields": {field: {"names": {str(identity): name for identity, name in self._names[field].items()},
+                               "keys": self._keys[field]} for field in IDENTITY_COLUMNS}
+        })
+
+    def _add_key(self, field, key, identity):
+        self._keys[field][key] = identity
+        self._parts[field][key] = key_parts(field, key)
+        for block in blocks_of(field, key):
+            self._blocks[field].setdefault(block, []).append(key)
+
+    def _match(self, field, key):
+        import Levenshtein
+
+        exact, fuzzy = key_parts(field, key)
+        best, best_ratio = None, None
+        seen = set()
+        for block in blocks_of(field, key):
+            for candidate in self._blocks[field].get(block, []):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                candidate_exact, candidate_fuzzy = self._parts[field][candidate]
+                if candidate_exact != exact:
+                    continue
+                ratio = Levenshtein.ratio(fuzzy, candidate_fuzzy)
+                if ratio >= self.thresholds[field] and (best is None or ratio > best_ratio):
+                    best, best_ratio = candidate, ratio
+        return best
+
+    def resolve(self, field: str, text):
+        """
+        Get the identity of a name, assigning the next identity to a new entity.
+
+        Parameters:
+            field (str): "course_name" or "lecturer_name".
+
+            text (str): The name as written in the schedule.
+
+        Returns:
+            int or None: The identity, None for missing names.
+        """
+        texts = self._texts[field]
+        if text in texts:
+            return texts[text]
+
+        key = name_key(field, text)
+        if not key:
+            identity = None
+        elif key in self._keys[field]:
+            identity = self._keys[field][key]
+        else:
+            match = self._match(field, key)
+            if match is not None:
+                identity = self._keys[field][match]
+            else:
+                # identities are numbered from 1 and never removed
+                identity = len(self._names[field]) + 1
+                self._names[field][identity] = " ".join(text.split())
+            self._add_key(field, key, identity)
+
+        texts[text] = identity
+        return identity
+
+    def name(self, field: str, identity: int):
+        """
+        Get the name first seen for an identity.
+        """
+        return self._names[field][identity]
+
+    def encode(self, data):
+        """
+        Add identity columns to handled data, resolving every distinct name once.
+
+        Parameters:
+            data (pd.DataFrame): The handled data with some of the columns of IDENTITY_COLUMNS.
+
+        Returns:
+            pd.DataFrame: A copy of the data with the identity columns of its name columns, as nullable integers.
+        """
+        import pandas as pd
+
+        data = data.copy()
+        for field, column in IDENTITY_COLUMNS.items():
+            if field not in data.columns:
+                continue
+            values = data[field].astype(object)
+            identities = {value: self.resolve(field, value) for value in pd.unique(values)}
+            data[column] = pd.array([identities[value] for value in values], dtype="Int64")
+        return data
+
+
+def main(argv=None):
+    from .batch import schedule_files, format_table
+    from .pipeline import Pipeline
+
+    parser = argparse.ArgumentParser(description="Assign stable identities to the course and lecturer names "
+                                                 "of schedule files.")
+    parser.add_argument("input_dir", help="directory with .xlsx, .docx and .doc schedule files")
+    parser.add_argument("dictionary", help="identity dictionary JSON file, created if missing")
+    args = parser.parse_args(argv)
+
+    names = {field: set() for field in IDENTITY_COLUMNS}
+    with IdentityDictionary.editing(args.dictionary) as identities:
+        for path in schedule_files(args.input_dir):
+            data = Pipeline(path, identities=identities).select(list(IDENTITY_COLUMNS) +
+                                                                list(IDENTITY_COLUMNS.values()))
+            for field in IDENTITY_COLUMNS:
+                names[field].update(data[field].dropna())
+
+    print(format_table([{"field": field, "names": len(names[field]), "identities": identities.size(field)}
+                        for field in IDENTITY_COLUMNS], ["field", "names", "identities"]))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
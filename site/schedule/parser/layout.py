@@ -0,0 +1,138 @@
+from . import cols
+from .handle import is_header_row
+
+# Levenshtein is imported where it is used to keep importing this module cheap
+
+# Header names of the columns, lower case, as printed in the first row of schedule tables
+HEADER_NAMES = {
+    cols.DAYS_OF_WEEKS: ["день"],
+    cols.TIME: ["час"],
+    cols.COURSE: ["дисципліна, викладач", "дисципліна"],
+    cols.GROUPS: ["група", "групи"],
+    cols.WEEKS: ["тижні"],
+    cols.LECT_HALL: ["аудиторія"]
+}
+
+# the number of columns a row must name to be taken as the header row, the course column among them
+MIN_HEADERS = 4
+
+# the number of rows at the top of a table searched for the header row
+HEADER_ROWS = 20
+
+
+def normalize(value):
+    """
+    Normalize a cell for comparing it with header names: text, lower case, single spaces.
+    """
+    return " ".join(str(value).split()).lower() if value is not None else ""
+
+
+def header_column(value):
+    """
+    Find the column a header cell names.
+
+    Parameters:
+        value: The cell value.
+
+    Returns:
+        int or None: The column of cols, such as cols.TIME, or None if the cell names none.
+    """
+    import Levenshtein
+
+    text = normalize(value)
+    if not text:
+        return None
+    ratio, column = max((Levenshtein.ratio(text, name), column)
+                        for column, names in HEADER_NAMES.items() for name in names)
+    return column if ratio > 0.8 else None
+
+
+class ColumnLayout():
+    """
+    A class holding the positions of the schedule columns in the rows of one table or sheet.
+
+    The layout is detected once from the header row, so reordered columns and extra columns are read right
+    and header rows repeated inside the table are recognized by comparing the cells at the header positions,
+    without fuzzy matching. Without a header row the positional layout of cols is assumed and repeated headers
+    are recognized by fuzzy matching every row.
+
+    Parameters:
+        positions (list): The position in the row of every column of cols.NAMES, None for missing columns.
+
+        width (int): The number of cells of the header row. Rows of another width are notes or titles.
+
+        header (tuple): The normalized header cells at `positions`, None if the layout was not detected.
+
+    Methods:
+        detect(cls, rows):
+            Find the header row among the first rows of a table and build the layout from it.
+
+        pick(self, cells, default=None):
+            Get the cells of the schedule columns of a row, in the order of cols.NAMES.
+
+        is_header(self, cells):
+            Check if a row repeats the header.
+
+    """
+
+    def __init__(self, positions: list = None, width: int = cols.COLS, header: tuple = None) -> None:
+        self.positions = list(range(cols.COLS)) if positions is None else positions
+        self.width = width
+        self.header = header
+
+    def __repr__(self):
+        return "ColumnLayout(positions={positions}, width={width})".format(positions=self.positions, width=self.width)
+
+    @classmethod
+    def detect(cls, rows):
+        """
+        Find the header row among the first rows of a table and build the layout from it.
+
+        Parameters:
+            rows (iterable): The cell values of the rows of the table, top to bottom. At most HEADER_ROWS are read.
+
+        Returns:
+            tuple: The index of the header row and its ColumnLayout, or (None, None) if no row looks like a header.
+        """
+        for index, cells in enumerate(rows):
+            if index == HEADER_ROWS:
+                break
+            cells = list(cells)
+            positions = [None] * cols.COLS
+            for position, value in enumerate(cells):
+                column = header_column(value)
+                if column is not None and positions[column] is None:
+                    positions[column] = position
+
+            if positions[cols.COURSE] is not None and sum(p is not None for p in positions) >= MIN_HEADERS:
+                header = tuple(normalize(cells[p]) if p is not None else "" for p in positions)
+                return index, cls(positions, len(cells), header)
+        return None, None
+
+    def pick(self, cells, default=None):
+        """
+        Get the cells of the schedule columns of a row, in the order of cols.NAMES.
+
+        Parameters:
+            cells (list): The cells of the row.
+
+            default: The value of missing columns.
+
+        Returns:
+            list: The cells.
+        """
+        return [cells[p] if p is not None and p < len(cells) else default for p in self.positions]
+
+    def is_header(self, cells):
+        """
+        Check if a row repeats the header.
+
+        Parameters:
+            cells (list): The cell values of the row.
+
+        Returns:
+            bool: True if the row holds the header names at the header positions.
+        """
+        if self.header is None:
+            return is_header_row(cells)
+        return tuple(normalize(value) for value in self.pick(cells)) == self.header
@@ -0,0 +1,249 @@
+import json
+import os
+import warnings
+
+from . import cols
+from .read import AbsoluteReader
+from .groups import parse_groups
+from .handle import Handler, FENFilter, to_dict
+from .pipeline import JSON_NESTING, JSON_LAST_DATA
+
+# A pandas-free path for converting one small file, such as in a serverless function:
+# readers yield rows that are turned into ScheduleRow records and handled by generators,
+# so pandas is never imported and no row is held longer than needed.
+# openpyxl imports numpy by itself where it is installed, reading .docx files needs neither.
+
+READ_FIELDS = cols.NAMES + [cols.TABLE_NAME]
+
+HANDLED_FIELDS = ["course_lecturer", "group_text", "day_of_week", "lesson_number", "lesson_start", "lesson_end",
+                  "course_name", "lecturer_name"]
+
+
+class ScheduleRow():
+    """
+    A compact record of one schedule row, with the columns of the pandas path as attributes.
+
+    Records can be indexed by column name like the rows of `to_dict("records")`, so `to_dict` and
+    `FENFilter.is_appropriate` work with them as they are.
+    """
+    __slots__ = tuple(READ_FIELDS + HANDLED_FIELDS)
+
+    def __init__(self, values) -> None:
+        for name, value in zip(READ_FIELDS, values):
+            setattr(self, name, value)
+        for name in HANDLED_FIELDS:
+            setattr(self, name, None)
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def __repr__(self):
+        return "ScheduleRow({fields})".format(
+            fields=", ".join("{name}={value!r}".format(name=name, value=getattr(self, name)) for name in self.__slots__))
+
+    def copy(self):
+        row = ScheduleRow.__new__(ScheduleRow)
+        for name in self.__slots__:
+            setattr(row, name, getattr(self, name))
+        return row
+
+
+def read_records(path):
+    """
+    Read the rows of a schedule file as ScheduleRow records.
+
+    Parameters:
+        path (str or bytes or file-like): The data file.
+
+    Yields:
+        ScheduleRow: The read rows.
+    """
+    for values in AbsoluteReader(path).iter_rows():
+        yield ScheduleRow(values)
+
+
+def clean(rows):
+    """
+    Join the course text, drop rows without a course and fill empty values, like `Pipeline` stage "clean".
+    """
+    for row in rows:
+        runs = row.course_lecturer_rich_text
+        text = "".join(run if isinstance(run, str) else run.text for run in runs) if isinstance(runs, list) else runs
+        if not isinstance(text, str) or len(text) <= 4 or text.isspace():
+            continue
+        row.course_lecturer = text
+
+        for name in READ_FIELDS:
+            value = getattr(row, name)
+            if value is None or isinstance(value, str) and (not value or value.isspace()):
+                setattr(row, name, "")
+        yield row
+
+
+def remove_unknown_times(rows, bells, unknown_times: dict):
+    """
+    Drop rows whose time is not in the bell schedule and set their lesson columns otherwise.
+
+    The removed times are counted in `unknown_times` and reported in one warning once the rows are exhausted.
+    """
+    for row in rows:
+        lesson = bells.lesson(row.time)
+        if lesson is None:
+            unknown_times[str(row.time)] = unknown_times.get(str(row.time), 0) + 1
+            continue
+        row.lesson_number, row.lesson_start, row.lesson_end = lesson
+        yield row
+
+    if unknown_times:
+        warnings.warn("{rows} rows with times missing from the bell schedule were removed: {times}".format(
+            rows=sum(unknown_times.values()), times=", ".join(map(repr, unknown_times))))
+
+
+def split_groups(rows):
+    """
+    Repeat every row once per group of its group cell.
+    """
+    for row in rows:
+        groups = parse_groups(row.group_name)
+        row.group_text = row.group_name
+        for group in groups[:-1]:
+            copy = row.copy()
+            copy.group_name = group
+            yield copy
+        row.group_name = groups[-1]
+        yield row
+
+
+def convert(rows, handler: Handler):
+    """
+    Compute the day, weeks and course and lecturer columns, once per distinct value.
+    """
+    days = dict()
+    weeks = dict()
+    split_texts = dict()
+    for row in rows:
+        if row.day_of_week_name not in days:
+            days[row.day_of_week_name] = handler.day_of_week_to_index(row.day_of_week_name)
+        row.day_of_week = days[row.day_of_week_name]
+
+        if row.weeks not in weeks:
+            weeks[row.weeks] = handler.weeks_to_list(row.weeks)
+        row.weeks = weeks[row.weeks]
+
+        runs = row.course_lecturer_rich_text
+        split = None
+        if isinstance(runs, list) and runs and not isinstance(runs[0], str):
+            split = handler.split_course_lecturer_runs(runs)
+        if split is None:
+            if row.course_lecturer not in split_texts:
+                split_texts[row.course_lecturer] = handler.split_course_lecturer_text(row.course_lecturer)
+            split = split_texts[row.course_lecturer]
+        row.course_name, row.lecturer_name = split
+        yield row
+
+
+class LitePipeline():
+    """
+    A class for handling a schedule file without pandas.
+
+    Rows stream from the reader through the steps of `Pipeline` as ScheduleRow records, which suits converting
+    one small file where importing pandas and numpy takes longer than the conversion itself.
+    `to_dict` gives the same result as `Pipeline.to_dict`. Failing rows raise, there is no error report.
+
+    Parameters:
+        path (str or bytes or file-like): The data file.
+
+        fen_mode (bool): Whether to operate in FEN mode.
+
+        spec (str): The specialization (required if in FEN mode). One of ["мен","фін", "екон", "мар", "рб"].
+
+        bells (BellSchedule): The bell schedule mapping times to lessons. Default is the NaUKMA bell schedule.
+
+    Attributes:
+        unknown_times (dict): The times missing from the bell schedule with their row counts, filled by `rows`.
+
+    Methods:
+        rows(self):
+            Read and handle the rows one by one.
+
+        to_dict(self, nesting, last_data):
+            Convert the handled rows into a nested dictionary.
+
+        to_json(self, json_path, nesting, last_data):
+            Save the handled rows as JSON.
+
+    """
+
+    def __init__(self, path, fen_mode: bool = False, spec: str = None, bells=None) -> None:
+        """
+        Initialize a LitePipeline instance.
+
+        Parameters:
+            path (str or bytes or file-like): The data file.
+
+            fen_mode (bool): Whether to operate in FEN mode.
+
+            spec (str): The specialization (required if in FEN mode). One of ["мен","фін", "екон", "мар", "рб"].
+
+            bells (BellSchedule): The bell schedule mapping times to lessons. Default is the NaUKMA bell schedule.
+
+        """
+        self.path = path
+        self.fen_mode = fen_mode
+        self.spec = spec
+        self.handler = Handler(None, fen_mode=fen_mode, spec=spec, bells=bells)
+        self.unknown_times = dict()
+
+    def rows(self):
+        """
+        Read and handle the rows of the file one by one.
+
+        Yields:
+            ScheduleRow: The handled rows, one per group, in the order of `Pipeline.select`.
+        """
+        rows = clean(read_records(self.path))
+        self.unknown_times = dict()
+        rows = remove_unknown_times(rows, self.handler.bells, self.unknown_times)
+
+        if self.fen_mode:
+            fen_filter = FENFilter(None, self.spec)
+            if self.spec not in fen_filter.FEN_SPEC_CUT:
+                raise Exception(
+                    'Parameter "spec" must be one of {fen_spec}'.format(fen_spec=list(fen_filter.FEN_SPEC_CUT)))
+            rows = filter(fen_filter.is_appropriate, rows)
+
+        return convert(split_groups(rows), self.handler)
+
+    def to_dict(self, nesting: list = None, last_data: dict = None):
+        """
+        Convert the handled rows into a nested dictionary.
+
+        Parameters:
+            nesting (list): A list of column names to use for nesting levels. Default is JSON_NESTING.
+
+            last_data (dict): A dictionary specifying the last level of data to include. Default is JSON_LAST_DATA.
+
+        Returns:
+            dict: A nested dictionary structure representing the data.
+        """
+        nesting = JSON_NESTING if nesting is None else nesting
+        last_data = JSON_LAST_DATA if last_data is None else last_data
+
+        return to_dict(list(self.rows()), nesting, last_data)
+
+    def to_json(self, json_path="data.json", nesting: list = None, last_data: dict = None):
+        """
+        Save the handled rows as JSON.
+
+        Parameters:
+            json_path (str): The path to the output JSON file. Default is "data.json".
+
+            nesting (list): A list of column names to use for nesting levels. Default is JSON_NESTING.
+
+            last_data (dict): A dictionary specifying the last level of data to include. Default is JSON_LAST_DATA.
+
+        """
+        schedule = self.to_dict(nesting, last_data)
+
+        with open(os.path.abspath(json_path), 'w', encoding='utf8') as json_file:
+            json.dump(schedule, json_file, ensure_ascii=False, indent=4)
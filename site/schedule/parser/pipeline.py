@@ -0,0 +1,318 @@
+import json
+import os
+
+from .read import AbsoluteReader
+from .handle import Handler, FENFilter, to_dict
+from .profiling import NULL_PROFILER
+
+
+ROW_COLUMNS = [
+    "day_of_week_name",
+    "time",
+    "course_lecturer",
+    "group_name",
+    "group_text",
+    "weeks",
+    "auditory_name",
+    "table_name"
+]
+
+COLUMN_STAGES = {
+    "day_of_week": "day_of_week",
+    "weeks": "weeks",
+    "lesson_number": "lesson_number",
+    "lesson_start": "lesson_number",
+    "lesson_end": "lesson_number",
+    "course_name": "course_lecturer",
+    "lecturer_name": "course_lecturer",
+    "course_identity": "identity",
+    "lecturer_identity": "identity"
+}
+
+# the column stages whose failed rows are missing from the result of a column stage as well
+STAGE_INPUTS = {
+    "identity": ["course_lecturer"]
+}
+
+# columns only produced by a pipeline with an identity dictionary
+IDENTITY_STAGE_COLUMNS = ["course_identity", "lecturer_identity"]
+
+JSON_NESTING = ["course_name", "group_name", "day_of_week_name"]
+
+JSON_LAST_DATA = {
+    "час": "time",
+    "аудиторія": "auditory_name",
+    "тижні": "weeks"
+}
+
+
+class Pipeline():
+    """
+    A class for lazily reading and handling a schedule file.
+
+    Each stage of `Handler.handle` is computed only when an output needs it and is memoized,
+    so several exports of the same file share the read and the row filtering,
+    and an export of a few columns skips the stages producing the others.
+
+    Parameters:
+        path (str or bytes or file-like): The data file, read once by the first stage.
+
+        fen_mode (bool): Whether to operate in FEN mode.
+
+        spec (str): The specialization (required if in FEN mode). One of ["мен","фін", "екон", "мар", "рб"].
+
+        profiler (Profiler): The profiler recording every computed stage. Nothing is recorded if None.
+
+        workers (int): The number of processes reading XLSX sheets in parallel.
+
+        bells (BellSchedule): The bell schedule mapping times to lessons. Default is the NaUKMA bell schedule.
+
+        errors (ErrorReport): The report collecting failing rows. If given, failing rows are left out
+            of the handled data and recorded instead of raising.
+
+        identities (IdentityDictionary): The dictionary resolving course and lecturer names to identities.
+            The identity columns are not available if None.
+
+    Attributes:
+        path (str or bytes or file-like): The data file.
+
+        fen_mode (bool): Whether the pipeline operates in FEN mode.
+
+        spec (str): The specialization to filter data for (only relevant in FEN mode).
+
+        handler (Handler): The handler whose per-value conversions are used by the stages.
+
+        unknown_times (dict): A dictionary mapping the times missing from the bell schedule to their number of rows.
+            Filled by the rows stage.
+
+        errors (ErrorReport): The report collecting failing rows, None if errors are raised.
+
+        profiler (Profiler): The profiler recording every computed stage.
+
+        identities (IdentityDictionary): The dictionary resolving course and lecturer names to identities.
+
+    Stages:
+        read: The data read by AbsoluteReader.
+
+        clean: Rows with a course, with empty values filled.
+
+        rows: Clean rows without unknown times, filtered by specialization in FEN mode,
+            with one row per group.
+
+        day_of_week, weeks, lesson_number, course_lecturer: The columns computed from the rows.
+
+        identity: The identities of the course and lecturer names.
+
+    Methods:
+        stage(self, name):
+            Get the result of a stage, computing it and its dependencies if needed.
+
+        select(self, columns=None):
+            Get the handled data restricted to the given columns.
+
+        to_dict(self, nesting, last_data):
+            Convert the handled data into a nested dictionary.
+
+        to_json(self, json_path, nesting, last_data):
+            Save the handled data as JSON.
+
+        to_ics(self, directory, semester_start, by):
+            Save the handled data as one iCalendar file per group or lecturer.
+
+    """
+
+    def __init__(self, path, fen_mode: bool = False, spec: str = None, profiler=None, workers: int = 1,
+                 bells=None, errors=None, identities=None) -> None:
+        """
+        Initialize a Pipeline instance.
+
+        Parameters:
+            path (str or bytes or file-like): The data file, read once by the first stage.
+
+            fen_mode (bool): Whether to operate in FEN mode.
+
+            spec (str): The specialization (required if in FEN mode). One of ["мен","фін", "екон", "мар", "рб"].
+
+            profiler (Profiler): The profiler recording every computed stage. Nothing is recorded if None.
+
+            workers (int): The number of processes reading XLSX sheets in parallel.
+
+            bells (BellSchedule): The bell schedule mapping times to lessons. Default is the NaUKMA bell schedule.
+
+            errors (ErrorReport): The report collecting failing rows. If given, failing rows are left out
+                of the handled data and recorded instead of raising.
+
+            identities (IdentityDictionary): The dictionary resolving course and lecturer names to identities.
+                The identity columns are not available if None.
+
+        """
+        self.path = path
+        self.workers = workers
+        self.fen_mode = fen_mode
+        self.spec = spec
+        self.handler = Handler(None, fen_mode=fen_mode, spec=spec, bells=bells, errors=errors)
+        self.unknown_times = dict()
+        self.errors = errors
+        self.profiler = NULL_PROFILER if profiler is None else profiler
+        self.identities = identities
+
+        self._results = dict()
+        # column stage -> index labels of the rows that failed in it
+        self._failed = dict()
+
+    def stage(self, name: str):
+        """
+        Get the result of a stage, computing it and its dependencies if needed.
+
+        Parameters:
+            name (str): The stage name.
+
+        Returns:
+            pd.DataFrame: The result of the stage. It is shared between calls and must not be modified.
+        """
+        if name not in self._results:
+            with self.profiler.stage("pipeline." + name) as record:
+                self._results[name] = getattr(self, "_" + name)()
+                record["rows_out"] = len(self._results[name])
+        return self._results[name]
+
+    def _read(self):
+        return AbsoluteReader(self.path, self.profiler, workers=self.workers, errors=self.errors).read()
+
+    def _clean(self):
+        handler = Handler(self.stage("read").copy())
+        handler.join_course_lecturer()
+        handler.remove_without_course()
+        handler.fill_empty(replace_value="")
+        if not handler.headers_skipped:
+            handler.remove_leading_headers()
+        return handler.data
+
+    def _rows(self):
+        handler = Handler(self.stage("clean").copy(), bells=self.handler.bells, errors=self.errors)
+        handler.remove_unknown_times()
+        self.unknown_times = handler.unknown_times
+
+        if self.fen_mode:
+            fen_filter = FENFilter(handler.data, self.spec)
+            if self.spec not in fen_filter.FEN_SPEC_CUT:
+                raise Exception(
+                    'Parameter "spec" must be one of {fen_spec}'.format(fen_spec=list(fen_filter.FEN_SPEC_CUT)))
+            handler.data = fen_filter.filter_spec()
+
+        handler.split_groups()
+        return handler.data
+
+    def _convert(self, column, function, stage):
+        rows = self.stage("rows")
+        values, failed = self.handler.convert(rows, column, function, stage)
+        self._failed[stage] = set(rows.index[failed])
+        return values.to_frame(stage)
+
+    def _day_of_week(self):
+        return self._convert("day_of_week_name", self.handler.day_of_week_to_index, "day_of_week")
+
+    def _weeks(self):
+        return self._convert("weeks", self.handler.weeks_to_list, "weeks")
+
+    def _lesson_number(self):
+        return self.handler.bells.lookup(self.stage("rows")["time"])
+
+    def _course_lecturer(self):
+        rows = self.stage("rows")
+        columns = [c for c in ("course_lecturer_rich_text", "course_lecturer", "table_name") if c in rows.columns]
+        handler = Handler(rows[columns].copy(), errors=self.errors)
+        handler.split_course_lecturer_column()
+        self._failed["course_lecturer"] = set(rows.index.difference(handler.data.index))
+        return handler.data[["course_name", "lecturer_name"]]
+
+    def _identity(self):
+        if self.identities is None:
+            raise ValueError("identity columns need a pipeline with identities")
+        return self.identities.encode(self.stage("course_lecturer"))[IDENTITY_STAGE_COLUMNS]
+
+    def select(self, columns: list = None):
+        """
+        Get the handled data restricted to the given columns.
+
+        Only the stages producing the requested columns are computed. Rows that failed in one of them
+        are left out when the pipeline collects errors, rows that only failed in other stages are kept.
+
+        Parameters:
+            columns (list): The column names. All columns produced by `Handler.handle` by default,
+                with the identity columns if the pipeline has identities.
+
+        Returns:
+            pd.DataFrame: The handled data with the requested columns in the requested order.
+        """
+        if columns is None:
+            columns = ROW_COLUMNS + [column for column in COLUMN_STAGES if column not in ROW_COLUMNS and
+                                     (self.identities is not None or column not in IDENTITY_STAGE_COLUMNS)]
+
+        import pandas as pd
+
+        rows = self.stage("rows")
+        stages = {column: self.stage(COLUMN_STAGES[column]) for column in columns if column in COLUMN_STAGES}
+
+        failed = set()
+        for stage in {COLUMN_STAGES[column] for column in stages}:
+            for name in [stage] + STAGE_INPUTS.get(stage, []):
+                failed.update(self._failed.get(name, ()))
+
+        data = pd.DataFrame(index=rows.index[~rows.index.isin(list(failed))])
+        for column in columns:
+            data[column] = stages[column][column] if column in stages else rows[column]
+        return data
+
+    def to_dict(self, nesting: list = None, last_data: dict = None):
+        """
+        Convert the handled data into a nested dictionary.
+
+        Parameters:
+            nesting (list): A list of column names to use for nesting levels. Default is JSON_NESTING.
+
+            last_data (dict): A dictionary specifying the last level of data to include. Default is JSON_LAST_DATA.
+
+        Returns:
+            dict: A nested dictionary structure representing the data.
+        """
+        nesting = JSON_NESTING if nesting is None else nesting
+        last_data = JSON_LAST_DATA if last_data is None else last_data
+
+        columns = list(dict.fromkeys(nesting + list(last_data.values())))
+        return to_dict(self.select(columns).to_dict("records"), nesting, last_data)
+
+    def to_json(self, json_path="data.json", nesting: list = None, last_data: dict = None):
+        """
+        Save the handled data as JSON.
+
+        Parameters:
+            json_path (str): The path to the output JSON file. Default is "data.json".
+
+            nesting (list): A list of column names to use for nesting levels. Default is JSON_NESTING.
+
+            last_data (dict): A dictionary specifying the last level of data to include. Default is JSON_LAST_DATA.
+
+        """
+        schedule = self.to_dict(nesting, last_data)
+
+        with open(os.path.abspath(json_path), 'w', encoding='utf8') as json_file:
+            json.dump(schedule, json_file, ensure_ascii=False, indent=4)
+
+    def to_ics(self, directory, semester_start, by: str = "group_name"):
+        """
+        Save the handled data as one iCalendar file per value of a column.
+
+        Parameters:
+            directory (str): The directory to save the .ics files to.
+
+            semester_start (datetime.date): A day of the first week of the semester.
+
+            by (str): The column to split the calendars by, such as "group_name" or "lecturer_name".
+
+        Returns:
+            dict: A dictionary mapping the values of the column to the paths of their .ics files.
+        """
+        from .ics import ICS_COLUMNS, write_calendars
+
+        return write_calendars(self.select(list(dict.fromkeys(ICS_COLUMNS + [by]))), directory, semester_start, by=by)
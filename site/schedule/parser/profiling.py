@@ -0,0 +1,170 @@
+import cProfile
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from collections import defaultdict
+
+
+class Profiler():
+    """
+    A class for recording wall time, row counts and peak memory of read and handle stages.
+
+    Parameters:
+        memory (bool): Whether to trace peak memory with tracemalloc. Slows the stages down.
+
+        profile_dir (str): The directory to dump cProfile statistics of every stage to. Not dumped if None.
+            The statistics of a stage leave out its inner stages, which are dumped on their own.
+
+    Attributes:
+        records (list): A list of dictionaries, one per finished stage, with the keys
+            "stage", "seconds", "rows_in", "rows_out" and "peak_memory".
+
+    Methods:
+        stage(self, name, rows_in=None):
+            Context manager measuring a stage.
+
+        rows(data):
+            Count the rows of the data passed between stages.
+
+        summary(self):
+            Aggregate the records by stage name.
+
+    """
+
+    def __init__(self, memory: bool = True, profile_dir: str = None) -> None:
+        """
+        Initialize a Profiler instance.
+
+        Parameters:
+            memory (bool): Whether to trace peak memory with tracemalloc. Slows the stages down.
+
+            profile_dir (str): The directory to dump cProfile statistics of every stage to. Not dumped if None.
+
+        """
+        self.memory = memory
+        self.profile_dir = profile_dir
+        self.records = []
+
+        self._peaks = []
+        self._profiles = []
+        self._tracing = False
+        self._dumps = defaultdict(int)
+
+    @staticmethod
+    def rows(data):
+        """
+        Count the rows of the data passed between stages.
+
+        Parameters:
+            data: A data frame, a list of rows or None.
+
+        Returns:
+            int or None: The number of rows, or None if the data has no length.
+        """
+        try:
+            return len(data)
+        except TypeError:
+            return None
+
+    @contextmanager
+    def stage(self, name: str, rows_in=None):
+        """
+        Context manager measuring a stage.
+
+        The yielded record can be completed by the caller, for example with "rows_out".
+        Stages can be nested, the peak memory of an outer stage includes its inner stages.
+
+        Parameters:
+            name (str): The stage name, for example "read.load_workbook" or "handle.weeks".
+
+            rows_in (int): The number of rows the stage starts with.
+
+        Yields:
+            dict: The record of the stage.
+        """
+        record = {"stage": name, "seconds": None, "rows_in": rows_in, "rows_out": None, "peak_memory": None}
+
+        if self.memory:
+            if not self._peaks and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+            memory_start = tracemalloc.get_traced_memory()[0]
+
+        # only one profiler can be enabled at a time, so the stage running it pauses the profiler of its outer stage
+        profile = cProfile.Profile() if self.profile_dir else None
+        if profile:
+            if self._profiles:
+                self._profiles[-1].disable()
+            self._profiles.append(profile)
+            profile.enable()
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+
+            if profile:
+                profile.disable()
+                self._profiles.pop()
+                self._dump(name, profile)
+                if self._profiles:
+                    self._profiles[-1].enable()
+
+            if self.memory:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                record["peak_memory"] = peak - memory_start
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                elif self._tracing:
+                    tracemalloc.stop()
+                    self._tracing = False
+
+            self.records.append(record)
+
+    def _dump(self, name, profile):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self._dumps[name] += 1
+        profile.dump_stats(os.path.join(self.profile_dir, "{name}.{n}.prof".format(name=name, n=self._dumps[name])))
+
+    def summary(self):
+        """
+        Aggregate the records by stage name.
+
+        Returns:
+            list: A list of dictionaries with the keys "stage", "calls", "seconds", "rows_in", "rows_out" and
+            "peak_memory", in the order the stages first finished. Times and rows are summed, peak memory is the maximum.
+        """
+        stages = dict()
+        for record in self.records:
+            total = stages.setdefault(record["stage"], {"stage": record["stage"], "calls": 0, "seconds": 0.0,
+                                                        "rows_in": None, "rows_out": None, "peak_memory": None})
+            total["calls"] += 1
+            total["seconds"] += record["seconds"]
+            for key in ("rows_in", "rows_out"):
+                if record[key] is not None:
+                    total[key] = (total[key] or 0) + record[key]
+            if record["peak_memory"] is not None:
+                total["peak_memory"] = max(total["peak_memory"] or 0, record["peak_memory"])
+        return list(stages.values())
+
+
+class NullProfiler(Profiler):
+    """
+    A profiler that records nothing, used when instrumentation is off.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(memory=False)
+
+    @contextmanager
+    def stage(self, name: str, rows_in=None):
+        yield dict()
+
+
+NULL_PROFILER = NullProfiler()
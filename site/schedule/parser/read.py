@@ -1,33 +1,127 @@
-import openpyxl
-from openpyxl.cell.rich_text import TextBlock, CellRichText
-from openpyxl.cell.text import InlineFont
-import re
 from abc import ABC, abstractmethod
-import pandas as pd
-import numpy as np
+from collections import namedtuple
 
+import io
+import posixpath
+import re
 import zipfile
-import lxml.etree
-
-from win32com import client as wc
 import os
+import tempfile
+
+from . import cols
+from .profiling import NULL_PROFILER
+from .bells import is_time_range
+from .layout import ColumnLayout, HEADER_ROWS
+from .errors import ErrorReport, describe
+
+# pandas, openpyxl, lxml and win32com are imported by the readers that need them,
+# so importing this module stays cheap and works where win32com is not installed
+
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+SPREADSHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+RELATIONSHIPS_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+SHEET_ELEMENT = re.compile(rb"<(?:\w+:)?sheet\b[^>]*/>")
 
-import cols
+# workbook parts that refer to sheets by position, left out of single-sheet workbooks
+SHEET_POSITIONS = [re.compile(rb"<(?:\w+:)?definedNames\b.*?</(?:\w+:)?definedNames>", re.S),
+                   re.compile(rb'\s(?:activeTab|firstSheet)="\d+"')]
 
-from pprint import pprint
 
+def source_bytes(source):
+    """
+    Get the content of a schedule source.
+
+    Parameters:
+        source (str or bytes or file-like): A path, the content itself or a binary file-like object.
+
+    Returns:
+        bytes: The content.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    return source.read()
+
+
+def as_file(source):
+    """
+    Get something zipfile and openpyxl can open from a schedule source: a path or a binary file-like object.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def detect_format(content: bytes):
+    """
+    Detect the format of a schedule file by its content.
+
+    .doc files are OLE compound files, .docx and .xlsx files are ZIP archives told apart by their "word/" and "xl/" parts.
+
+    Parameters:
+        content (bytes): The file content.
+
+    Returns:
+        str or None: One of ".xlsx", ".docx" and ".doc", or None if the content is none of them.
+    """
+    if content.startswith(OLE_SIGNATURE):
+        return ".doc"
+    if content.startswith(ZIP_SIGNATURE):
+        try:
+            with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                names = archive.namelist()
+        except zipfile.BadZipFile:
+            return None
+        if any(name.startswith("word/") for name in names):
+            return ".docx"
+        if any(name.startswith("xl/") for name in names):
+            return ".xlsx"
+    return None
+
+
+def CellRichText_to_dict(cell: "openpyxl.cell.rich_text.CellRichText"):
+    import openpyxl
 
-def CellRichText_to_dict(cell: openpyxl.cell.rich_text.CellRichText):
-    print(type(cell))
-    for i in cell:
-        print(i)
-        print(i.font)
     rich_cell_text_TextBlocks = map(lambda x: openpyxl.cell.rich_text.TextBlock(x) if isinstance(x,str) else x, cell)
     rich_cell_text_params = map(vars, rich_cell_text_TextBlocks)
     rich_cell_text_params = list(map(lambda p: {**p, "font": vars(p["font"])}, rich_cell_text_params))
     return rich_cell_text_params
 
 
+TextRun = namedtuple("TextRun", ["text", "bold", "italic"])
+TextRun.__doc__ = """
+A piece of cell text written in one font style. Courses are usually bold and lecturers italic.
+"""
+
+
+def merge_runs(runs):
+    """
+    Merge adjacent text runs with the same style and drop empty ones.
+
+    Parameters:
+        runs (iterable): The TextRun objects of a cell.
+
+    Returns:
+        list: The merged TextRun objects.
+    """
+    merged = []
+    for run in runs:
+        if not run.text:
+            continue
+        if merged and merged[-1].bold == run.bold and merged[-1].italic == run.italic:
+            merged[-1] = TextRun(merged[-1].text + run.text, run.bold, run.italic)
+        else:
+            merged.append(run)
+    return merged
+
+
 def remove_namespace(node):
     """
     Remove namespace prefixes from the given Word XML content.
@@ -50,91 +144,277 @@ class Reader(ABC):
     """
     Abstract base class for data readers.
 
+    Readers take a path, the file content as bytes or a binary file-like object.
+
     Parameters:
-        path (str): The path to the data file.
+        path (str or bytes or file-like): The data file.
+
+        profiler (Profiler): The profiler recording the reading stages. Nothing is recorded if None.
+
+        errors (ErrorReport): The report collecting rows that fail to be read. If given, such rows are skipped
+            instead of raising.
 
     """
 
-    def __init__(self, path) -> None:
+    def __init__(self, path, profiler=None, errors=None) -> None:
         """
         Initialize a Reader instance.
 
         Parameters:
-            path (str): The path to the data file.
+            path (str or bytes or file-like): The data file.
+
+            profiler (Profiler): The profiler recording the reading stages. Nothing is recorded if None.
+
+            errors (ErrorReport): The report collecting rows that fail to be read. If given, such rows are skipped
+                instead of raising.
 
         """
         self.path = path
+        self.profiler = NULL_PROFILER if profiler is None else profiler
+        self.errors = errors
+
+    def row_failed(self, e, row, table_name):
+        """
+        Record a row that failed to be read, or raise its error if errors are not collected.
+        """
+        if self.errors is None:
+            raise e
+        self.errors.add("read", describe(e), row=row, table_name=table_name)
 
     @abstractmethod
+    def iter_rows(self):
+        """
+        Abstract method for reading the rows of a file one by one.
+
+        Yields:
+            list: The cells of a row in the order of cols.NAMES, followed by its table name.
+        """
+        pass
+
     def read(self):
         """
-        Abstract method for reading data from a file.
+        Read data from a file.
 
         Returns:
-            list: The read schedule data.
+            pd.DataFrame: The read schedule data with the columns cols.NAMES and "table_name".
         """
-        pass
+        import pandas as pd
+
+        data = pd.DataFrame(list(self.iter_rows()), columns=cols.NAMES + [cols.TABLE_NAME])
+        data.attrs[cols.HEADERS_SKIPPED] = True
+        return data
+
+
+def split_workbook(content: bytes):
+    """
+    Split an XLSX file into one workbook per worksheet.
+
+    Every workbook keeps the shared parts, such as shared strings and styles, and the XML of its own sheet only,
+    so a worker process given it parses one sheet instead of the whole file.
+
+    Parameters:
+        content (bytes): The XLSX file content.
+
+    Returns:
+        list: A list of (sheet title, XLSX content) tuples in sheet order.
+    """
+    from xml.etree import ElementTree
+
+    with zipfile.ZipFile(io.BytesIO(content)) as package:
+        names = set(package.namelist())
+        root_rels = ElementTree.fromstring(package.read("_rels/.rels"))
+        workbook_path = next(rel.get("Target") for rel in root_rels
+                             if rel.get("Type").endswith("/officeDocument")).lstrip("/")
+        workbook_dir = posixpath.dirname(workbook_path)
+        workbook_xml = package.read(workbook_path)
+
+        rels_path = posixpath.join(workbook_dir, "_rels", posixpath.basename(workbook_path) + ".rels")
+        targets = dict()
+        for rel in ElementTree.fromstring(package.read(rels_path)):
+            if rel.get("Type").endswith("/worksheet"):
+                target = rel.get("Target")
+                targets[rel.get("Id")] = target.lstrip("/") if target.startswith("/") else \
+                    posixpath.normpath(posixpath.join(workbook_dir, target))
+
+        sheets = [(sheet.get("name"), sheet.get(RELATIONSHIPS_NS + "id"))
+                  for sheet in ElementTree.fromstring(workbook_xml).iter(SPREADSHEET_NS + "sheet")]
+        elements = SHEET_ELEMENT.findall(workbook_xml)
+
+        def sheet_parts(target):
+            return {target, posixpath.join(posixpath.dirname(target), "_rels", posixpath.basename(target) + ".rels")}
+
+        others = set()
+        for target in targets.values():
+            others |= sheet_parts(target)
+        shared = [name for name in package.namelist() if name not in others and name != workbook_path]
+        shared_content = {name: package.read(name) for name in shared}
+
+        workbooks = []
+        for (title, rel_id), element in zip(sheets, elements):
+            if rel_id not in targets:
+                # chartsheets and other sheets without cells
+                continue
+            xml = SHEET_ELEMENT.sub(lambda match: match.group(0) if match.group(0) == element else b"", workbook_xml)
+            for pattern in SHEET_POSITIONS:
+                xml = pattern.sub(b"", xml)
+
+            part = io.BytesIO()
+            with zipfile.ZipFile(part, "w", zipfile.ZIP_STORED) as single:
+                for name, data in shared_content.items():
+                    single.writestr(name, data)
+                single.writestr(workbook_path, xml)
+                for name in sheet_parts(targets[rel_id]) & names:
+                    single.writestr(name, package.read(name))
+            workbooks.append((title, part.getvalue()))
+    return workbooks
+
+
+def read_xlsx_sheet(content: bytes, tolerant: bool = False):
+    """
+    Read the sheet of a single-sheet workbook made by `split_workbook`. Used by worker processes of XLSXReader.
+
+    Parameters:
+        content (bytes): The XLSX content.
+
+        tolerant (bool): Whether to skip rows that fail to be read instead of raising.
+
+    Returns:
+        tuple: The rows of the sheet, empty if it holds no schedule, and the errors of the skipped rows.
+    """
+    import openpyxl
+
+    reader = XLSXReader(content, errors=ErrorReport() if tolerant else None)
+    rows = reader.read_sheet(openpyxl.load_workbook(as_file(content), rich_text=True).worksheets[0])
+    return rows, reader.errors.errors if tolerant else []
 
 
 class XLSXReader(Reader):
     """
     A class for reading schedule data from XLSX files.
 
+    Every sheet holding a schedule is read, rows are tagged with the sheet title in the "table_name" column.
+
     Parameters:
-        path (str): The path to the XLSX file.
+        path (str or bytes or file-like): The XLSX file.
+
+        workers (int): The number of processes reading sheets in parallel. Sheets are read one by one if 1,
+            or if the file has one sheet or the machine one CPU.
+
+        errors (ErrorReport): The report collecting rows that fail to be read. If given, such rows are skipped
+            instead of raising.
 
     """
 
-    def __init__(self, path) -> None:
+    def __init__(self, path, profiler=None, workers: int = 1, errors=None) -> None:
         """
         Initialize an XLSXReader instance.
 
         Parameters:
-            path (str): The path to the XLSX file.
+            path (str or bytes or file-like): The XLSX file.
+
+            profiler (Profiler): The profiler recording the reading stages. Nothing is recorded if None.
+
+            workers (int): The number of processes reading sheets in parallel. Sheets are read one by one if 1.
+
+            errors (ErrorReport): The report collecting rows that fail to be read. If given, such rows are skipped
+                instead of raising.
 
         """
-        super().__init__(path)
+        super().__init__(path, profiler, errors)
+        self.workers = workers
 
-    def read(self):
+    def iter_rows(self):
         """
-        Read data from an XLSX file.
+        Read the rows of an XLSX file one sheet at a time.
 
-        Returns:
-            list: The read schedule data in a structured format.
+        Yields:
+            list: The cells of a row followed by the title of its sheet.
         """
 
+        import openpyxl
+
         path = self.path
 
-        ws = openpyxl.load_workbook(path, rich_text=True).active
+        sheets = []
+        if min(self.workers, os.cpu_count() or 1) > 1:
+            # worker processes get the XML of their own sheet, the workbook is not parsed here
+            path = source_bytes(path)
+            with self.profiler.stage("read.split_sheets"):
+                sheets = split_workbook(path)
+
+        workers = min(self.workers, os.cpu_count() or 1, len(sheets))
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with self.profiler.stage("read.sheets") as record:
+                record["rows_out"] = 0
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    tolerant = [self.errors is not None] * len(sheets)
+                    for rows, errors in executor.map(read_xlsx_sheet, [content for title, content in sheets],
+                                                     tolerant):
+                        if errors:
+                            self.errors.errors.extend(errors)
+                        record["rows_out"] += len(rows)
+                        yield from rows
+        else:
+            with self.profiler.stage("read.load_workbook"):
+                workbook = openpyxl.load_workbook(as_file(path), rich_text=True)
+
+            for ws in workbook.worksheets:
+                yield from self.read_sheet(ws)
+
+    def read_sheet(self, ws):
+        """
+        Read the schedule rows of a worksheet.
+
+        Parameters:
+            ws: The worksheet to read.
 
+        Returns:
+            list: The rows of the sheet tagged with its title, empty if the sheet holds no schedule.
+        """
         schedule = []
 
-        rows_range = self.get_schedule_rows_range(ws)
+        with self.profiler.stage("read.layout"):
+            header_row, layout = ColumnLayout.detect(
+                ws.iter_rows(1, min(HEADER_ROWS, ws.max_row), values_only=True))
+        if layout is None:
+            layout, first_row = ColumnLayout(), 1
+        else:
+            first_row = header_row + 2
+
+        with self.profiler.stage("read.rows_range", rows_in=ws.max_row):
+            rows_range = self.get_schedule_rows_range(ws, layout, first_row)
+
+        if rows_range is None:
+            return schedule
 
-        for row in ws.iter_rows(rows_range[0], rows_range[1]):
+        with self.profiler.stage("read.cells") as record:
+            for row in ws.iter_rows(rows_range[0], rows_range[1]):
 
-            row_data = []
+                if layout.is_header([cell.value for cell in row]):
+                    continue
 
-            for col in range(0, 6):
-                if col in {cols.DAYS_OF_WEEKS, cols.TIME}:
-                    row_data.append(self.get_nearest_up_cell_val(row[col]))
-                elif col == cols.COURSE:
-                    cell_val = self.get_cell_val(row[col])
-                    row_data.append(CellRichText(cell_val if cell_val else "")._opt().as_list())
-                else:
-                    row_data.append(str(self.get_cell_val(row[col])))
+                row_data = []
+
+                try:
+                    for col, cell in enumerate(layout.pick(row)):
+                        if col in {cols.DAYS_OF_WEEKS, cols.TIME}:
+                            row_data.append(None if cell is None else self.get_nearest_up_cell_val(cell))
+                        elif col == cols.COURSE:
+                            row_data.append([] if cell is None else self.cell_to_text_runs(cell))
+                        else:
+                            row_data.append("" if cell is None else str(self.get_cell_val(cell)))
+                except Exception as e:
+                    self.row_failed(e, row[0].row, ws.title)
+                    continue
 
-            schedule.append(row_data)
+                row_data.append(ws.title)
+                schedule.append(row_data)
 
-        schedule_df = pd.DataFrame(schedule,
-                                   columns=['day_of_week_name',
-                                            'time',
-                                            'course_lecturer_rich_text',
-                                            "group_name",
-                                            "weeks",
-                                            "auditory_name"])
+            record["rows_out"] = len(schedule)
 
-        return schedule_df
+        return schedule
 
     def get_cell_val(self, cell, default=None):
         """
@@ -157,15 +437,44 @@ class XLSXReader(Reader):
         else:
             return default
 
-    def get_schedule_rows_range(self, ws):
+    def cell_to_text_runs(self, cell):
+        """
+        Get the text runs of a cell or of the merged cell it belongs to.
+
+        Parameters:
+            cell: The cell to read.
+
+        Returns:
+            list: The TextRun objects of the cell, plain text gets the style of the cell font.
+        """
+        from openpyxl.cell.rich_text import CellRichText
+
+        value = self.get_cell_val(cell)
+        if not value:
+            return []
+
+        bold, italic = bool(cell.font.b), bool(cell.font.i)
+        if not isinstance(value, CellRichText):
+            return [TextRun(str(value), bold, italic)]
+
+        return merge_runs(TextRun(block, bold, italic) if isinstance(block, str) else
+                          TextRun(block.text, bool(block.font.b), bool(block.font.i))
+                          for block in value)
+
+    def get_schedule_rows_range(self, ws, layout=None, first_row: int = 1):
         """
         Get the range of rows containing schedule information in the worksheet.
 
         Parameters:
             ws: The worksheet to search for schedule rows.
 
+            layout (ColumnLayout): The positions of the day and time columns. The positional layout if None.
+
+            first_row (int): The row to start searching from, the one after the header row.
+
         Returns:
-            tuple: A tuple containing the first and last row indices of the schedule rows.
+            tuple or None: A tuple containing the first and last row indices of the schedule rows,
+            or None if the worksheet holds no schedule.
         """
         days_of_week = {
             "Понеділок",
@@ -177,20 +486,23 @@ class XLSXReader(Reader):
             "Неділя"
         }
 
+        layout = ColumnLayout() if layout is None else layout
+
         rows = []
-        for cellA, cellB in zip(ws["A"], ws["B"]):
-            cellA_val = str(self.get_cell_val(cellA, default=""))
-            cellB_val = str(self.get_cell_val(cellB, default=""))
-            # print(type(cellB_val))
-            if cellB_val and \
+        for row in ws.iter_rows(first_row, ws.max_row):
+            cells = layout.pick(row)
+            day_cell, time_cell = cells[cols.DAYS_OF_WEEKS], cells[cols.TIME]
+            day = str(self.get_cell_val(day_cell, default="")) if day_cell is not None else ""
+            time = str(self.get_cell_val(time_cell, default="")) if time_cell is not None else ""
+            if time and \
                     (
                             # if time format
-                            re.match('^([01]?[0-9]|2[0-3])[:\.][0-5][0-9]-([01]?[0-9]|2[0-3])[:\.][0-5][0-9]$',
-
-                                     cellB_val) or
-                            cellA_val.capitalize() in days_of_week
+                            is_time_range(time) or
+                            day.capitalize() in days_of_week
                     ):
-                rows.append(cellB.row)
+                rows.append(time_cell.row)
+        if not rows:
+            return None
         return rows[0], rows[-1]
 
     def get_nearest_up_cell_val(self, cell, default=None):
@@ -221,216 +533,293 @@ class DOCXReader(Reader):
     """
     A class for reading schedule data from DOCX files.
 
+    Every table is read, rows are tagged with "table 1", "table 2", ... in the "table_name" column.
+    Rows whose number of cells differs from the schedule layout are skipped.
+
     Parameters:
-        path (str): The path to the DOCX file.
+        path (str or bytes or file-like): The DOCX file.
+
+        errors (ErrorReport): The report collecting rows that fail to be read. If given, such rows are skipped
+            instead of raising.
 
     """
 
-    def __init__(self, path) -> None:
+    def __init__(self, path, profiler=None, errors=None) -> None:
         """
         Initialize a DOCXReader instance.
 
         Parameters:
-            path (str): The path to the DOCX file.
+            path (str or bytes or file-like): The DOCX file.
+
+            profiler (Profiler): The profiler recording the reading stages. Nothing is recorded if None.
+
+            errors (ErrorReport): The report collecting rows that fail to be read. If given, such rows are skipped
+                instead of raising.
 
         """
-        super().__init__(path)
+        super().__init__(path, profiler, errors)
 
         self.WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
         self.TEXT = self.WORD_NAMESPACE + 't'
         self.TABLE = self.WORD_NAMESPACE + 'tbl'
         self.ROW = self.WORD_NAMESPACE + 'tr'
         self.CELL = self.WORD_NAMESPACE + 'tc'
+        self.RUN = self.WORD_NAMESPACE + 'r'
+        self.RUN_PROPERTIES = self.WORD_NAMESPACE + 'rPr'
+        self.BOLD = self.WORD_NAMESPACE + 'b'
+        self.ITALIC = self.WORD_NAMESPACE + 'i'
 
-    def read(self):
+    def iter_rows(self):
         """
-        Read data from a DOCX file.
+        Read the rows of a DOCX file one table at a time.
 
-        Returns:
-            list: The read schedule data in a structured format.
+        Yields:
+            list: The cells of a row followed by the name of its table.
         """
 
-        path = self.path
+        import lxml.etree
 
-        with zipfile.ZipFile(path) as docx:
-            tree = lxml.etree.XML(docx.read('word/document.xml'))
-
-        schedule = []
-
-        blank_filler = {  # fill blank
-            cols.DAYS_OF_WEEKS: "",
-            cols.TIME: "",
-            cols.WEEKS: "",
-            cols.LECT_HALL: ""
-        }
+        path = self.path
 
-        for table_node in tree.iter(self.TABLE):
+        with self.profiler.stage("read.parse_xml"):
+            with zipfile.ZipFile(as_file(path)) as docx:
+                tree = lxml.etree.XML(docx.read('word/document.xml'))
+
+        with self.profiler.stage("read.tables") as record:
+            record["rows_out"] = 0
+            for table, table_node in enumerate(tree.iter(self.TABLE)):
+
+                blank_filler = {  # fill blank
+                    cols.DAYS_OF_WEEKS: "",
+                    cols.TIME: "",
+                    cols.WEEKS: "",
+                    cols.LECT_HALL: ""
+                }
+
+                row_nodes = list(table_node.iter(self.ROW))
+                header_row, layout = ColumnLayout.detect(
+                    [self.cell_text(cell_node) for cell_node in row_node.iter(self.CELL)] for row_node in row_nodes)
+                if layout is None:
+                    # the first row is taken for the header
+                    header_row, layout = 0, ColumnLayout()
+
+                table_name = "table {n}".format(n=table + 1)
+                for row, row_node in enumerate(row_nodes[header_row + 1:], start=header_row + 1):
+                    cell_nodes = list(row_node.iter(self.CELL))
+
+                    # rows such as notes or titles merged across the table are skipped
+                    if len(cell_nodes) != layout.width:
+                        continue
+
+                    row_list = []
+                    try:
+                        texts = [self.cell_text(cell_node) for cell_node in cell_nodes]
+                        if layout.is_header(texts):
+                            continue
+
+                        for col, (cell_node, cell_value) in enumerate(zip(layout.pick(cell_nodes),
+                                                                            layout.pick(texts, default=""))):
+
+                            if col == cols.COURSE:
+                                cell_value = [] if cell_node is None else self.cell_to_text_runs(cell_node)
+                            elif col in blank_filler.keys():
+                                if (not cell_value) or cell_value.isspace():
+                                    cell_value = blank_filler[col]
+                                else:
+                                    blank_filler[col] = cell_value
+
+                            row_list.append(cell_value)
+                    except Exception as e:
+                        self.row_failed(e, row, table_name)
+                        continue
+
+                    row_list.append(table_name)
+                    record["rows_out"] += 1
+                    yield row_list
+
+    def cell_text(self, cell_node):
+        """
+        Get the plain text of a table cell.
+        """
+        return "".join(node.text or "" for node in cell_node.iter(self.TEXT))
 
-            for row, row_node in enumerate(table_node.iter(self.ROW)):
-                if row == 0:
-                    continue
-                row_list = []
-
-                if len([i for i in row_node.iter(self.CELL)]) != cols.COLS:
-                    break
-
-                for col, cell_node in enumerate(row_node.iter(self.CELL)):
-
-                    if col == cols.COURSE:
-                        cell_rich = self.cell_to_CellRichText(cell_node)
-                        cell_value = cell_rich._opt().as_list()
-                    else:
-                        cell_value = "".join(node.text for node in cell_node.iter(self.TEXT))
-                        if col in blank_filler.keys():
-                            if (not cell_value) or cell_value.isspace():
-                                cell_value = blank_filler[col]
-                            else:
-                                blank_filler[col] = cell_value
-
-                    row_list.append(cell_value)
-
-                schedule.append(row_list)
-        schedule_df = pd.DataFrame(schedule,
-                                   columns=['day_of_week_name',
-                                            'time',
-                                            'course_lecturer',
-                                            "group_name",
-                                            "weeks",
-                                            "auditory_name"])
+    def cell_to_text_runs(self, cell_node):
+        """
+        Get the text runs of a table cell with their bold and italic styles.
 
-        return schedule_df
+        Parameters:
+            cell_node: The w:tc element of the cell.
 
-    def cell_to_CellRichText(self, cell_node):
-        cell_rich = CellRichText()
+        Returns:
+            list: The TextRun objects of the cell.
+        """
+        runs = []
 
-        for r_element in cell_node.iter(self.WORD_NAMESPACE + "r"):
-            t_element = r_element.find(f"{self.WORD_NAMESPACE}t")
+        for r_element in cell_node.iter(self.RUN):
+            text = "".join(t_element.text or "" for t_element in r_element.iter(self.TEXT))
+            if not text:
+                continue
 
-            font_attributes = dict()
+            rPr_element = r_element.find(self.RUN_PROPERTIES)
+            runs.append(TextRun(text,
+                                self.is_toggled(rPr_element, self.BOLD),
+                                self.is_toggled(rPr_element, self.ITALIC)))
 
-            if t_element is not None and t_element.text:
-                # Extract text content
-                text = t_element.text
+        return merge_runs(runs)
 
-                # Extract font attributes
-                rPr_element = r_element.find(f"{self.WORD_NAMESPACE}rPr")
-                for prop in rPr_element.iterchildren():
-                    font_attributes[(lxml.etree.QName(prop).localname)] = prop.attrib.values()
+    def is_toggled(self, rPr_element, tag):
+        """
+        Check if a run property such as w:b or w:i is on.
 
-            font = InlineFont(rFont=font_attributes["rFonts"][0],
-                              sz=int(font_attributes["sz"][0]),
-                              i="i" in font_attributes,
-                              b="b" in font_attributes
-                              )
+        Parameters:
+            rPr_element: The w:rPr element of the run, or None.
 
-            cell_rich.append(TextBlock(font, text))
+            tag (str): The property tag.
 
-        return cell_rich
+        Returns:
+            bool: True if the property is present and not switched off with w:val="0" or "false".
+        """
+        if rPr_element is None:
+            return False
+        prop = rPr_element.find(tag)
+        return prop is not None and prop.get(self.WORD_NAMESPACE + "val", "true") not in {"0", "false", "none"}
 
 
 class DOCReader(Reader):
     """
     A class for reading schedule data from DOC files.
 
+    Word converts the file to DOCX through win32com. Word only opens paths, so content given as bytes
+    or a file-like object is written to a temporary directory, which also holds the converted file.
+
     Parameters:
-        path (str): The path to the DOC file.
+        path (str or bytes or file-like): The DOC file.
 
     """
 
-    def __init__(self, path) -> None:
+    def __init__(self, path, profiler=None, errors=None) -> None:
         """
         Initialize a DOCReader instance.
 
         Parameters:
-            path (str): The path to the DOC file.
+            path (str or bytes or file-like): The DOC file.
+
+            profiler (Profiler): The profiler recording the reading stages. Nothing is recorded if None.
+
+            errors (ErrorReport): The report collecting rows that fail to be read. If given, such rows are skipped
+                instead of raising.
 
         """
-        super().__init__(path)
+        super().__init__(path, profiler, errors)
 
-    def read(self):
+    def iter_rows(self):
         """
-        Read schedule data from a DOC file.
+        Read the rows of a DOC file, converting it to DOCX first.
 
-        Returns:
-            list: The read schedule data in a structured format.
+        Yields:
+            list: The cells of a row followed by the name of its table.
         """
 
-        full_path = os.path.abspath(self.path)
+        from win32com import client as wc
 
-        w = wc.Dispatch('Word.Application')
+        with tempfile.TemporaryDirectory() as directory:
+            if isinstance(self.path, (str, os.PathLike)):
+                full_path = os.path.abspath(self.path)
+            else:
+                full_path = os.path.join(directory, "schedule.doc")
+                with open(full_path, "wb") as f:
+                    f.write(source_bytes(self.path))
 
-        docx_path = full_path + "x"
+            docx_path = os.path.join(directory, "schedule.docx")
 
-        doc = w.Documents.Open(full_path)
-        doc.SaveAs(docx_path, 16)
-        doc.Close()
+            with self.profiler.stage("read.convert_doc"):
+                w = wc.Dispatch('Word.Application')
 
-        w.Quit()
+                doc = w.Documents.Open(full_path)
+                doc.SaveAs(docx_path, 16)
+                doc.Close()
 
-        schedule_df = DOCXReader(docx_path).read()
+                w.Quit()
 
-        os.remove(docx_path)
+            with open(docx_path, "rb") as f:
+                docx_content = f.read()
 
-        return schedule_df
+        yield from DOCXReader(docx_content, self.profiler, self.errors).iter_rows()
 
 
 class AbsoluteReader(Reader):
     """
-    A class for reading schedule data from files of various formats, determining the format based on file extension.
+    A class for reading schedule data from files of various formats, determining the format by the file content.
+
+    The file is read into memory once and the reader of its format parses it from there.
 
     Parameters:
-        path (str): The path to the data file.
+        path (str or bytes or file-like): The data file.
 
     """
 
-    def __init__(self, path) -> None:
+    def __init__(self, path, profiler=None, workers: int = 1, errors=None) -> None:
         """
         Initialize an AbsoluteReader instance.
 
         Parameters:
-            path (str): The path to the data file.
+            path (str or bytes or file-like): The data file.
+
+            profiler (Profiler): The profiler recording the reading stages. Nothing is recorded if None.
+
+            workers (int): The number of processes reading XLSX sheets in parallel.
+
+            errors (ErrorReport): The report collecting rows that fail to be read. If given, such rows are skipped
+                instead of raising.
 
         """
-        super().__init__(path)
+        super().__init__(path, profiler, errors)
+        self.workers = workers
 
-    def read(self):
+    def reader(self):
         """
-        Read schedule data from a data file, determining its format based on the file extension.
+        Load the data file and get the reader of its format.
 
         Returns:
-            list: The read schedule data in a structured format.
+            Reader: An XLSXReader, DOCXReader or DOCReader of the file content.
         """
 
-        self.path = os.path.abspath(self.path)
-        print(self.path)
+        if isinstance(self.path, (str, os.PathLike)):
+            self.path = os.path.abspath(self.path)
 
-        filename, file_extension = os.path.splitext(os.path.basename(self.path))
-        if file_extension == ".xlsx":
-            return XLSXReader(self.path).read()
-        elif file_extension == ".docx":
-            return DOCXReader(self.path).read()
-        elif file_extension == ".doc":
-            return DOCReader(self.path).read()
-        else:
-            raise Exception('extension should be one of [".xlsx", ".docx", ".doc"]')
+        with self.profiler.stage("read.load"):
+            content = source_bytes(self.path)
 
+        file_format = detect_format(content)
+        if file_format == ".xlsx":
+            return XLSXReader(content, self.profiler, workers=self.workers, errors=self.errors)
+        elif file_format == ".docx":
+            return DOCXReader(content, self.profiler, self.errors)
+        elif file_format == ".doc":
+            return DOCReader(self.path if isinstance(self.path, (str, os.PathLike)) else content,
+                             self.profiler, self.errors)
+        raise Exception('file content should be one of [".xlsx", ".docx", ".doc"]')
 
-if __name__ == "__main__":
-    from pprint import pprint
-    import numpy as np
+    def iter_rows(self):
+        """
+        Read the rows of a data file, determining its format by the file content.
 
-    # schedule = XLSXReader("./files/Прикладна_математика_БП-4_Осінь_2023–2024.xlsx").read()
-    # schedule = DOCXReader(r"..\..\..\files/Історія_БП-4_Осінь_2023–2024.docx").read()
-    # schedule = DOCReader(r"..\files\Економіка_БП-1_Осінь_2023–2024 (2).doc").read()
-    schedule = AbsoluteReader(r"..\..\..\files\Право_БП-1_Осінь_2023–2024.xlsx").read()
-    # schedule = AbsoluteReader(r"..\..\..\files\Суспільне_і_приватне_врядування_БП-3_Осінь_2023–2024.xlsx").read()
-    # schedule = AbsoluteReader(r"..\..\..\files/Історія_БП-4_Осінь_2023–2024.docx").read()
+        Yields:
+            list: The cells of a row followed by its table name.
+        """
+        yield from self.reader().iter_rows()
 
-    # print(all(np.array(schedule).flatten()))
+    def read(self):
+        """
+        Read schedule data from a data file, determining its format by the file content.
 
-    print(schedule.to_markdown())
-    # print(schedule["course_lecturer_rich_text"][0].as_list())
-    # print(schedule["course_lecturer_rich_text"][0][1].font)
-    # WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
-    # TEXT = WORD_NAMESPACE + 't'
-    # print("".join(node.text for node in lxml.etree.XML(schedule.iloc[0]["course_lecturer"]).iter(TEXT)))
+        Returns:
+            pd.DataFrame: The read schedule data with the columns cols.NAMES and "table_name".
+        """
+        reader = self.reader()
+
+        with self.profiler.stage("read") as record:
+            schedule_df = reader.read()
+            record["rows_out"] = len(schedule_df)
+
+        return schedule_df
@@ -0,0 +1,467 @@
+import argparse
+import itertools
+import json
+import time
+from collections import namedtuple
+
+from .search import normalize
+from .snapshot import weeks_to_mask, mask_to_weeks
+
+# pandas is imported where it is used to keep importing this module cheap
+
+BOOKING_COLUMNS = ["course_name", "lecturer_name", "group_name", "day_of_week", "lesson_number", "weeks",
+                   "auditory_name"]
+
+# the largest number of bookings of one room and slot for which the bookings to keep are searched exhaustively
+EXACT_LIMIT = 10
+
+Room = namedtuple("Room", ["name", "capacity", "kind", "shared"])
+Room.__doc__ = """
+A room of the catalog. Shared rooms, such as a gym or an online room, hold any number of lessons at once.
+"""
+
+Move = namedtuple("Move", ["course_name", "lecturer_name", "groups", "day_of_week", "lesson_number", "mask",
+                           "from_room", "to_room", "rows"])
+Move.__doc__ = """
+A proposed change of the room of a booking, with the index labels of its rows in the handled data.
+"""
+
+
+def room_name(value):
+    return " ".join(str(value).split()) if isinstance(value, str) else ""
+
+
+def building(name: str):
+    """
+    Get the building of a room, such as "1" for "1-225", or None if the name has no building.
+    """
+    return name.split("-", 1)[0] if "-" in name else None
+
+
+class Booking():
+    """
+    A class holding the rows of one course held by one lecturer in one room and slot, the groups of a lecture
+    split into one row per group among them.
+    """
+
+    __slots__ = ["course_name", "lecturer_name", "day_of_week", "lesson_number", "room", "mask", "groups", "rows",
+                 "capacity", "kind", "size"]
+
+    def __init__(self, course_name, lecturer_name, day_of_week, lesson_number, room) -> None:
+        self.course_name = course_name
+        self.lecturer_name = lecturer_name
+        self.day_of_week = day_of_week
+        self.lesson_number = lesson_number
+        self.room = room
+        self.mask = 0
+        self.groups = []
+        self.rows = []
+        self.capacity = 0
+        self.kind = None
+        self.size = 0
+
+    def __repr__(self):
+        return "Booking({course!r}, {room!r}, day={day}, lesson={lesson})".format(
+            course=self.course_name, room=self.room, day=self.day_of_week, lesson=self.lesson_number)
+
+    def to_dict(self):
+        return {"course_name": self.course_name, "lecturer_name": self.lecturer_name, "groups": sorted(self.groups),
+                "day_of_week": self.day_of_week, "lesson_number": self.lesson_number,
+                "weeks": mask_to_weeks(self.mask), "auditory_name": self.room}
+
+
+class RoomCatalog():
+    """
+    A class holding the capacities and types of rooms and the needs of courses.
+
+    A booking needs a room of the type of its own and at least as large as its course states, and fits best
+    in a room as large as its own. A course can state its type too. Bookings in rooms missing from the catalog
+    need any type.
+
+    Parameters:
+        rooms (list): Room objects.
+
+        courses (dict): A dictionary mapping course names to dictionaries with the optional keys "capacity"
+            and "type".
+
+    Methods:
+        from_dict(cls, config):
+            Build the catalog from a configuration dictionary.
+
+        from_file(cls, path):
+            Load the catalog from a JSON file.
+
+        demand(self, course_name, room):
+            Get the capacity and type a booking needs and the size it fits best.
+
+        candidates(self, capacity, kind):
+            Get the rooms meeting a need.
+
+    """
+
+    def __init__(self, rooms: list, courses: dict = None) -> None:
+        self.rooms = {room.name: room for room in rooms}
+        self.courses = {normalize(name): demand for name, demand in (courses or dict()).items()}
+        self._candidates = dict()
+
+    @classmethod
+    def from_dict(cls, config: dict):
+        """
+        Build the catalog from a dictionary such as
+        {"rooms": {"1-225": {"capacity": 120, "type": "лекційна"}, "спортзал": {"shared": true}},
+        "courses": {"Програмування": {"type": "комп'ютерна"}}}.
+        """
+        rooms = [Room(room_name(name), int(room.get("capacity", 0)), room.get("type"), bool(room.get("shared", False)))
+                 for name, room in config.get("rooms", dict()).items()]
+        return cls(rooms, config.get("courses"))
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load the catalog from a JSON file holding the dictionary of `from_dict`.
+        """
+        with open(path, encoding="utf8") as config_file:
+            return cls.from_dict(json.load(config_file))
+
+    def demand(self, course_name: str, room: str):
+        """
+        Get the capacity and type a booking needs and the size it fits best.
+
+        Returns:
+            tuple: The smallest capacity, the room type, None for any type, and the best capacity.
+        """
+        demand = self.courses.get(normalize(course_name), dict())
+        current = self.rooms.get(room)
+        capacity = int(demand.get("capacity", 0))
+        kind = demand.get("type", current.kind if current is not None else None)
+        size = max(capacity, current.capacity if current is not None else 0)
+        return capacity, kind, size
+
+    def candidates(self, capacity: int, kind: str = None):
+        """
+        Get the rooms meeting a need, smallest first. Shared rooms are never candidates.
+        """
+        key = (capacity, kind)
+        if key not in self._candidates:
+            rooms = [room for room in self.rooms.values() if not room.shared and room.capacity >= capacity and
+                     (kind is None or room.kind == kind)]
+            self._candidates[key] = sorted(rooms, key=lambda room: (room.capacity, room.name))
+        return self._candidates[key]
+
+
+def bookings_of(data, catalog: RoomCatalog):
+    """
+    Group handled rows into bookings.
+
+    Parameters:
+        data (pd.DataFrame): The handled data with the columns of BOOKING_COLUMNS.
+
+        catalog (RoomCatalog): The rooms and the needs of courses.
+
+    Returns:
+        list: Booking objects. Rows without a room or course are left out.
+    """
+    bookings = dict()
+    for label, row in zip(data.index, data[BOOKING_COLUMNS].itertuples(index=False)):
+        room = room_name(row.auditory_name)
+        if not room or not isinstance(row.course_name, str) or not row.course_name.strip():
+            continue
+        course_name = " ".join(row.course_name.split())
+        lecturer_name = row.lecturer_name if isinstance(row.lecturer_name, str) else ""
+        key = (normalize(course_name), normalize(lecturer_name), int(row.day_of_week), int(row.lesson_number), room)
+
+        booking = bookings.get(key)
+        if booking is None:
+            booking = bookings[key] = Booking(course_name, lecturer_name, key[2], key[3], room)
+            booking.capacity, booking.kind, booking.size = catalog.demand(course_name, room)
+        booking.mask |= weeks_to_mask(row.weeks)
+        booking.groups.append(str(row.group_name))
+        booking.rows.append(label)
+    return list(bookings.values())
+
+
+def find_conflicts(bookings: list, catalog: RoomCatalog):
+    """
+    Find the bookings sharing a room in some week with another booking.
+
+    Returns:
+        list: The conflicting Booking objects.
+    """
+    rooms = dict()
+    for booking in bookings:
+        room = catalog.rooms.get(booking.room)
+        if room is None or not room.shared:
+            rooms.setdefault((booking.day_of_week, booking.lesson_number, booking.room), []).append(booking)
+
+    conflicts = []
+    for room_bookings in rooms.values():
+        for booking in room_bookings:
+            if any(other is not booking and other.mask & booking.mask for other in room_bookings):
+                conflicts.append(booking)
+    return conflicts
+
+
+class RoomSolution():
+    """
+    A class holding the proposed room moves and the conflicts left.
+
+    Attributes:
+        moves (list): The Move objects. A swap is two moves: the booking in the way to a free room first.
+
+        unresolved (list): The conflicting Booking objects no room was found for.
+
+        complete (bool): False if the time budget ran out before every conflict was tried.
+
+        seconds (float): The time the solver took.
+
+    """
+
+    def __init__(self, moves: list, unresolved: list, complete: bool, seconds: float) -> None:
+        self.moves = moves
+        self.unresolved = unresolved
+        self.complete = complete
+        self.seconds = seconds
+
+    def apply(self, data):
+        """
+        Apply the moves to handled data.
+
+        Returns:
+            pd.DataFrame: A copy of `data` with the rooms of the moved rows changed.
+        """
+        data = data.copy()
+        for move in self.moves:
+            data.loc[move.rows, "auditory_name"] = move.to_room
+        return data
+
+    def to_dict(self):
+        """
+        Convert the solution into a dictionary of JSON types.
+        """
+        return {
+            "moves": [{"course_name": move.course_name, "lecturer_name": move.lecturer_name,
+                       "groups": sorted(move.groups), "day_of_week": move.day_of_week,
+                       "lesson_number": move.lesson_number, "weeks": mask_to_weeks(move.mask),
+                       "from_room": move.from_room, "to_room": move.to_room} for move in self.moves],
+            "unresolved": [booking.to_dict() for booking in self.unresolved],
+            "complete": self.complete,
+            "seconds": self.seconds
+        }
+
+
+class RoomSolver():
+    """
+    A class for proposing room moves that resolve double bookings.
+
+    Slots (day and lesson number) are independent, so every slot with a conflict is solved on its own.
+    In every room the largest set of bookings without common weeks stays, searched exhaustively for up to
+    EXACT_LIMIT bookings, and the others are moved, the most constrained first, to the free room that fits best:
+    a room of the needed type not smaller than the one left, in the same building and closest in size if possible.
+    A booking with no free room goes to a room whose only booking in its weeks can itself move to a free room,
+    a swap of two moves.
+    Slots are solved most conflicts first and the solver stops when `budget` runs out.
+
+    Parameters:
+        catalog (RoomCatalog): The rooms and the needs of courses.
+
+        budget (float): The time budget in seconds.
+
+    Methods:
+        solve(self, data, conflicts=None):
+            Propose moves resolving the conflicts of handled data.
+
+    """
+
+    def __init__(self, catalog: RoomCatalog, budget: float = 5.0) -> None:
+        self.catalog = catalog
+        self.budget = budget
+
+    def solve(self, data, conflicts=None):
+        """
+        Propose moves resolving the conflicts of handled data.
+
+        Parameters:
+            data (pd.DataFrame): The handled data with the columns of BOOKING_COLUMNS.
+
+            conflicts (iterable): The index labels of the conflicting rows. Only their bookings leave a double booked
+                room, other bookings move only to make way for them. Detected if None.
+
+        Returns:
+            RoomSolution: The moves and the conflicts left.
+        """
+        start = time.perf_counter()
+        deadline = start + self.budget
+
+        bookings = bookings_of(data, self.catalog)
+        conflicting = find_conflicts(bookings, self.catalog)
+        if conflicts is not None:
+            labels = set(conflicts)
+            movable = set(id(booking) for booking in bookings if labels.intersection(booking.rows))
+        else:
+            movable = set(id(booking) for booking in conflicting)
+
+        slots = dict()
+        for booking in bookings:
+            slots.setdefault((booking.day_of_week, booking.lesson_number), []).append(booking)
+        conflicted_slots = dict()
+        for booking in conflicting:
+            key = (booking.day_of_week, booking.lesson_number)
+            conflicted_slots[key] = conflicted_slots.get(key, 0) + 1
+
+        moves = []
+        unresolved = []
+        complete = True
+        for key in sorted(conflicted_slots, key=lambda key: (-conflicted_slots[key], key)):
+            if time.perf_counter() > deadline:
+                complete = False
+                unresolved.extend(booking for booking in conflicting
+                                  if (booking.day_of_week, booking.lesson_number) == key)
+                continue
+            slot_moves, slot_unresolved = self._solve_slot(slots[key], movable, deadline)
+            moves.extend(slot_moves)
+            unresolved.extend(slot_unresolved)
+
+        return RoomSolution(moves, unresolved, complete, time.perf_counter() - start)
+
+    def _keep(self, bookings: list, movable: set):
+        """
+        Choose the bookings of one room and slot that stay: the fixed ones and the largest set of movable ones
+        without common weeks, the largest and longest ones on ties.
+        """
+        fixed = [booking for booking in bookings if id(booking) not in movable]
+        taken = 0
+        for booking in fixed:
+            taken |= booking.mask
+        options = [booking for booking in bookings if id(booking) in movable and not booking.mask & taken]
+
+        def weight(chosen):
+            return sum(booking.size for booking in chosen), sum(booking.mask.bit_count() for booking in chosen)
+
+        if len(options) <= EXACT_LIMIT:
+            for size in range(len(options), 0, -1):
+                best = None
+                for chosen in itertools.combinations(options, size):
+                    mask = 0
+                    for booking in chosen:
+                        if mask & booking.mask:
+                            break
+                        mask |= booking.mask
+                    else:
+                        if best is None or weight(chosen) > weight(best):
+                            best = chosen
+                if best is not None:
+                    return fixed + list(best)
+            return fixed
+
+        kept = list(fixed)
+        for booking in sorted(options, key=lambda booking: (-booking.size, -booking.mask.bit_count())):
+            if not booking.mask & taken:
+                kept.append(booking)
+                taken |= booking.mask
+        return kept
+
+    def _solve_slot(self, bookings: list, movable: set, deadline: float):
+        occupancy = dict()
+        for booking in bookings:
+            room = self.catalog.rooms.get(booking.room)
+            if room is None or not room.shared:
+                occupancy.setdefault(booking.room, []).append(booking)
+
+        to_move = []
+        for room, room_bookings in occupancy.items():
+            if len(room_bookings) < 2:
+                continue
+            kept = self._keep(room_bookings, movable)
+            to_move.extend(booking for booking in room_bookings if booking not in kept)
+            occupancy[room] = kept
+
+        masks = dict()
+        for room, room_bookings in occupancy.items():
+            for booking in room_bookings:
+                masks[room] = masks.get(room, 0) | booking.mask
+
+        def free_rooms(booking, exclude=()):
+            return [room for room in self.catalog.candidates(booking.capacity, booking.kind)
+                    if room.name != booking.room and room.name not in exclude and
+                    not masks.get(room.name, 0) & booking.mask]
+
+        def best_fit(booking, rooms):
+            home = building(booking.room)
+            return min(rooms, key=lambda room: (room.capacity < booking.size, building(room.name) != home,
+                                                abs(room.capacity - booking.size), room.name))
+
+        def move(booking, room):
+            occupancy.setdefault(room.name, []).append(booking)
+            masks[room.name] = masks.get(room.name, 0) | booking.mask
+            return Move(booking.course_name, booking.lecturer_name, tuple(booking.groups), booking.day_of_week,
+                        booking.lesson_number, booking.mask, booking.room, room.name, list(booking.rows))
+
+        moves = []
+        unresolved = []
+        to_move.sort(key=lambda booking: (len(free_rooms(booking)), -booking.size))
+        for booking in to_move:
+            if time.perf_counter() > deadline:
+                unresolved.append(booking)
+                continue
+
+            rooms = free_rooms(booking)
+            if rooms:
+                moves.append(move(booking, best_fit(booking, rooms)))
+                continue
+
+            swap = None
+            for room in self.catalog.candidates(booking.capacity, booking.kind):
+                if room.name == booking.room:
+                    continue
+                blockers = [other for other in occupancy.get(room.name, []) if other.mask & booking.mask]
+                # a booking already moved here is not moved again
+                if len(blockers) != 1 or blockers[0].room != room.name:
+                    continue
+                blocker = blockers[0]
+                others = free_rooms(blocker, exclude=(room.name,))
+                if others:
+                    swap = (blocker, room, best_fit(blocker, others))
+                    break
+
+            if swap is None:
+                unresolved.append(booking)
+                continue
+            blocker, room, other = swap
+            occupancy[room.name].remove(blocker)
+            masks[room.name] = 0
+            for staying in occupancy[room.name]:
+                masks[room.name] |= staying.mask
+            moves.append(move(blocker, other))
+            moves.append(move(booking, room))
+        return moves, unresolved
+
+
+def main(argv=None):
+    import pandas as pd
+    from .batch import schedule_files, format_table
+    from .pipeline import Pipeline
+
+    parser = argparse.ArgumentParser(description="Propose room moves resolving double bookings of schedule files.")
+    parser.add_argument("input_dir", help="directory with .xlsx, .docx and .doc schedule files")
+    parser.add_argument("rooms", help="JSON file with room capacities and types")
+    parser.add_argument("--budget", type=float, default=5.0, help="time budget in seconds")
+    parser.add_argument("--json", help="save the proposals to this JSON file")
+    args = parser.parse_args(argv)
+
+    frames = [Pipeline(path).select(BOOKING_COLUMNS) for path in schedule_files(args.input_dir)]
+    data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=BOOKING_COLUMNS)
+    solution = RoomSolver(RoomCatalog.from_file(args.rooms), budget=args.budget).solve(data)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as json_file:
+            json.dump(solution.to_dict(), json_file, ensure_ascii=False, indent=4)
+    print(format_table(solution.to_dict()["moves"], ["course_name", "groups", "day_of_week", "lesson_number",
+                                                     "from_room", "to_room"]))
+    print("{moves} moves, {unresolved} conflicts left{budget}".format(
+        moves=len(solution.moves), unresolved=len(solution.unresolved),
+        budget="" if solution.complete else ", the time budget ran out"))
+    return 0 if not solution.unresolved else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+import re
+from collections import Counter, defaultdict, namedtuple
+
+FIELDS = ["course_name", "lecturer_name"]
+
+APOSTROPHES = re.compile(r"[’ʼ`‘]")
+
+NON_WORD = re.compile(r"[^\w']+")
+
+Match = namedtuple("Match", ["field", "text", "score", "sources"])
+Match.__doc__ = """
+A search result: the field and text of a course or lecturer name, its score from 0 to 1
+and the sources it was indexed from.
+"""
+
+
+def normalize(text: str):
+    """
+    Normalize a name for searching: lower case, one kind of apostrophe, no punctuation.
+
+    "доц. Іваненко І. І." and "доц Іваненко І.І." both become "доц іваненко і і".
+    """
+    return " ".join(NON_WORD.sub(" ", APOSTROPHES.sub("'", text.casefold())).split())
+
+
+def trigrams(text: str):
+    """
+    Get the trigrams of the words of a normalized text, with words padded so that prefixes weigh more.
+    """
+    grams = set()
+    for word in text.split():
+        padded = "  " + word + " "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class Term():
+    """
+    A class holding an indexed name.
+    """
+    __slots__ = ("field", "text", "normalized", "grams", "sources")
+
+    def __init__(self, field, text) -> None:
+        self.field = field
+        self.text = text
+        self.normalized = normalize(text)
+        self.grams = trigrams(self.normalized)
+        self.sources = set()
+
+
+class SearchIndex():
+    """
+    A class for fuzzy searching course and lecturer names with a trigram inverted index.
+
+    Every distinct name is indexed once, whatever the number of rows holding it. A query is split into trigrams,
+    names sharing them are found through the inverted index and ranked by the share of query trigrams they hold,
+    so partial names and typos are found without comparing the query with every name.
+
+    Names are indexed per source, such as a schedule file. Updating a source indexes its new names
+    and drops the names no other source holds.
+
+    Parameters:
+        fields (list): The columns to index. Default is FIELDS.
+
+    Methods:
+        update(self, source, data):
+            Replace the names indexed from a source.
+
+        remove(self, source):
+            Drop the names indexed from a source.
+
+        sources(self):
+            Get the indexed sources.
+
+        search(self, query, field=None, limit=10, min_score=0.5):
+            Find the names best matching a query.
+
+    """
+
+    def __init__(self, fields: list = None) -> None:
+        """
+        Initialize a SearchIndex instance.
+
+        Parameters:
+            fields (list): The columns to index. Default is FIELDS.
+
+        """
+        self.fields = FIELDS if fields is None else fields
+
+        self._terms = dict()
+        self._postings = defaultdict(set)
+        self._sources = defaultdict(set)
+
+    def __len__(self):
+        return len(self._terms)
+
+    def update(self, source, data):
+        """
+        Replace the names indexed from a source.
+
+        Parameters:
+            source (str): The source of the data, such as the path of a schedule file.
+
+            data (pd.DataFrame): The handled data with the indexed columns.
+
+        """
+        keys = set()
+        for field in self.fields:
+            for text in data[field].dropna().unique():
+                text = " ".join(str(text).split())
+                if text:
+                    keys.add((field, text))
+
+        for key in self._sources[source] - keys:
+            self._release(key, source)
+        for key in keys - self._sources[source]:
+            self._add(key, source)
+        self._sources[source] = keys
+
+    def remove(self, source):
+        """
+        Drop the names indexed from a source.
+        """
+        for key in self._sources.pop(source, set()):
+            self._release(key, source)
+
+    def sources(self):
+        """
+        Get the indexed sources.
+        """
+        return set(self._sources)
+
+    def search(self, query: str, field: str = None, limit: int = 10, min_score: float = 0.5):
+        """
+        Find the names best matching a query.
+
+        Parameters:
+            query (str): A full or partial name, possibly with typos.
+
+            field (str): The field to search in. All indexed fields if None.
+
+            limit (int): The largest number of results.
+
+            min_score (float): The smallest share of query trigrams a name must hold.
+
+        Returns:
+            list: Match objects, best first.
+        """
+        query_text = normalize(query)
+        grams = trigrams(query_text)
+        if not grams:
+            return []
+
+        common = Counter()
+        for gram in grams:
+            common.update(self._postings.get(gram, ()))
+
+        matches = []
+        for key, count in common.items():
+            term = self._terms[key]
+            if field is not None and term.field != field:
+                continue
+            score = count / len(grams)
+            if score < min_score:
+                continue
+            # the share of the name covered by the query breaks ties between names holding the whole query
+            dice = 2 * count / (len(grams) + len(term.grams))
+            matches.append((score, query_text in term.normalized, dice, term))
+
+        matches.sort(key=lambda match: match[:3], reverse=True)
+        return [Match(term.field, term.text, round(score, 3), sorted(term.sources))
+                for score, _, _, term in matches[:limit]]
+
+    def _add(self, key, source):
+        term = self._terms.get(key)
+        if term is None:
+            term = self._terms[key] = Term(*key)
+            for gram in term.grams:
+                self._postings[gram].add(key)
+        term.sources.add(source)
+
+    def _release(self, key, source):
+        term = self._terms[key]
+        term.sources.discard(source)
+        if term.sources:
+            return
+        del self._terms[key]
+        for gram in term.grams:
+            self._postings[gram].discard(key)
+            if not self._postings[gram]:
+                del self._postings[gram]
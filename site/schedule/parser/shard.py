@@ -0,0 +1,322 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from .batch import schedule_files, format_table
+from .errors import ErrorReport, describe
+from .watch import file_hash
+
+MANIFEST_VERSION = 1
+
+# relative conversion cost of a byte of each format: .doc files go through Word first,
+# .docx files are parsed straight from their XML
+FORMAT_COST = {
+    ".xlsx": 1.0,
+    ".docx": 0.5,
+    ".doc": 4.0
+}
+
+# the cost of opening any file, in bytes of .xlsx
+FILE_COST = 64 * 1024
+
+
+def file_cost(path, size: int):
+    """
+    Estimate the conversion cost of a schedule file from its size and format.
+    """
+    return size * FORMAT_COST.get(os.path.splitext(path)[1].lower(), 1.0) + FILE_COST
+
+
+def faculty_of(relative_path: str):
+    """
+    Get the faculty of a schedule file: its top directory, or the part of its name before the first "_"
+    for files at the top of the input directory, such as "Економіка" for "Економіка_БП-1_Осінь_2023–2024.xlsx".
+    """
+    parts = relative_path.replace(os.sep, "/").split("/")
+    if len(parts) > 1:
+        return parts[0]
+    return os.path.splitext(parts[0])[0].split("_")[0]
+
+
+def build_manifest(input_dir, shards: int):
+    """
+    Split the schedule files of a directory into shards of about the same conversion cost.
+
+    The files are assigned most expensive first, each to the cheapest shard so far, ties going to the lower shard,
+    so the same directory always gives the same manifest.
+
+    Parameters:
+        input_dir (str): The directory with schedule files.
+
+        shards (int): The number of shards, one per node.
+
+    Returns:
+        dict: The manifest with the keys "version", "input_dir", "shards", "costs" and "files". Every file has
+        the keys "file", "faculty", "size", "cost", "sha256" and "shard".
+    """
+    if shards < 1:
+        raise ValueError("shards should be at least 1")
+
+    files = []
+    for path in schedule_files(input_dir):
+        size = os.path.getsize(path)
+        relative_path = os.path.relpath(path, input_dir).replace(os.sep, "/")
+        files.append({"file": relative_path, "faculty": faculty_of(relative_path), "size": size,
+                      "cost": file_cost(path, size), "sha256": file_hash(path), "shard": None})
+
+    # copies of the same content go to the same shard and are converted once
+    contents = dict()
+    for entry in sorted(files, key=lambda entry: (-entry["cost"], entry["file"])):
+        contents.setdefault(entry["sha256"], []).append(entry)
+
+    costs = [0.0] * shards
+    for entries in contents.values():
+        shard = min(range(shards), key=lambda i: (costs[i], i))
+        for entry in entries:
+            entry["shard"] = shard
+        costs[shard] += entries[0]["cost"]
+
+    return {"version": MANIFEST_VERSION, "input_dir": os.path.abspath(input_dir), "shards": shards,
+            "costs": costs, "files": files}
+
+
+def save_json(path, data):
+    """
+    Save JSON atomically, so readers on other nodes never see a partial file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf8") as json_file:
+            json.dump(data, json_file, ensure_ascii=False, indent=4)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def load_json(path):
+    with open(path, encoding="utf8") as json_file:
+        return json.load(json_file)
+
+
+class ResultStore():
+    """
+    A class for a content-addressed directory of conversion results shared by the nodes.
+
+    A result is named by the SHA-256 of the schedule file and the conversion options, so identical files
+    are converted once whatever their names, and a result written by one node is found by all of them.
+    Results are written atomically, so an existing result is complete and a crashed node only redoes
+    the files whose results are missing.
+
+    Parameters:
+        root (str): The store directory, shared by the nodes.
+
+    Methods:
+        path(self, sha256, fen_spec):
+            Get the path of a result.
+
+        has(self, sha256, fen_spec):
+            Check if a result exists.
+
+        put(self, sha256, fen_spec, schedule, errors):
+            Save a result.
+
+        get(self, sha256, fen_spec):
+            Load a result.
+
+    """
+
+    def __init__(self, root) -> None:
+        self.root = root
+
+    def path(self, sha256: str, fen_spec: str = None, suffix: str = ".json"):
+        name = "{sha256}.{variant}{suffix}".format(sha256=sha256, variant=fen_spec or "all", suffix=suffix)
+        return os.path.join(self.root, "objects", sha256[:2], name)
+
+    def has(self, sha256: str, fen_spec: str = None):
+        return os.path.exists(self.path(sha256, fen_spec))
+
+    def put(self, sha256: str, fen_spec: str, schedule: dict, errors: list = None):
+        """
+        Save the schedule converted from a file, and the rows that failed if there are any.
+        """
+        if errors:
+            save_json(self.path(sha256, fen_spec, ".errors.json"), errors)
+        # the schedule goes last, its presence marks the file as done
+        save_json(self.path(sha256, fen_spec), schedule)
+
+    def get(self, sha256: str, fen_spec: str = None):
+        return load_json(self.path(sha256, fen_spec))
+
+
+def run_shard(manifest: dict, shard: int, store: ResultStore, fen_spec: str = None, tolerant: bool = False,
+              profiler=None, input_dir=None):
+    """
+    Convert the files of one shard whose results are not in the store yet.
+
+    Parameters:
+        manifest (dict): The manifest made by `build_manifest`.
+
+        shard (int): The shard of this node.
+
+        store (ResultStore): The shared result store.
+
+        fen_spec (str): The FEN specialization to filter data for. FEN mode is off if None.
+
+        tolerant (bool): Whether to skip the rows that fail instead of the whole file.
+
+        profiler (Profiler): The profiler recording the stages of every file. Nothing is recorded if None.
+
+        input_dir (str): Where this node mounts the input directory. The one of the manifest if None.
+
+    Returns:
+        list: A list of dictionaries with the keys "file", "rows", "bad_rows", "seconds", "cached" and "error",
+        one per file of the shard.
+    """
+    from .pipeline import Pipeline
+
+    if not 0 <= shard < manifest["shards"]:
+        raise ValueError("shard should be from 0 to {last}".format(last=manifest["shards"] - 1))
+
+    results = []
+    for entry in manifest["files"]:
+        if entry["shard"] != shard:
+            continue
+
+        result = {"file": entry["file"], "rows": None, "bad_rows": None, "seconds": None, "cached": False,
+                  "error": None}
+        results.append(result)
+        if store.has(entry["sha256"], fen_spec):
+            result["cached"] = True
+            continue
+
+        start = time.perf_counter()
+        try:
+            path = os.path.join(input_dir or manifest["input_dir"], entry["file"])
+            if file_hash(path) != entry["sha256"]:
+                raise Exception("file changed since the manifest was built")
+            errors = ErrorReport() if tolerant else None
+            pipeline = Pipeline(path, fen_mode=fen_spec is not None, spec=fen_spec, profiler=profiler,
+                                errors=errors)
+            store.put(entry["sha256"], fen_spec, pipeline.to_dict(), errors.errors if errors is not None else None)
+            result["rows"] = len(pipeline.stage("rows"))
+            if errors is not None:
+                result["bad_rows"] = len(errors)
+        except Exception as e:
+            result["error"] = describe(e)
+        result["seconds"] = time.perf_counter() - start
+    return results
+
+
+def merge_schedules(target: dict, schedule: dict):
+    """
+    Merge a nested schedule dictionary into another, concatenating the lessons of the same keys.
+    """
+    for key, value in schedule.items():
+        if isinstance(value, dict):
+            merge_schedules(target.setdefault(key, dict()), value)
+        else:
+            target.setdefault(key, []).extend(value)
+    return target
+
+
+def merge(manifest: dict, store: ResultStore, output_dir, fen_spec: str = None, partial: bool = False):
+    """
+    Assemble one schedule per faculty from the results of all shards.
+
+    Parameters:
+        manifest (dict): The manifest made by `build_manifest`.
+
+        store (ResultStore): The shared result store.
+
+        output_dir (str): The directory to save "<faculty>.json" files to.
+
+        fen_spec (str): The FEN specialization the results were converted with.
+
+        partial (bool): Whether to merge the finished files when some are missing instead of raising.
+
+    Returns:
+        dict: A dictionary mapping faculties to the relative paths of their merged files.
+
+    Raises:
+        Exception: If some files have no result and `partial` is False.
+    """
+    missing = [entry["file"] for entry in manifest["files"] if not store.has(entry["sha256"], fen_spec)]
+    if missing and not partial:
+        raise Exception("{count} files are not converted yet, such as {file}".format(count=len(missing),
+                                                                                    file=missing[0]))
+
+    done = set(entry["file"] for entry in manifest["files"]) - set(missing)
+    faculties = dict()
+    for entry in sorted(manifest["files"], key=lambda entry: entry["file"]):
+        if entry["file"] in done:
+            faculties.setdefault(entry["faculty"], []).append(entry)
+
+    outputs = dict()
+    for faculty, entries in faculties.items():
+        schedule = dict()
+        for entry in entries:
+            merge_schedules(schedule, store.get(entry["sha256"], fen_spec))
+        outputs[faculty] = [entry["file"] for entry in entries]
+        save_json(os.path.join(output_dir, faculty + ".json"), schedule)
+
+    save_json(os.path.join(output_dir, "merge.json"), {"faculties": outputs, "missing": missing})
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a directory of schedule files on several nodes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan = commands.add_parser("plan", help="split a directory into shards")
+    plan.add_argument("input_dir", help="directory with .xlsx, .docx and .doc schedule files")
+    plan.add_argument("manifest", help="manifest file to write")
+    plan.add_argument("--shards", type=int, required=True, help="number of shards, one per node")
+
+    run = commands.add_parser("run", help="convert the unfinished files of one shard")
+    run.add_argument("manifest", help="manifest file")
+    run.add_argument("store", help="shared result directory")
+    run.add_argument("--shard", type=int, required=True, help="shard of this node")
+    run.add_argument("--fen-spec", help='FEN specialization, one of ["мен","фін", "екон", "мар", "рб"]')
+    run.add_argument("--tolerant", action="store_true", help="skip failing rows instead of failing files")
+    run.add_argument("--input-dir", help="where this node mounts the input directory, if not where it was planned")
+
+    merge_parser = commands.add_parser("merge", help="assemble one schedule per faculty")
+    merge_parser.add_argument("manifest", help="manifest file")
+    merge_parser.add_argument("store", help="shared result directory")
+    merge_parser.add_argument("output_dir", help="directory to save <faculty>.json files to")
+    merge_parser.add_argument("--fen-spec", help="FEN specialization the shards were converted with")
+    merge_parser.add_argument("--partial", action="store_true", help="merge even if some files are missing")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "plan":
+        manifest = build_manifest(args.input_dir, args.shards)
+        save_json(args.manifest, manifest)
+        print(format_table([{"shard": shard, "files": sum(entry["shard"] == shard for entry in manifest["files"]),
+                             "cost": cost} for shard, cost in enumerate(manifest["costs"])],
+                           ["shard", "files", "cost"]))
+        return 0
+
+    manifest = load_json(args.manifest)
+    store = ResultStore(args.store)
+
+    if args.command == "run":
+        results = run_shard(manifest, args.shard, store, fen_spec=args.fen_spec, tolerant=args.tolerant,
+                            input_dir=args.input_dir)
+        print(format_table(results, ["file", "rows"] + (["bad_rows"] if args.tolerant else []) +
+                           ["seconds", "cached", "error"]))
+        return 0 if all(not r["error"] for r in results) else 1
+
+    outputs = merge(manifest, store, args.output_dir, fen_spec=args.fen_spec, partial=args.partial)
+    print(format_table([{"faculty": faculty, "files": len(files)} for faculty, files in outputs.items()],
+                       ["faculty", "files"]))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
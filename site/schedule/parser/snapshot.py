@@ -0,0 +1,396 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import warnings
+
+# numpy and pandas are imported where they are used to keep importing this module cheap
+
+STRING_COLUMNS = ["course_name", "lecturer_name", "group_name", "auditory_name", "day_of_week_name", "time",
+                  "table_name"]
+
+INTEGER_COLUMNS = {
+    "day_of_week": "int8",
+    "lesson_number": "int8",
+    "lesson_start": "int16",
+    "lesson_end": "int16"
+}
+
+INDEXED_COLUMNS = ["group_name", "auditory_name", "lecturer_name"]
+
+SORT_COLUMNS = ["group_name", "day_of_week", "lesson_number"]
+
+CURRENT = "CURRENT"
+
+# the largest week number of the 64-bit week masks of snapshots
+MAX_WEEK = 63
+
+
+def weeks_to_mask(weeks):
+    """
+    Convert a list of week numbers to a bit mask, bit n is set for week n.
+    """
+    mask = 0
+    for week in weeks:
+        mask |= 1 << int(week)
+    return mask
+
+
+def mask_to_weeks(mask):
+    """
+    Convert a bit mask of weeks to a sorted list of week numbers.
+    """
+    mask = int(mask)
+    return [week for week in range(mask.bit_length()) if mask >> week & 1]
+
+
+def bad_weeks(weeks):
+    """
+    Describe the week numbers that do not fit a 64-bit week mask, such as the weeks of a "1-100 тижні" cell.
+
+    Returns:
+        str or None: The reason, or None if all weeks fit.
+    """
+    bad = [int(week) for week in weeks if not 0 <= int(week) <= MAX_WEEK]
+    if not bad:
+        return None
+    return "weeks {weeks} outside 0-{max_week}".format(weeks=", ".join(map(str, bad[:5])), max_week=MAX_WEEK)
+
+
+def build_snapshot(data, directory, errors=None):
+    """
+    Save handled data as a snapshot directory of fixed-width column files.
+
+    String columns are saved as codes into one sorted string table, weeks as 64-bit masks,
+    and every indexed column gets the row order sorted by its codes for binary search.
+    Rows with weeks after MAX_WEEK are left out and reported in one warning, or in `errors` if given.
+
+    Parameters:
+        data (pd.DataFrame): The handled data. Missing columns of STRING_COLUMNS and INTEGER_COLUMNS are skipped.
+
+        directory (str): The directory to create.
+
+        errors (ErrorReport): The report collecting the rows left out.
+
+    Returns:
+        str: The directory.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if "weeks" in data.columns:
+        reasons = data["weeks"].map(bad_weeks)
+        failed = reasons.notna().to_numpy()
+        if failed.any():
+            if errors is not None:
+                errors.add_rows("snapshot", data[failed], "weeks", reasons[failed])
+            else:
+                warnings.warn("{rows} rows with weeks outside 0-{max_week} were left out of the snapshot".format(
+                    rows=int(failed.sum()), max_week=MAX_WEEK))
+            data = data[~failed]
+
+    data = data.sort_values([c for c in SORT_COLUMNS if c in data.columns], kind="stable")
+
+    string_columns = [c for c in STRING_COLUMNS if c in data.columns]
+    integer_columns = [c for c in INTEGER_COLUMNS if c in data.columns]
+
+    texts = {column: data[column].astype(object).where(data[column].notna(), "").map(str).to_numpy()
+             for column in string_columns}
+    strings = sorted(set().union(*(set(values) for values in texts.values()))) if texts else []
+
+    os.makedirs(directory)
+
+    encoded = [s.encode("utf8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    np.save(os.path.join(directory, "strings.offsets.npy"), offsets)
+    np.save(os.path.join(directory, "strings.blob.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    string_codes = pd.Index(strings)
+    for column in string_columns:
+        codes = string_codes.get_indexer(texts[column]).astype(np.uint32)
+        np.save(os.path.join(directory, column + ".npy"), codes)
+        if column in INDEXED_COLUMNS:
+            order = np.argsort(codes, kind="stable").astype(np.uint32)
+            np.save(os.path.join(directory, column + ".order.npy"), order)
+            np.save(os.path.join(directory, column + ".sorted.npy"), codes[order])
+
+    for column in integer_columns:
+        np.save(os.path.join(directory, column + ".npy"), data[column].to_numpy().astype(INTEGER_COLUMNS[column]))
+
+    if "weeks" in data.columns:
+        np.save(os.path.join(directory, "weeks.npy"), np.array([weeks_to_mask(w) for w in data["weeks"]],
+                                                                dtype=np.uint64))
+
+    meta = {
+        "rows": len(data),
+        "strings": string_columns,
+        "integers": integer_columns + (["weeks"] if "weeks" in data.columns else []),
+        "indexes": [c for c in INDEXED_COLUMNS if c in string_columns]
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf8") as meta_file:
+        json.dump(meta, meta_file)
+    return directory
+
+
+class Snapshot():
+    """
+    A class for reading a snapshot directory through memory maps.
+
+    Column files are mapped read-only, so processes opening the same snapshot share its pages
+    and nothing is deserialized until rows are decoded.
+
+    Parameters:
+        directory (str): The snapshot directory made by `build_snapshot`.
+
+    Attributes:
+        directory (str): The snapshot directory.
+
+        rows (int): The number of rows.
+
+        columns (dict): A dictionary mapping column names to their memory-mapped arrays.
+
+    Methods:
+        string(self, code):
+            Get a string of the string table.
+
+        code(self, value):
+            Find the code of a string.
+
+        find(self, column, value):
+            Find the rows with a value of an indexed column.
+
+        records(self, rows):
+            Decode rows into dictionaries.
+
+    """
+
+    def __init__(self, directory) -> None:
+        """
+        Initialize a Snapshot instance.
+
+        Parameters:
+            directory (str): The snapshot directory made by `build_snapshot`.
+
+        """
+        import numpy as np
+
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf8") as meta_file:
+            self.meta = json.load(meta_file)
+        self.rows = self.meta["rows"]
+
+        def load(name):
+            path = os.path.join(directory, name + ".npy")
+            # numpy cannot memory-map empty arrays
+            return np.load(path, mmap_mode="r" if os.path.getsize(path) > 128 else None)
+
+        self._offsets = load("strings.offsets")
+        self._blob = load("strings.blob")
+        self.columns = {column: load(column) for column in self.meta["strings"] + self.meta["integers"]}
+        self._indexes = {column: (load(column + ".order"), load(column + ".sorted")) for column in self.meta["indexes"]}
+
+    def __len__(self):
+        return self.rows
+
+    def string(self, code):
+        """
+        Get the string with a code of the string table.
+        """
+        return bytes(self._blob[self._offsets[code]:self._offsets[code + 1]]).decode("utf8")
+
+    def code(self, value: str):
+        """
+        Find the code of a string by binary search over the sorted string table.
+
+        Returns:
+            int: The code, or -1 if the string is not in the snapshot.
+        """
+        low, high = 0, len(self._offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self._offsets) - 1 and self.string(low) == value else -1
+
+    def find(self, column: str, value: str):
+        """
+        Find the rows with a value of an indexed column.
+
+        Parameters:
+            column (str): One of the indexed columns, such as "group_name", "auditory_name" or "lecturer_name".
+
+            value (str): The value to look for.
+
+        Returns:
+            np.ndarray: The row numbers, in schedule order.
+        """
+        import numpy as np
+
+        order, sorted_codes = self._indexes[column]
+        code = self.code(value)
+        if code < 0:
+            return np.empty(0, dtype=np.uint32)
+        start, end = np.searchsorted(sorted_codes, [code, code + 1])
+        return np.sort(order[start:end])
+
+    def records(self, rows):
+        """
+        Decode rows into dictionaries.
+
+        Parameters:
+            rows (iterable): The row numbers.
+
+        Returns:
+            list: One dictionary per row, with the weeks as a list of week numbers.
+        """
+        records = []
+        for row in rows:
+            record = {column: self.string(self.columns[column][row]) for column in self.meta["strings"]}
+            for column in self.meta["integers"]:
+                value = self.columns[column][row]
+                record[column] = mask_to_weeks(value) if column == "weeks" else int(value)
+            records.append(record)
+        return records
+
+
+class SnapshotStore():
+    """
+    A class for publishing snapshot versions and switching readers to the newest one atomically.
+
+    Every version is a directory of the store. The CURRENT file names the published version and is replaced
+    with `os.replace`, so a reader sees either the old or the new version, never a partial one.
+
+    Parameters:
+        root (str): The store directory.
+
+        keep (int): The number of versions kept on disk, older ones are removed after publishing. The version
+            the CURRENT file named before a publish is always kept, as readers may still be opening it.
+
+    Methods:
+        publish(self, data):
+            Build a snapshot of handled data and make it the current version.
+
+        current_version(self):
+            Get the name of the current version.
+
+        open(self):
+            Open the current version.
+
+        refresh(self, snapshot):
+            Reopen the current version if it changed.
+
+    """
+
+    def __init__(self, root, keep: int = 2) -> None:
+        self.root = root
+        self.keep = keep
+        os.makedirs(root, exist_ok=True)
+
+    def versions(self):
+        return sorted(name for name in os.listdir(self.root) if name.startswith("v") and name[1:].isdigit())
+
+    def current_version(self):
+        """
+        Get the name of the current version.
+
+        Returns:
+            str or None: The version directory name, or None if nothing was published.
+        """
+        try:
+            with open(os.path.join(self.root, CURRENT), encoding="utf8") as current_file:
+                return current_file.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def publish(self, data, errors=None):
+        """
+        Build a snapshot of handled data and make it the current version.
+
+        Parameters:
+            data (pd.DataFrame): The handled data.
+
+            errors (ErrorReport): The report collecting the rows left out of the snapshot.
+
+        Returns:
+            str: The name of the new version.
+        """
+        building = tempfile.mkdtemp(prefix=".build-", dir=self.root)
+        build_snapshot(data, os.path.join(building, "snapshot"), errors)
+
+        versions = self.versions()
+        number = int(versions[-1][1:]) + 1 if versions else 1
+        while True:
+            version = "v{number:08d}".format(number=number)
+            try:
+                os.rename(os.path.join(building, "snapshot"), os.path.join(self.root, version))
+                break
+            except OSError:
+                # another process published this number first
+                number += 1
+        os.rmdir(building)
+
+        replaced = self.current_version()
+        fd, current_path = tempfile.mkstemp(prefix=".current-", dir=self.root)
+        with os.fdopen(fd, "w", encoding="utf8") as current_file:
+            current_file.write(version)
+        os.replace(current_path, os.path.join(self.root, CURRENT))
+
+        self._prune({version, replaced})
+        return version
+
+    def open(self):
+        """
+        Open the current version.
+
+        Raises:
+            FileNotFoundError: If nothing was published.
+        """
+        version = self.current_version()
+        if version is None:
+            raise FileNotFoundError("no snapshot was published to {root}".format(root=self.root))
+        return Snapshot(os.path.join(self.root, version))
+
+    def refresh(self, snapshot: Snapshot):
+        """
+        Reopen the current version if it is not the given snapshot.
+
+        Returns:
+            Snapshot: The given snapshot if it is current, the current one otherwise.
+        """
+        version = self.current_version()
+        if version is None or os.path.join(self.root, version) == snapshot.directory:
+            return snapshot
+        return Snapshot(os.path.join(self.root, version))
+
+    def _prune(self, protected):
+        # readers keep the pages of removed versions they have mapped, but a reader that read the replaced CURRENT
+        # file may not have opened its version yet, so the current and the replaced versions are never removed
+        versions = self.versions()
+        old = [version for version in versions if version not in protected]
+        for version in old[:max(0, len(versions) - self.keep)]:
+            shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
+
+
+def main(argv=None):
+    import pandas as pd
+    from .batch import schedule_files
+    from .pipeline import Pipeline
+
+    parser = argparse.ArgumentParser(description="Publish a snapshot of a directory of schedule files.")
+    parser.add_argument("input_dir", help="directory with .xlsx, .docx and .doc schedule files")
+    parser.add_argument("store", help="snapshot store directory")
+    parser.add_argument("--keep", type=int, default=2, help="number of versions kept on disk")
+    args = parser.parse_args(argv)
+
+    frames = [Pipeline(path).select() for path in schedule_files(args.input_dir)]
+    data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    version = SnapshotStore(args.store, keep=args.keep).publish(data)
+    print("{store}: {version}, {rows} rows".format(store=args.store, version=version, rows=len(data)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+from collections import namedtuple
+
+from .groups import LECTURE
+from .search import normalize
+from .snapshot import weeks_to_mask, mask_to_weeks
+
+LESSON_COLUMNS = ["course_name", "group_name", "day_of_week", "lesson_number", "weeks", "lecturer_name",
+                  "auditory_name"]
+
+Lesson = namedtuple("Lesson", ["course_name", "group_name", "day_of_week", "lesson_number", "mask", "lecturer_name",
+                               "auditory_name"])
+Lesson.__doc__ = """
+A lesson of the timetable index, with its weeks as a bit mask where bit n is set for week n.
+"""
+
+Clash = namedtuple("Clash", ["day_of_week", "lesson_number", "mask", "lessons"])
+Clash.__doc__ = """
+Two lessons held in the same slot in the weeks of `mask`.
+"""
+
+
+def group_key(group):
+    return " ".join(str(group).split()).casefold()
+
+
+def lesson_to_dict(lesson: Lesson):
+    """
+    Convert a Lesson into a dictionary of JSON types, with the weeks as a list of week numbers.
+    """
+    return {
+        "course_name": lesson.course_name,
+        "group_name": lesson.group_name,
+        "day_of_week": lesson.day_of_week,
+        "lesson_number": lesson.lesson_number,
+        "weeks": mask_to_weeks(lesson.mask),
+        "lecturer_name": lesson.lecturer_name,
+        "auditory_name": lesson.auditory_name
+    }
+
+
+def occurrence(lesson: Lesson):
+    return lesson.course_name, lesson.day_of_week, lesson.lesson_number, lesson.auditory_name
+
+
+class Timetable():
+    """
+    A class holding the lessons of a set of selections, ordered by day and lesson number, and their clashes.
+
+    Attributes:
+        lessons (list): The Lesson objects.
+
+        clashes (list): The Clash objects, one per pair of lessons sharing a slot in some week. Lessons of one course
+            in one room are held together and do not clash.
+
+        unknown (list): The selections that matched no lesson.
+
+    """
+
+    def __init__(self, lessons: list, unknown: list = None) -> None:
+        # a lecture reached through several groups of its course is one lesson
+        self.lessons = sorted(dict.fromkeys(lessons), key=lambda lesson: (lesson.day_of_week, lesson.lesson_number,
+                                                                          lesson.course_name, lesson.group_name))
+        self.unknown = [] if unknown is None else unknown
+
+        self.clashes = []
+        slot = []
+        for lesson in self.lessons + [None]:
+            if slot and (lesson is None or
+                         (lesson.day_of_week, lesson.lesson_number) != (slot[0].day_of_week, slot[0].lesson_number)):
+                for i, first in enumerate(slot):
+                    for second in slot[i + 1:]:
+                        # lessons of one course in one room are the same occurrence, not a clash
+                        if occurrence(first) != occurrence(second) and first.mask & second.mask:
+                            self.clashes.append(Clash(first.day_of_week, first.lesson_number,
+                                                      first.mask & second.mask, (first, second)))
+                slot = []
+            if lesson is not None:
+                slot.append(lesson)
+
+    def to_dict(self):
+        """
+        Convert the timetable into a dictionary of JSON types.
+        """
+        return {
+            "lessons": [lesson_to_dict(lesson) for lesson in self.lessons],
+            "clashes": [{"day_of_week": clash.day_of_week, "lesson_number": clash.lesson_number,
+                         "weeks": mask_to_weeks(clash.mask), "lessons": [lesson_to_dict(l) for l in clash.lessons]}
+                        for clash in self.clashes],
+            "unknown": [list(selection) for selection in self.unknown]
+        }
+
+
+class TimetableIndex():
+    """
+    A class for composing personal timetables from (course, group) selections.
+
+    The index maps every course and group to its lessons, with weeks kept as bit masks, so two lessons clash
+    when they share a day and lesson number and their masks intersect. A selection holds the lessons
+    of its group and the lectures of its course. The slots of every selection are merged once and cached,
+    so checking a combination of selections for clashes costs a few dictionary lookups and AND operations.
+
+    Lessons are indexed per source, such as a schedule file. Updating a source replaces its lessons.
+
+    Methods:
+        update(self, source, data):
+            Replace the lessons indexed from a source.
+
+        remove(self, source):
+            Drop the lessons indexed from a source.
+
+        lessons(self, course, group):
+            Get the lessons of a selection.
+
+        compose(self, selections):
+            Merge the lessons of selections into one timetable.
+
+        has_clash(self, selections):
+            Check if the lessons of selections clash.
+
+        clash_free(self, options, limit):
+            Find the combinations of groups without clashes.
+
+    """
+
+    def __init__(self) -> None:
+        # (course key, group key) -> source -> lessons
+        self._lessons = dict()
+        self._sources = dict()
+        self._slots = dict()
+
+    def __len__(self):
+        return len(self._lessons)
+
+    def update(self, source, data):
+        """
+        Replace the lessons indexed from a source.
+
+        Parameters:
+            source (str): The source of the data, such as the path of a schedule file.
+
+            data (pd.DataFrame): The handled data with the columns of LESSON_COLUMNS.
+
+        """
+        self.remove(source)
+
+        keys = set()
+        for row in data[LESSON_COLUMNS].itertuples(index=False):
+            if not isinstance(row.course_name, str) or not row.course_name.strip():
+                continue
+            course_name = " ".join(row.course_name.split())
+            key = (normalize(course_name), group_key(row.group_name))
+            lesson = Lesson(course_name, str(row.group_name), int(row.day_of_week), int(row.lesson_number),
+                            weeks_to_mask(row.weeks), row.lecturer_name, row.auditory_name)
+            self._lessons.setdefault(key, dict()).setdefault(source, []).append(lesson)
+            keys.add(key)
+
+        self._sources[source] = keys
+        self._slots.clear()
+
+    def remove(self, source):
+        """
+        Drop the lessons indexed from a source.
+        """
+        for key in self._sources.pop(source, set()):
+            sources = self._lessons[key]
+            sources.pop(source, None)
+            if not sources:
+                del self._lessons[key]
+        self._slots.clear()
+
+    def sources(self):
+        return set(self._sources)
+
+    def lessons(self, course: str, group: str = None, lectures: bool = True):
+        """
+        Get the lessons of a selection: the lessons of the group and the lectures of the course.
+
+        Parameters:
+            course (str): The course name, compared case-insensitively.
+
+            group (str): The group name, such as "2". Only the lectures if None.
+
+            lectures (bool): Whether to add the lectures of the course to the lessons of the group.
+
+        Returns:
+            list: The Lesson objects, each lesson once.
+        """
+        course_key = normalize(course)
+        if group is None or group_key(group) == LECTURE:
+            groups = [LECTURE]
+        else:
+            groups = [group_key(group), LECTURE] if lectures else [group_key(group)]
+
+        lessons = dict()
+        for key in groups:
+            for source_lessons in self._lessons.get((course_key, key), dict()).values():
+                for lesson in source_lessons:
+                    lessons.setdefault((lesson.day_of_week, lesson.lesson_number, lesson.mask, lesson.group_name,
+                                        lesson.auditory_name), lesson)
+        return list(lessons.values())
+
+    def slots(self, course: str, group: str = None, lectures: bool = True):
+        """
+        Get the weeks of every slot of a selection.
+
+        Returns:
+            dict: A dictionary mapping (day_of_week, lesson_number) to week masks.
+        """
+        key = (normalize(course), None if group is None else group_key(group), lectures)
+        if key not in self._slots:
+            slots = dict()
+            for lesson in self.lessons(course, group, lectures):
+                slot = (lesson.day_of_week, lesson.lesson_number)
+                slots[slot] = slots.get(slot, 0) | lesson.mask
+            self._slots[key] = slots
+        return self._slots[key]
+
+    def compose(self, selections):
+        """
+        Merge the lessons of selections into one timetable.
+
+        Parameters:
+            selections (iterable): (course, group) tuples.
+
+        Returns:
+            Timetable: The lessons ordered by day and lesson number, with their clashes.
+        """
+        lessons = []
+        unknown = []
+        for course, group in selections:
+            selected = self.lessons(course, group)
+            if not selected:
+                unknown.append((course, group))
+            lessons.extend(selected)
+        return Timetable(lessons, unknown)
+
+    def has_clash(self, selections):
+        """
+        Check if the lessons of different selections share a slot in some week.
+
+        Parameters:
+            selections (iterable): (course, group) tuples.
+
+        Returns:
+            bool: True if two selections clash.
+        """
+        occupied = dict()
+        courses = set()
+        for course, group in selections:
+            # the lectures of a course selected with several groups are attended once
+            lectures = normalize(course) not in courses
+            courses.add(normalize(course))
+            for slot, mask in self.slots(course, group, lectures).items():
+                taken = occupied.get(slot, 0)
+                if taken & mask:
+                    return True
+                occupied[slot] = taken | mask
+        return False
+
+    def clash_free(self, options: dict, limit: int = None):
+        """
+        Find the combinations of one group per course without clashes.
+
+        Courses with fewer groups are placed first and a combination is abandoned at its first clash,
+        so clashing branches are not enumerated.
+
+        Parameters:
+            options (dict): A dictionary mapping course names to the groups to choose from.
+
+            limit (int): The largest number of combinations to find. All of them if None.
+
+        Returns:
+            list: Lists of (course, group) tuples, in the order of `options`.
+        """
+        courses = sorted(options, key=lambda course: len(options[course]))
+        found = []
+
+        def search(position, occupied, chosen):
+            if limit is not None and len(found) >= limit:
+                return
+            if position == len(courses):
+                found.append([(course, chosen[course]) for course in options])
+                return
+
+            course = courses[position]
+            for group in options[course]:
+                slots = self.slots(course, group)
+                if any(occupied.get(slot, 0) & mask for slot, mask in slots.items()):
+                    continue
+                merged = dict(occupied)
+                for slot, mask in slots.items():
+                    merged[slot] = merged.get(slot, 0) | mask
+                chosen[course] = group
+                search(position + 1, merged, chosen)
+
+        search(0, dict(), dict())
+        return found
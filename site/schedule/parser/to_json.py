@@ -1,9 +1,4 @@
-import json
-import os
-
-from scheduler.read import AbsoluteReader
-from scheduler.handle import Handler, to_dict
-import scheduler.cols as cols
+from .pipeline import Pipeline
 
 def file_to_json(data_path, json_path = "data.json", fen_mode = False, fen_spec = None):
     """
@@ -19,19 +14,7 @@ def file_to_json(data_path, json_path = "data.json", fen_mode = False, fen_spec
         fen_spec (str): The specialization (required if in FEN mode). One of ["мен","фін", "екон", "мар", "рб"].
 
     """
-    data = AbsoluteReader(os.path.abspath(data_path)).read()
-    handler = Handler(data)
-    if fen_mode:
-        handler.handle(fen_mode=True, spec=fen_spec)
-    else:
-        handler.handle()
-    schedule = to_dict(handler.data, [cols.COURSE, cols.GROUPS, cols.DAYS_OF_WEEKS], {"час": cols.TIME, 
-                                                        "аудиторія": cols.LECT_HALL, 
-                                                        "тижні": cols.WEEKS})
-    
-    with open(os.path.abspath(json_path), 'w', encoding='utf8') as json_file:
-        json.dump(schedule, json_file, ensure_ascii=False, indent=4)
-    
+    Pipeline(data_path, fen_mode=fen_mode, spec=fen_spec).to_json(json_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+CATEGORICAL_COLUMNS = [
+    "day_of_week_name",
+    "time",
+    "group_name",
+    "auditory_name",
+    "course_name",
+    "lecturer_name"
+]
+
+
+def memory_usage(data: "pd.DataFrame", columns: list = None):
+    """
+    Measure the memory used by the columns of a data frame, including the Python strings they hold.
+
+    Parameters:
+        data (pd.DataFrame): The data frame to measure.
+
+        columns (list): The columns to measure. All columns by default.
+
+    Returns:
+        dict: A dictionary mapping column names to their size in bytes.
+    """
+    columns = list(data.columns) if columns is None else columns
+    usage = data[columns].memory_usage(index=False, deep=True)
+    return {column: int(usage[column]) for column in columns}
+
+
+class Vocabulary():
+    """
+    A class for dictionary-encoding string columns with categories shared across data frames.
+
+    Every frame encoded with the same vocabulary uses the same category order for a column,
+    so frames from many files can be combined with `concat` without re-encoding their strings.
+    Categories are only ever appended, which keeps the codes of already encoded frames valid.
+
+    Parameters:
+        columns (list): The columns to encode. Default is CATEGORICAL_COLUMNS.
+
+    Attributes:
+        columns (list): The columns to encode.
+
+        categories (dict): A dictionary mapping column names to the list of their known values.
+
+    Methods:
+        encode(self, data):
+            Convert the columns of a data frame to categorical columns.
+
+        dtype(self, column):
+            Get the current categorical dtype of a column.
+
+        concat(self, frames):
+            Combine several encoded data frames into one.
+
+    """
+
+    def __init__(self, columns: list = None) -> None:
+        """
+        Initialize a Vocabulary instance.
+
+        Parameters:
+            columns (list): The columns to encode. Default is CATEGORICAL_COLUMNS.
+
+        """
+        self.columns = list(CATEGORICAL_COLUMNS if columns is None else columns)
+        self.categories = {column: [] for column in self.columns}
+        self._codes = {column: dict() for column in self.columns}
+
+    def add(self, column, values):
+        """
+        Add unknown values to the categories of a column.
+
+        Parameters:
+            column (str): The column name.
+
+            values (iterable): The values to add.
+
+        """
+        categories = self.categories[column]
+        codes = self._codes[column]
+        for value in values:
+            if value not in codes:
+                codes[value] = len(categories)
+                categories.append(value)
+
+    def dtype(self, column):
+        """
+        Get the current categorical dtype of a column.
+
+        Parameters:
+            column (str): The column name.
+
+        Returns:
+            pd.CategoricalDtype: The dtype with all values known for the column.
+        """
+        import pandas as pd
+
+        return pd.CategoricalDtype(self.categories[column])
+
+    def encode(self, data: "pd.DataFrame"):
+        """
+        Convert the columns of a data frame to categorical columns.
+
+        Parameters:
+            data (pd.DataFrame): The data frame to encode. Columns missing from it are skipped.
+
+        Returns:
+            pd.DataFrame: The encoded data frame.
+        """
+        import pandas as pd
+
+        data = data.copy()
+        for column in self.columns:
+            if column not in data.columns:
+                continue
+            values = data[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                self.add(column, values.cat.categories)
+                data[column] = values.cat.set_categories(self.categories[column])
+            else:
+                values = values.where(values.notna(), None)
+                self.add(column, values.dropna().unique())
+                data[column] = values.astype(self.dtype(column))
+        return data
+
+    def concat(self, frames: list):
+        """
+        Combine several encoded data frames into one.
+
+        Frames encoded before the vocabulary grew are brought to the final categories first,
+        which remaps their integer codes without touching the strings.
+
+        Parameters:
+            frames (list): The data frames encoded with this vocabulary.
+
+        Returns:
+            pd.DataFrame: The combined data frame with categorical columns.
+        """
+        import pandas as pd
+
+        aligned = []
+        for frame in frames:
+            frame = frame.copy()
+            for column in self.columns:
+                if column in frame.columns and isinstance(frame[column].dtype, pd.CategoricalDtype):
+                    frame[column] = frame[column].cat.set_categories(self.categories[column])
+            aligned.append(frame)
+        return pd.concat(aligned, ignore_index=True)
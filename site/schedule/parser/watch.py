@@ -0,0 +1,436 @@
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import struct
+import sys
+import time
+
+from .batch import EXTENSIONS
+
+# inotify event masks, see inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_schedule_file(path):
+    """
+    Check if a path is a schedule file and not an Office lock or temporary file such as "~$file.docx".
+    """
+    name = os.path.basename(path)
+    return os.path.splitext(name)[1] in EXTENSIONS and not name.startswith("~")
+
+
+def file_hash(path):
+    """
+    Compute the SHA-256 hash of a file content.
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class PollingBackend():
+    """
+    A class for detecting changed files by rescanning a directory.
+
+    Parameters:
+        directory (str): The directory to watch recursively.
+
+        interval (float): The time between scans in seconds.
+
+    """
+
+    def __init__(self, directory, interval: float = 1.0) -> None:
+        self.directory = directory
+        self.interval = interval
+        self._stats = self._scan()
+
+    def _scan(self):
+        stats = dict()
+        for root, dirs, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def wait(self, timeout: float):
+        """
+        Wait for changes.
+
+        Parameters:
+            timeout (float): The longest time to wait in seconds.
+
+        Returns:
+            set: The paths that were created, modified or deleted.
+        """
+        time.sleep(min(timeout, self.interval))
+        stats = self._scan()
+        changed = {path for path in stats.keys() | self._stats.keys() if stats.get(path) != self._stats.get(path)}
+        self._stats = stats
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyBackend():
+    """
+    A class for detecting changed files with Linux inotify.
+
+    Parameters:
+        directory (str): The directory to watch recursively.
+
+    Raises:
+        OSError: If inotify is not available.
+
+    """
+
+    def __init__(self, directory) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is only available on Linux")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._directories = dict()
+        for root, dirs, names in os.walk(directory):
+            self._add_watch(root)
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed for {directory}".format(directory=directory))
+        self._directories[wd] = directory
+
+    def wait(self, timeout: float):
+        """
+        Wait for changes.
+
+        Parameters:
+            timeout (float): The longest time to wait in seconds.
+
+        Returns:
+            set: The paths that were created, modified or deleted.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_DELETE_SELF:
+                del self._directories[wd]
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    for root, dirs, names in os.walk(path):
+                        self._add_watch(root)
+                        changed.update(os.path.join(root, n) for n in names)
+            else:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class Watcher():
+    """
+    A class for watching a schedule directory and passing only changed files on.
+
+    A file is passed on once it has not changed for `debounce` seconds, so partially written files are skipped.
+    Office lock files and files whose content did not change since they were last passed on are skipped too.
+    A file that cannot be read yet, for example because it is locked, is retried after `debounce` seconds.
+
+    The content hashes are saved to `state_path`, so a restarted watcher only passes on the files changed
+    while it was off, and reports the files deleted meanwhile.
+
+    Parameters:
+        directory (str): The directory to watch recursively.
+
+        on_change (callable): Called with the path of every changed schedule file.
+
+        on_delete (callable): Called with the path of every deleted schedule file. Optional.
+
+        debounce (float): The time in seconds a file must stay unchanged before it is passed on.
+
+        polling (bool): Whether to rescan the directory instead of using inotify.
+
+        poll_interval (float): The time between scans in seconds when polling.
+
+        state_path (str): The JSON file to keep the content hashes in between runs. Kept in memory only if None.
+
+        known (iterable): Paths passed on by earlier runs, such as the source files of imported courses.
+            The ones missing from the directory are passed to `on_delete` by `scan`.
+
+    Attributes:
+        hashes (dict): A dictionary mapping paths to the content hashes they were last passed on with.
+
+    Methods:
+        scan(self):
+            Pass on every schedule file that differs from the one passed on last time.
+
+        poll(self, timeout):
+            Wait for changes and pass on the settled files.
+
+        run(self):
+            Watch the directory until interrupted.
+
+    """
+
+    def __init__(self, directory, on_change, on_delete=None, debounce: float = 2.0, polling: bool = False,
+                 poll_interval: float = 1.0, state_path: str = None, known=()) -> None:
+        """
+        Initialize a Watcher instance.
+
+        Parameters:
+            directory (str): The directory to watch recursively.
+
+            on_change (callable): Called with the path of every changed schedule file.
+
+            on_delete (callable): Called with the path of every deleted schedule file. Optional.
+
+            debounce (float): The time in seconds a file must stay unchanged before it is passed on.
+
+            polling (bool): Whether to rescan the directory instead of using inotify.
+
+            poll_interval (float): The time between scans in seconds when polling.
+
+            state_path (str): The JSON file to keep the content hashes in between runs. Kept in memory only if None.
+
+            known (iterable): Paths passed on by earlier runs, such as the source files of imported courses.
+                The ones missing from the directory are passed to `on_delete` by `scan`.
+
+        """
+        from .shard import load_json
+
+        self.directory = os.path.abspath(directory)
+        self.on_change = on_change
+        self.on_delete = on_delete
+        self.debounce = debounce
+        self.state_path = state_path
+        self.hashes = dict()
+        if state_path is not None and os.path.exists(state_path):
+            self.hashes = load_json(state_path)["hashes"]
+        self.known = {os.path.abspath(path) for path in known}
+
+        self.backend = None
+        if not polling:
+            try:
+                self.backend = InotifyBackend(self.directory)
+            except OSError:
+                self.backend = None
+        if self.backend is None:
+            self.backend = PollingBackend(self.directory, poll_interval)
+
+        self._pending = dict()
+
+    def scan(self):
+        """
+        Pass on every schedule file that differs from the one passed on last time,
+        and every known file deleted since then.
+        """
+        found = set()
+        for root, dirs, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if is_schedule_file(path):
+                    found.add(path)
+                    self._settle(path)
+
+        inside = self.directory + os.sep
+        for path in sorted((self.hashes.keys() | self.known) - found):
+            if path.startswith(inside) and not os.path.exists(path):
+                self._delete(path)
+
+    def poll(self, timeout: float = 1.0):
+        """
+        Wait for changes and pass on the settled files.
+
+        Parameters:
+            timeout (float): The longest time to wait for changes in seconds.
+
+        """
+        now = time.monotonic()
+        for path in self.backend.wait(timeout):
+            if is_schedule_file(path):
+                self._pending[path] = (now, self._stat(path))
+
+        now = time.monotonic()
+        for path, (changed_at, stat) in list(self._pending.items()):
+            if now - changed_at < self.debounce:
+                continue
+            current = self._stat(path)
+            if current != stat:
+                # still being written
+                self._pending[path] = (now, current)
+                continue
+            del self._pending[path]
+            self._settle(path)
+
+    def run(self):
+        """
+        Pass on the files changed while the watcher was off, then watch the directory until interrupted.
+        """
+        self.scan()
+        try:
+            while True:
+                self.poll(timeout=min(1.0, self.debounce))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.backend.close()
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _settle(self, path):
+        try:
+            content_hash = file_hash(path)
+        except FileNotFoundError:
+            if path in self.hashes or path in self.known:
+                self._delete(path)
+            return
+        except OSError:
+            # locked or still being replaced, retried once it stays unchanged again
+            self._pending[path] = (time.monotonic(), self._stat(path))
+            return
+
+        if self.hashes.get(path) == content_hash:
+            return
+        self.hashes[path] = content_hash
+        self._save()
+        self.on_change(path)
+
+    def _delete(self, path):
+        self.hashes.pop(path, None)
+        self.known.discard(path)
+        self._save()
+        if self.on_delete:
+            self.on_delete(path)
+
+    def _save(self):
+        from .shard import save_json
+
+        if self.state_path is not None:
+            save_json(self.state_path, {"hashes": self.hashes})
+
+
+class JSONSink():
+    """
+    A class for converting changed schedule files to JSON files.
+
+    Parameters:
+        directory (str): The watched directory.
+
+        output_dir (str): The directory to save JSON files to, keeping the relative paths of the inputs.
+
+        fen_spec (str): The FEN specialization to filter data for. FEN mode is off if None.
+
+    """
+
+    def __init__(self, directory, output_dir, fen_spec: str = None) -> None:
+        self.directory = os.path.abspath(directory)
+        self.output_dir = output_dir
+        self.fen_spec = fen_spec
+
+    def json_path(self, path):
+        relative_path = os.path.relpath(path, self.directory)
+        return os.path.join(self.output_dir, os.path.splitext(relative_path)[0] + ".json")
+
+    def on_change(self, path):
+        from .pipeline import Pipeline
+
+        json_path = self.json_path(path)
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        Pipeline(path, fen_mode=self.fen_spec is not None, spec=self.fen_spec).to_json(json_path)
+
+    def on_delete(self, path):
+        json_path = self.json_path(path)
+        if os.path.exists(json_path):
+            os.remove(json_path)
+
+
+def report_errors(function):
+    """
+    Wrap a watcher callback so that a file failing to import or delete is reported instead of stopping the watcher.
+    """
+
+    def wrapper(path):
+        start = time.perf_counter()
+        try:
+            function(path)
+        except Exception as e:
+            print("{path}: {name}: {e}".format(path=path, name=type(e).__name__, e=e), file=sys.stderr)
+        else:
+            print("{path}: {seconds:.2f} s".format(path=path, seconds=time.perf_counter() - start))
+
+    return wrapper
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert schedule files to JSON whenever they change.")
+    parser.add_argument("directory", help="directory with .xlsx, .docx and .doc schedule files")
+    parser.add_argument("output_dir", help="directory to save JSON files to")
+    parser.add_argument("--fen-spec", help='FEN specialization, one of ["мен","фін", "екон", "мар", "рб"]')
+    parser.add_argument("--debounce", type=float, default=2.0, help="seconds a file must stay unchanged")
+    parser.add_argument("--poll", action="store_true", help="rescan the directory instead of using inotify")
+    parser.add_argument("--state", help="JSON file to keep the content hashes of converted files in between runs, "
+                                        "<output_dir>/.watch_state.json by default")
+    args = parser.parse_args(argv)
+
+    sink = JSONSink(args.directory, args.output_dir, fen_spec=args.fen_spec)
+    state_path = args.state or os.path.join(args.output_dir, ".watch_state.json")
+    watcher = Watcher(args.directory, report_errors(sink.on_change), on_delete=report_errors(sink.on_delete),
+                      debounce=args.debounce, polling=args.poll, state_path=state_path)
+    print("watching {directory} ({backend})".format(directory=watcher.directory,
+                                                     backend=type(watcher.backend).__name__))
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()
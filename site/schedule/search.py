@@ -0,0 +1,46 @@
+import pandas as pd
+
+from .parser.search import SearchIndex
+from .sources import SourceIndex
+
+
+class CourseSearch(SourceIndex):
+    """
+    A class for searching the course and lecturer names of Courses.
+
+    Every search first reloads the names of the source files changed in the database since the previous one,
+    so imports made by other processes, such as the watcher, show up. Imports made in this process update
+    the index right away.
+
+    Methods:
+        search(self, query, field=None, limit=10):
+            Find the names best matching a query.
+
+        update_file(self, path, data):
+            Index the names of a freshly imported file.
+
+        remove_file(self, path):
+            Drop the names of a deleted file.
+
+    """
+
+    def __init__(self) -> None:
+        super().__init__(SearchIndex())
+
+    def frame(self, courses):
+        rows = courses.values_list("source_file", "course_name", "lector_name").distinct()
+        return pd.DataFrame.from_records(list(rows), columns=["source_file", "course_name", "lecturer_name"])
+
+    def search(self, query: str, field: str = None, limit: int = 10):
+        """
+        Find the names best matching a query.
+
+        Returns:
+            list: Match objects, best first.
+        """
+        self.sync()
+        with self._lock:
+            return self.index.search(query, field=field, limit=limit)
+
+
+course_search = CourseSearch()
@@ -0,0 +1,152 @@
+import threading
+
+from django.db.models import Count, F, Max
+
+from .models import Courses, SourceFiles
+
+
+def source_versions(sources=None):
+    """
+    Get the version of every source file of Courses, or of some of them.
+
+    A version changes whenever rows of the file are inserted, deleted or updated in place, by any process:
+    it is made of the number of rows, the largest row id and the import counter of SourceFiles.
+
+    Parameters:
+        sources (iterable): The source files to get the versions of. All of them if None.
+
+    Returns:
+        dict: A dictionary mapping source files ("" for rows without one) to versions.
+    """
+    courses = Courses.objects.all()
+    files = SourceFiles.objects.all()
+    if sources is not None:
+        sources = set(sources)
+        courses = courses.filter(source_file__in=[source for source in sources if source])
+        if "" in sources:
+            courses = courses | Courses.objects.filter(source_file__isnull=True)
+        files = files.filter(source_file__in=sources)
+
+    counters = dict(files.values_list("source_file", "version"))
+    versions = dict()
+    for source, rows, last in courses.values_list("source_file").annotate(rows=Count("course_id"),
+                                                                          last=Max("course_id")).order_by():
+        source = source or ""
+        versions[source] = (rows, last, counters.get(source, 0))
+    return versions
+
+
+def bump_version(source):
+    """
+    Count an import of a source file, so indexes of other processes reload its rows.
+    """
+    if not SourceFiles.objects.filter(source_file=source).update(version=F("version") + 1):
+        SourceFiles.objects.create(source_file=source, version=1)
+
+
+def drop_version(source):
+    """
+    Forget the import counter of a deleted source file.
+    """
+    SourceFiles.objects.filter(source_file=source).delete()
+
+
+class SourceIndex():
+    """
+    A base class for in-memory indexes of Courses kept per source file and in sync with the database.
+
+    Every request first compares the versions of the source files with the versions the index was built from,
+    one aggregate query, and reloads only the files that changed, so imports and deletions made by other
+    processes, such as the watcher, show up on the next request without full reloads.
+
+    Subclasses set `index`, a SearchIndex or TimetableIndex, and implement `frame`.
+
+    Methods:
+        sync(self):
+            Reload the source files changed in the database since the last sync.
+
+        refresh(self):
+            Reload the whole index from the database.
+
+        update_file(self, path, data):
+            Index the rows of a freshly imported file.
+
+        remove_file(self, path):
+            Drop the rows of a deleted file.
+
+    """
+
+    def __init__(self, index) -> None:
+        self.index = index
+
+        self._versions = dict()
+        self._lock = threading.Lock()
+
+    def frame(self, courses):
+        """
+        Get the data to index from Courses rows.
+
+        Parameters:
+            courses (QuerySet): The Courses rows of the source files to reload.
+
+        Returns:
+            pd.DataFrame: The data with a "source_file" column, "" for rows without a source file.
+        """
+        raise NotImplementedError
+
+    def _reload(self, versions):
+        changed = [source for source, version in versions.items() if self._versions.get(source) != version]
+        for source in set(self._versions) - set(versions):
+            self.index.remove(source)
+
+        if changed:
+            courses = Courses.objects.filter(source_file__in=[source for source in changed if source])
+            if "" in changed:
+                courses = courses | Courses.objects.filter(source_file__isnull=True)
+            data = self.frame(courses)
+            data["source_file"] = data["source_file"].fillna("")
+            groups = dict(iter(data.groupby("source_file")))
+            for source in changed:
+                if source in groups:
+                    self.index.update(source, groups[source])
+                else:
+                    self.index.remove(source)
+
+        # versions are read before the rows, so rows written in between are reloaded on the next sync
+        self._versions = versions
+
+    def sync(self):
+        """
+        Reload the source files changed in the database since the last sync.
+        """
+        versions = source_versions()
+        with self._lock:
+            if versions != self._versions:
+                self._reload(versions)
+
+    def refresh(self):
+        """
+        Reload the whole index from the database.
+        """
+        versions = source_versions()
+        with self._lock:
+            self._versions = dict()
+            self._reload(versions)
+
+    def update_file(self, path, data):
+        """
+        Index the rows of a freshly imported file and record its version, so the next sync does not reload it.
+        """
+        version = source_versions([path]).get(path)
+        with self._lock:
+            self.index.update(path, data)
+            if version is not None:
+                self._versions[path] = version
+
+    def remove_file(self, path):
+        """
+        Drop the rows of a deleted file.
+        """
+        with self._lock:
+            self.index.remove(path)
+            self._versions.pop(path, None)
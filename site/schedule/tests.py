@@ -1,3 +1,197 @@
-from django.test import TestCase
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+
+from . import jobs, views
+from .jobs import JobQueue
+from .loadtest import ENDPOINTS, plan_requests, percentile, summarize, format_results
+from .models import Courses
+from .search import CourseSearch
+from .sources import bump_version, source_versions
+from .timetable import CourseTimetables
+
+# the synthetic schedule generator of the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "benchmark"))
+
+
+def add_course(course_name, source_file="a.xlsx", **fields):
+    fields = {"lector_name": "доц. Іваненко І.І.", "group_number": "1", "day_of_week": 0, "weeks": [1, 2],
+              "lesson_number": 1, "auditory_name": "1-225", **fields}
+    return Courses.objects.create(course_name=course_name, source_file=source_file, **fields)
+
+
+class TestSourceVersions(TestCase):
+    def test_versions(self):
+        add_course("Алгоритми")
+        add_course("Філософія", source_file=None)
+        versions = source_versions()
+        self.assertEqual(set(versions), {"a.xlsx", ""})
+        self.assertEqual(source_versions(["a.xlsx"]), {"a.xlsx": versions["a.xlsx"]})
+
+        bump_version("a.xlsx")
+        self.assertNotEqual(source_versions()["a.xlsx"], versions["a.xlsx"])
+        self.assertEqual(source_versions()[""], versions[""])
+
+
+class TestCourseSearch(TestCase):
+    def setUp(self):
+        add_course("Алгоритми")
+        self.search = CourseSearch()
+
+    def names(self, query):
+        return [match.text for match in self.search.search(query, field="course_name")]
+
+    def test_writes_of_other_processes(self):
+        self.assertEqual(self.names("алгоритми"), ["Алгоритми"])
+
+        # rows written without the index object, as the watcher process does
+        add_course("Бази даних", source_file="b.xlsx")
+        self.assertEqual(self.names("бази даних"), ["Бази даних"])
+
+        Courses.objects.filter(source_file="a.xlsx").update(course_name="Алгоритми і структури")
+        bump_version("a.xlsx")
+        self.assertEqual(self.names("алгоритми"), ["Алгоритми і структури"])
+
+        Courses.objects.filter(source_file="b.xlsx").delete()
+        self.assertEqual(self.names("бази даних"), [])
+
+    def test_sync_reloads_changed_sources(self):
+        add_course("Бази даних", source_file="b.xlsx")
+        self.search.sync()
+        # the versions only
+        with self.assertNumQueries(2):
+            self.search.sync()
+
+        add_course("Бази даних", source_file="b.xlsx", group_number="2")
+        # the versions and the rows of b.xlsx
+        with self.assertNumQueries(3):
+            self.search.sync()
+
+
+class TestCourseTimetables(TestCase):
+    def setUp(self):
+        add_course("Алгоритми")
+        self.timetables = CourseTimetables()
+
+    def slots(self, selections):
+        return [(lesson.day_of_week, lesson.lesson_number) for lesson in self.timetables.compose(selections).lessons]
+
+    def test_writes_of_other_processes(self):
+        self.assertEqual(self.slots([("Алгоритми", "1")]), [(0, 1)])
+
+        # rows written without the index object, as the watcher process does
+        add_course("Алгоритми", source_file="b.xlsx", day_of_week=2, lesson_number=3)
+        self.assertEqual(self.slots([("Алгоритми", "1")]), [(0, 1), (2, 3)])
+
+        Courses.objects.filter(source_file="a.xlsx").update(lesson_number=2)
+        bump_version("a.xlsx")
+        self.assertEqual(self.slots([("Алгоритми", "1")]), [(0, 2), (2, 3)])
+
+        Courses.objects.filter(source_file="b.xlsx").delete()
+        self.assertEqual(self.slots([("Алгоритми", "1")]), [(0, 2)])
+
+
+class TestUpload(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from generate import generate_files
+
+        with tempfile.TemporaryDirectory() as directory:
+            with open(generate_files(directory, rows=20)[".xlsx"], "rb") as xlsx_file:
+                cls.content = xlsx_file.read()
+
+    def setUp(self):
+        # conversions run in a thread, so they can be held back and see patched functions
+        self.queue = JobQueue(max_jobs=1)
+        self.queue._executor = ThreadPoolExecutor(max_workers=1)
+        patcher = mock.patch.object(views, "job_queue", self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.queue._executor.shutdown)
+
+    def upload_file(self, content=None, name="Розклад.xlsx"):
+        return SimpleUploadedFile(name, self.content if content is None else content)
+
+    async def test_done(self):
+        response = await self.async_client.post("/schedule/uploads/", {"file": self.upload_file(name="Розклад")})
+        self.assertEqual(response.status_code, 202)
+        job = response.json()
+        self.assertEqual(job["filename"], "Розклад")
+        self.assertEqual(job["status_url"], "/schedule/jobs/{id}/".format(id=job["job_id"]))
+
+        self.queue.get(job["job_id"]).future.result(timeout=60)
+        response = await self.async_client.get(job["status_url"])
+        self.assertEqual(response.json()["status"], "done")
+
+        response = await self.async_client.get(response.json()["result_url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), jobs.convert_upload(self.content))
+
+    async def test_bad_file(self):
+        response = await self.async_client.post("/schedule/uploads/", {"file": self.upload_file(b"not a schedule")})
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.post("/schedule/uploads/", {})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_queue_full_and_not_ready(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        with mock.patch.object(jobs, "convert_upload", lambda content, fen_spec=None: release.wait(60)):
+            response = await self.async_client.post("/schedule/uploads/", {"file": self.upload_file()})
+            self.assertEqual(response.status_code, 202)
+            job_id = response.json()["job_id"]
+
+            response = await self.async_client.post("/schedule/uploads/", {"file": self.upload_file()})
+            self.assertEqual(response.status_code, 503)
+
+            response = await self.async_client.get("/schedule/jobs/{id}/result/".format(id=job_id))
+            self.assertEqual(response.status_code, 409)
+            self.assertIn(response.json()["status"], ["queued", "running"])
+
+    async def test_unknown_job(self):
+        for url in ["/schedule/jobs/unknown/", "/schedule/jobs/unknown/result/"]:
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 404)
+
+
+class TestLoadTest(SimpleTestCase):
+    def test_plan_requests(self):
+        targets = {"group": ["1", "2 гр."], "room": ["1-225"]}
+        plan = plan_requests(targets, 10, seed=1)
+        self.assertEqual(plan, plan_requests(targets, 10, seed=1))
+        self.assertEqual(sorted(endpoint for endpoint, path in plan), ["group"] * 5 + ["room"] * 5)
+        self.assertIn(("group", ENDPOINTS["group"].format(value="2%20%D0%B3%D1%80.")), plan)
+        self.assertIn(("room", "/schedule/rooms/1-225/"), plan)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual([percentile(values, p) for p in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertEqual(percentile([7], 50), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summarize(self):
+        samples = [("room", 0.010, True), ("group", 0.002, True), ("group", 0.004, False), ("group", 0.003, True)]
+        group, room = summarize(samples, elapsed=2.0)
+        self.assertEqual((group["endpoint"], group["requests"], group["errors"]), ("group", 3, 1))
+        self.assertEqual(group["throughput"], 1.5)
+        self.assertAlmostEqual(group["mean_ms"], 3.0)
+        self.assertAlmostEqual(group["p50_ms"], 3.0)
+        self.assertAlmostEqual(group["p99_ms"], 4.0)
+        self.assertEqual(room["requests"], 1)
+
+    def test_format_results(self):
+        results = summarize([("group", 0.002, True), ("room", 0.004, True)], elapsed=1.0)
+        header, group, room = format_results(results).splitlines()
+        self.assertEqual(header.split()[0], "endpoint")
+        self.assertEqual(group.split()[-1], "-")
+
+        base = {"results": [{"endpoint": "group", "p95_ms": 4.0}]}
+        header, group, room = format_results(results, base).splitlines()
+        self.assertEqual((group.split()[-1], room.split()[-1]), ("0.50", "-"))
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from .parser.timetable import TimetableIndex, LESSON_COLUMNS
+from .sources import SourceIndex
+
+# Courses fields of the columns of LESSON_COLUMNS
+LESSON_FIELDS = {
+    "course_name": "course_name",
+    "group_name": "group_number",
+    "day_of_week": "day_of_week",
+    "lesson_number": "lesson_number",
+    "weeks": "weeks",
+    "lecturer_name": "lector_name",
+    "auditory_name": "auditory_name"
+}
+
+
+class CourseTimetables(SourceIndex):
+    """
+    A class for composing personal timetables from the lessons of Courses.
+
+    Every request first reloads the lessons of the source files changed in the database since the previous one,
+    so imports made by other processes, such as the watcher, show up. Imports made in this process update
+    the index right away.
+
+    Methods:
+        compose(self, selections):
+            Merge the lessons of (course, group) selections into one timetable.
+
+        update_file(self, path, data):
+            Index the lessons of a freshly imported file.
+
+        remove_file(self, path):
+            Drop the lessons of a deleted file.
+
+    """
+
+    def __init__(self) -> None:
+        super().__init__(TimetableIndex())
+
+    def frame(self, courses):
+        rows = courses.values_list("source_file", *LESSON_FIELDS.values())
+        return pd.DataFrame.from_records(list(rows), columns=["source_file", *LESSON_COLUMNS])
+
+    def compose(self, selections):
+        """
+        Merge the lessons of (course, group) selections into one timetable.
+
+        Returns:
+            Timetable: The lessons ordered by day and lesson number, with their clashes.
+        """
+        self.sync()
+        with self._lock:
+            return self.index.compose(selections)
+
+
+course_timetables = CourseTimetables()
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from . import views
+
+app_name = "schedule"
+
+urlpatterns = [
+    path("uploads/", views.upload, name="upload"),
+    path("jobs/<str:job_id>/", views.job_status, name="job"),
+    path("jobs/<str:job_id>/result/", views.job_result, name="job_result"),
+    path("search/", views.search, name="search"),
+    path("groups/<str:group_name>/", views.group_timetable, name="group"),
+    path("timetable/", views.personal_timetable, name="timetable"),
+    path("rooms/<str:auditory_name>/", views.room_timetable, name="room"),
+]
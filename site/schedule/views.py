@@ -1,3 +1,174 @@
-from django.shortcuts import render
+import asyncio
 
-# Create your views here.
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .jobs import JobQueue, QueueFull
+from .models import Courses
+from .parser.read import detect_format
+from .parser.search import FIELDS
+from .search import course_search
+from .timetable import course_timetables
+
+job_queue = JobQueue(workers=getattr(settings, "SCHEDULE_UPLOAD_WORKERS", 2),
+                     max_jobs=getattr(settings, "SCHEDULE_UPLOAD_MAX_JOBS", 16))
+
+
+TIMETABLE_FIELDS = {
+    "course_name": "course_name",
+    "lector_name": "lecturer_name",
+    "group_number": "group_name",
+    "day_of_week": "day_of_week",
+    "lesson_number": "lesson_number",
+    "weeks": "weeks",
+    "auditory_name": "auditory_name"
+}
+
+
+def read_upload(upload):
+    """
+    Read the content of an uploaded file.
+    """
+    return b"".join(upload.chunks())
+
+
+@csrf_exempt
+@require_POST
+async def upload(request):
+    """
+    Accept a schedule file and start converting it.
+
+    The form field "file" holds an .xlsx, .docx or .doc file, the optional field "fen_spec" turns FEN mode on.
+    The format is detected by the content, whatever the file name. Responds with the job identifier right away,
+    the conversion runs in a worker process.
+    """
+    upload_file = request.FILES.get("file")
+    if upload_file is None:
+        return JsonResponse({"error": 'field "file" is required'}, status=400)
+
+    content = await asyncio.to_thread(read_upload, upload_file)
+    if detect_format(content) is None:
+        return JsonResponse({"error": "file should be one of .xlsx, .docx and .doc"}, status=400)
+
+    try:
+        job = job_queue.submit(content, upload_file.name, fen_spec=request.POST.get("fen_spec") or None)
+    except QueueFull as e:
+        return JsonResponse({"error": str(e)}, status=503)
+
+    return JsonResponse({**job.to_dict(), "status_url": reverse("schedule:job", args=[job.id])}, status=202)
+
+
+@require_GET
+async def job_status(request, job_id):
+    """
+    Report the status of a conversion job.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return JsonResponse({"error": "job not found"}, status=404)
+
+    data = job.to_dict()
+    if job.status == "done":
+        data["result_url"] = reverse("schedule:job_result", args=[job.id])
+    return JsonResponse(data)
+
+
+@require_GET
+async def job_result(request, job_id):
+    """
+    Return the schedule converted by a finished job.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return JsonResponse({"error": "job not found"}, status=404)
+    if job.status != "done":
+        return JsonResponse(job.to_dict(), status=409)
+
+    return JsonResponse(job.future.result(), json_dumps_params={"ensure_ascii": False})
+
+
+@require_GET
+def search(request):
+    """
+    Find course and lecturer names matching a query, tolerating typos and partial names.
+
+    The query parameter "q" holds the query, the optional "field" is one of "course_name" and "lecturer_name",
+    the optional "limit" is the largest number of results.
+    """
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": 'parameter "q" is required'}, status=400)
+    field = request.GET.get("field") or None
+    if field is not None and field not in FIELDS:
+        return JsonResponse({"error": "field should be one of {fields}".format(fields=FIELDS)}, status=400)
+    try:
+        limit = min(int(request.GET.get("limit", 10)), 100)
+    except ValueError:
+        return JsonResponse({"error": 'parameter "limit" should be a number'}, status=400)
+
+    matches = course_search.search(query, field=field, limit=limit)
+    return JsonResponse({"query": query, "results": [match._asdict() for match in matches]},
+                        json_dumps_params={"ensure_ascii": False})
+
+
+def timetable(request, **filters):
+    """
+    Respond with the lessons of Courses matching the filters, ordered by day and lesson number.
+
+    The optional query parameter "week" keeps the lessons held in that week.
+    """
+    week = request.GET.get("week")
+    if week is not None:
+        try:
+            week = int(week)
+        except ValueError:
+            return JsonResponse({"error": 'parameter "week" should be a number'}, status=400)
+
+    rows = Courses.objects.filter(**filters).order_by("day_of_week", "lesson_number", "course_id") \
+        .values(*TIMETABLE_FIELDS)
+    lessons = [{name: row[field] for field, name in TIMETABLE_FIELDS.items()} for row in rows
+               if week is None or week in row["weeks"]]
+    return JsonResponse({**{TIMETABLE_FIELDS[field]: value for field, value in filters.items()}, "lessons": lessons},
+                        json_dumps_params={"ensure_ascii": False})
+
+
+@require_GET
+def group_timetable(request, group_name):
+    """
+    Return the timetable of a group.
+    """
+    return timetable(request, group_number=group_name)
+
+
+@require_GET
+def room_timetable(request, auditory_name):
+    """
+    Return the timetable of a room.
+    """
+    return timetable(request, auditory_name=auditory_name)
+
+
+@require_GET
+def personal_timetable(request):
+    """
+    Merge the lessons of several courses into one timetable and report the lessons held at the same time.
+
+    Every query parameter "select" holds a course and a group separated by the last ":", such as "Алгоритми:2",
+    and selects the lessons of the group with the lectures of the course. A course without a group selects
+    the lectures only.
+    """
+    selections = []
+    for value in request.GET.getlist("select"):
+        course, separator, group = value.rpartition(":")
+        if not separator:
+            course, group = value, ""
+        if not course.strip():
+            return JsonResponse({"error": 'parameter "select" should be "<course>:<group>"'}, status=400)
+        selections.append((course.strip(), group.strip() or None))
+    if not selections:
+        return JsonResponse({"error": 'parameter "select" is required'}, status=400)
+
+    return JsonResponse(course_timetables.compose(selections).to_dict(), json_dumps_params={"ensure_ascii": False})
@@ -1 +0,0 @@
-import test_read
\ No newline at end of file
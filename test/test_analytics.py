@@ -0,0 +1,64 @@
+import unittest
+import sys
+import os
+import tempfile
+import json
+
+# Make the schedule.parser package importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+
+from schedule.parser.analytics import UtilizationCube
+import pandas as pd
+
+
+def schedule(rows):
+    return pd.DataFrame(rows, columns=["course_name", "lecturer_name", "group_name", "auditory_name",
+                                       "day_of_week", "lesson_number", "weeks"])
+
+
+DATA = schedule([
+    ["Філософія", "доц. Іваненко І.І.", "1", "1-223", 0, 1, [1, 2, 3]],
+    ["Філософія", "доц. Іваненко І.І.", "2", "1-223", 0, 1, [1, 2, 3]],
+    ["Право", "ст. викл. Сидоренко", "3", "1-223", 0, 1, [3, 4]],
+    ["Історія", "проф. Петренко П.П.", "2", "3-101", 1, 2, [1, 2, 3, 4]],
+    ["Історія", "проф. Петренко П.П.", "1", "", 2, 2, [1]]
+])
+
+
+class TestUtilizationCube(unittest.TestCase):
+    def setUp(self):
+        self.cube = UtilizationCube.from_frame(DATA, by="auditory_name")
+
+    def test_counts(self):
+        self.assertEqual(self.cube.entities, ["1-223", "3-101"])
+        self.assertEqual(self.cube.counts.shape, (2, 6, 8, 4))
+        # the lecture split into groups 1 and 2 counts once, "Право" in week 3 is a double booking
+        self.assertEqual(list(self.cube.counts[0, 0, 0]), [1, 1, 2, 1])
+
+    def test_summary(self):
+        summary = self.cube.summary()
+        self.assertEqual(summary.loc["1-223", "occupied_slots"], 4)
+        self.assertEqual(summary.loc["1-223", "double_booked"], 1)
+        self.assertAlmostEqual(summary.loc["3-101", "utilization"], 4 / (6 * 8 * 4))
+        self.assertEqual(list(self.cube.top_overloaded(1).index), ["1-223"])
+
+    def test_idle_slots(self):
+        idle = self.cube.idle_slots("3-101")
+        self.assertEqual(len(idle), 6 * 8 - 1)
+        self.assertNotIn((1, 2), set(zip(idle["day_of_week"], idle["lesson_number"])))
+
+    def test_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.cube.to_csv(os.path.join(directory, "weekly.csv"), table="weekly")
+            self.assertEqual(pd.read_csv(os.path.join(directory, "weekly.csv")).shape, (2, 5))
+
+            self.cube.to_json(os.path.join(directory, "report.json"), top=1)
+            with open(os.path.join(directory, "report.json"), encoding="utf8") as report_file:
+                report = json.load(report_file)
+        self.assertEqual(report["top_overloaded"][0]["auditory_name"], "1-223")
+        self.assertEqual(len(report["idle_slots"]["1-223"]), 6 * 8 - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
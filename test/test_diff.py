@@ -0,0 +1,51 @@
+import unittest
+import sys
+import os
+
+# Make the schedule.parser package importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+
+from schedule.parser.diff import diff, add_row_keys
+import pandas as pd
+
+
+def schedule(rows):
+    return pd.DataFrame(rows, columns=["course_name", "group_name", "day_of_week", "lesson_number",
+                                       "lecturer_name", "weeks", "auditory_name"])
+
+
+OLD = schedule([
+    ["Філософія", "1", 0, 1, "доц. Іваненко І.І.", [1, 2, 3], "1-223"],
+    ["Історія", "2", 1, 2, "проф. Петренко П.П.", [1, 2], "3-101"],
+    ["Історія", "2", 1, 2, "проф. Петренко П.П.", [3, 4], "3-105"],
+    ["Право", "лекція", 2, 3, "ст. викл. Сидоренко", [5], "4-201"]
+])
+
+
+class TestDiff(unittest.TestCase):
+    def test_same(self):
+        self.assertFalse(diff(OLD, OLD.iloc[::-1]))
+
+    def test_whitespace_and_week_order(self):
+        new = OLD.copy()
+        new.at[0, "course_name"] = "Філософія "
+        new.at[0, "weeks"] = [3, 2, 1]
+        self.assertFalse(diff(OLD, new))
+
+    def test_changes(self):
+        new = OLD.drop(index=3)
+        new.at[0, "auditory_name"] = "1-225"
+        new.loc[10] = ["Логіка", "1", 4, 5, None, [1], "1-101"]
+        delta = diff(OLD, new)
+        self.assertEqual(delta.summary(), {"inserted": 1, "updated": 1, "deleted": 1})
+        self.assertEqual(list(delta.updated["old_index"]), [0])
+        self.assertEqual(list(delta.deleted["course_name"]), ["Право"])
+
+    def test_duplicate_keys(self):
+        keys = add_row_keys(OLD)["row_key"]
+        self.assertEqual(len(set(keys)), len(OLD))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,23 +1,25 @@
 import unittest
 import sys
 import os
+import tempfile
 
-# Specify the path to the directory containing the 'scheduler' package
-scheduler_directory = 'E:\Misha\GitHub\FIDO_scheduler_test_task_13.10.2023'
+# Make the schedule.parser package and the synthetic schedule generator importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "benchmark"))
 
-# Check if the directory exists before adding it
-if os.path.exists(scheduler_directory):
-    sys.path.append(scheduler_directory)
-else:
-    print(f"The directory '{scheduler_directory}' does not exist.")
-
-
-from scheduler.handle import *
-from scheduler.read import *
-from scheduler.cols import *
+from schedule.parser.handle import *
+from schedule.parser.read import *
+from schedule.parser.cols import *
+from schedule.parser.vocabulary import Vocabulary
+from schedule.parser.profiling import Profiler
+from schedule.parser.bells import BellSchedule
+from schedule.parser.errors import ErrorReport
+from schedule.parser.pipeline import Pipeline
+from schedule.parser.lite import LitePipeline
+from generate import generate_files
 import numpy as np
-
-FILES_PATH = "/files/"
+import pandas as pd
 
 class TestWeeksToArray(unittest.TestCase, Handler):
 
@@ -53,34 +55,222 @@ class TestWeeksToArray(unittest.TestCase, Handler):
         self.assertEqual(set(self.weeks_to_list(""), {})'''
 
 
-class TestHandler(unittest.TestCase):
+class GeneratedFilesTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.files_dir = tempfile.TemporaryDirectory()
+        generate_files(cls.files_dir.name, rows=60)
+        generate_files(cls.files_dir.name, rows=60, fen=True)
+        cls.files_path = cls.files_dir.name + "/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.files_dir.cleanup()
+
+
+class TestHandler(GeneratedFilesTestCase):
     def test_is_working_Handler(self):
-        files = filter(lambda x: os.path.splitext(x)[1] in {".xlsx", ".doc", ".docx"}, os.listdir(FILES_PATH))
+        files = filter(lambda x: os.path.splitext(x)[1] in {".xlsx", ".doc", ".docx"}, os.listdir(self.files_path))
         for f in files:
             if not f.startswith("~"):
                 print(f)
-                handler = AbsoluteReader(FILES_PATH+f).read()
+                handler = Handler(AbsoluteReader(self.files_path+f).read())
                 handler.handle()
-                self.assertTrue(
-                    handler.data
+                self.assertFalse(
+                    handler.data.empty
                 )
 
-class TestToDict(unittest.TestCase):
+    def test_fen_mode(self):
+        data = AbsoluteReader(self.files_path + "fen_60_0.docx").read()
+        handler = Handler(data, fen_mode=True, spec="екон")
+        handler.handle()
+        self.assertFalse(handler.data.empty)
+        self.assertLess(len(handler.data), len(data))
+
+    def test_leading_header_row(self):
+        data = AbsoluteReader(self.files_path + "schedule_60_0.xlsx").read()
+        self.assertTrue(data.attrs[HEADERS_SKIPPED])
+
+        header = pd.DataFrame([sorted(HEADERS) + [data.loc[0, TABLE_NAME]]], columns=NAMES + [TABLE_NAME])
+        headed = pd.concat([header, data], ignore_index=True)
+        headed.attrs = {}
+        errors = ErrorReport()
+        handler = Handler(headed, errors=errors)
+        handler.handle()
+        self.assertEqual(len(handler.data), 60)
+        self.assertEqual(errors.errors, [])
+
+class TestToDict(GeneratedFilesTestCase):
     def test_is_working_Handler(self):
-        files = filter(lambda x: os.path.splitext(x)[1] in {".xlsx", ".doc", ".docx"}, os.listdir(FILES_PATH))
+        files = filter(lambda x: os.path.splitext(x)[1] in {".xlsx", ".doc", ".docx"}, os.listdir(self.files_path))
         for f in files:
             if not f.startswith("~"):
                 print(f)
                 try:
-                    data = AbsoluteReader(FILES_PATH+f).read()
+                    data = AbsoluteReader(self.files_path+f).read()
                     handler = Handler(data)
                     handler.handle()
-                    to_dict(handler.data, [COURSE, GROUPS, DAYS_OF_WEEKS], {"час": TIME, 
-                                                                        "аудиторія": LECT_HALL, 
-                                                                        "тижні": WEEKS})
+                    to_dict(handler.data.to_dict("records"), ["course_name", "group_name", "day_of_week_name"],
+                            {"час": "time",
+                             "аудиторія": "auditory_name",
+                             "тижні": "weeks"})
 
                 except Exception as e:
-                    self.fail("to_dict raised Exception unexpectedly!\n", e)
+                    self.fail("to_dict raised Exception unexpectedly!\n{e}".format(e=e))
+
+class TestSplitCourseLecturer(unittest.TestCase, Handler):
+    def test_runs(self):
+        runs = [TextRun("Філософія ", True, False), TextRun("доц. Іваненко І.І.", False, True)]
+        self.assertEqual(self.split_course_lecturer_runs(runs), ("Філософія ", "доц. Іваненко І.І."))
+
+    def test_ambiguous_runs(self):
+        self.assertIsNone(self.split_course_lecturer_runs([TextRun("Філософія доц. Іваненко І.І.", True, False)]))
+        self.assertIsNone(self.split_course_lecturer_runs([TextRun("доц. Іваненко І.І.", False, True),
+                                                           TextRun("Філософія", True, False)]))
+
+    def test_column_falls_back_to_text(self):
+        self.data = pd.DataFrame({
+            "course_lecturer_rich_text": [[TextRun("Філософія ", True, False), TextRun("ас. Мороз К.Т.", False, True)],
+                                          [TextRun("Історія проф. Петренко П.П.", False, False)]],
+            "course_lecturer": ["Філософія ас. Мороз К.Т.", "Історія проф. Петренко П.П."]
+        })
+        self.split_course_lecturer_column()
+        self.assertEqual(list(self.data["course_name"]), ["Філософія ", "Історія "])
+        self.assertEqual(list(self.data["lecturer_name"]), ["ас. Мороз К.Т.", "проф. Петренко П.П."])
+
+class TestBellSchedule(unittest.TestCase):
+    def test_lesson(self):
+        bells = BellSchedule()
+        self.assertEqual(bells.lesson("8:30-9:50"), (1, 510, 590))
+        self.assertEqual(bells.lesson(" 13.30-14.50"), (4, 810, 890))
+        self.assertEqual(bells.lesson("8:40-10:00"), (1, 510, 590))
+        self.assertIsNone(bells.lesson("7:00-8:20"))
+
+    def test_custom_bells(self):
+        bells = BellSchedule([("9:00", "10:30"), ("10:45", "12:15")])
+        self.assertEqual(bells.lesson("10:45-12:15")[0], 2)
+
+    def test_unknown_times_removed(self):
+        data = pd.DataFrame({"time": ["8:30-9:50", "7:00-8:20", "10:00-11:20", "7:00-8:20"]})
+        handler = Handler(data)
+        with self.assertWarns(UserWarning):
+            handler.remove_unknown_times()
+        handler.lesson_times()
+        self.assertEqual(handler.unknown_times, {"7:00-8:20": 2})
+        self.assertEqual(list(handler.data["lesson_number"]), [1, 2])
+        self.assertEqual(list(handler.data["lesson_end"]), [590, 680])
+
+
+class TestErrorReport(GeneratedFilesTestCase):
+    def test_bad_rows_quarantined(self):
+        data = AbsoluteReader(self.files_path + "schedule_60_0.xlsx").read()
+        data.loc[3, "time"] = "7:00-8:20"
+        data["day_of_week_name"] = data["day_of_week_name"].astype(object)
+        data.loc[5, "day_of_week_name"] = 5
+
+        with self.assertRaises(Exception):
+            Handler(data.copy()).handle()
+
+        errors = ErrorReport()
+        handler = Handler(data.copy(), errors=errors)
+        handler.handle()
+        self.assertEqual(len(handler.data), 58)
+        self.assertEqual({(e["stage"], e["row"]) for e in errors.errors}, {("lesson_number", 3), ("day_of_week", 5)})
+
+    def test_failed_rows_per_stage(self):
+        class FramePipeline(Pipeline):
+            def _read(self):
+                return self.path
+
+        data = AbsoluteReader(self.files_path + "schedule_60_0.xlsx").read()
+        data["weeks"] = data["weeks"].astype(object)
+        data.loc[3, "weeks"] = 5
+
+        pipeline = FramePipeline(data, errors=ErrorReport())
+        self.assertEqual(len(pipeline.select(["course_name", "weeks"])), 59)
+        # the row failing the weeks stage is kept when the weeks are not selected
+        self.assertEqual(len(pipeline.select(["course_name"])), 60)
+        self.assertEqual(len(pipeline.select(["weeks"])), 59)
+
+
+class TestLitePipeline(GeneratedFilesTestCase):
+    def test_same_dict_as_pipeline(self):
+        for f in ("schedule_60_0.xlsx", "schedule_60_0.docx"):
+            self.assertEqual(LitePipeline(self.files_path + f).to_dict(), Pipeline(self.files_path + f).to_dict())
+
+    def test_fen_mode(self):
+        path = self.files_path + "fen_60_0.docx"
+        self.assertEqual(LitePipeline(path, fen_mode=True, spec="екон").to_dict(),
+                         Pipeline(path, fen_mode=True, spec="екон").to_dict())
+
+
+class TestGroups(unittest.TestCase, Handler):
+    def test_groups_to_list(self):
+        self.assertEqual(self.groups_to_list("1,2 гр."), ["1", "2"])
+        self.assertEqual(self.groups_to_list("1гр. (с)"), ["1"])
+        self.assertEqual(self.groups_to_list("екон 1, 2"), ["екон 1", "екон 2"])
+        self.assertEqual(self.groups_to_list("1-3"), ["1", "2", "3"])
+        self.assertEqual(self.groups_to_list("Лекція"), ["лекція"])
+        self.assertEqual(self.groups_to_list("англ. мова"), ["англ. мова"])
+
+    def test_split_groups(self):
+        handler = Handler(pd.DataFrame({"course_name": ["Право", "Історія"], "group_name": ["1,2 гр.", "3"]}))
+        handler.split_groups()
+        self.assertEqual(list(handler.data["group_name"]), ["1", "2", "3"])
+        self.assertEqual(list(handler.data["group_text"]), ["1,2 гр.", "1,2 гр.", "3"])
+        self.assertEqual(list(handler.data.index), [0, 1, 2])
+
+
+class TestVocabulary(unittest.TestCase):
+    def test_shared_categories(self):
+        vocabulary = Vocabulary(["group_name"])
+        first = vocabulary.encode(pd.DataFrame({"group_name": ["1", "2", "1"]}))
+        second = vocabulary.encode(pd.DataFrame({"group_name": ["3", "1"]}))
+        combined = vocabulary.concat([first, second])
+        self.assertIsInstance(combined["group_name"].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(combined["group_name"]), ["1", "2", "1", "3", "1"])
+
+    def test_memory_report(self):
+        data = pd.DataFrame({"group_name": ["1 гр."] * 100, "weeks": [[1]] * 100})
+        handler = Handler(data)
+        report = handler.to_categorical(Vocabulary())
+        self.assertEqual(set(report["before"]), {"group_name"})
+        self.assertLess(report["after"]["group_name"], report["before"]["group_name"])
+
+class TestProfiler(unittest.TestCase):
+    def test_nested_stages(self):
+        profiler = Profiler()
+        with profiler.stage("outer", rows_in=2) as outer:
+            with profiler.stage("inner"):
+                data = [0] * 10000
+            outer["rows_out"] = 1
+        inner_record, outer_record = profiler.records
+        self.assertEqual(outer_record["stage"], "outer")
+        self.assertEqual((outer_record["rows_in"], outer_record["rows_out"]), (2, 1))
+        self.assertGreaterEqual(outer_record["peak_memory"], inner_record["peak_memory"])
+
+    def test_nested_profiles(self):
+        import pstats
+
+        def inner_work():
+            return sum(range(1000))
+
+        def outer_work():
+            return sorted(range(1000))
+
+        with tempfile.TemporaryDirectory() as profile_dir:
+            profiler = Profiler(memory=False, profile_dir=profile_dir)
+            with profiler.stage("outer"):
+                with profiler.stage("inner"):
+                    inner_work()
+                outer_work()
+            self.assertEqual(sorted(os.listdir(profile_dir)), ["inner.1.prof", "outer.1.prof"])
+
+            functions = {stage: {function[2] for function in pstats.Stats(
+                os.path.join(profile_dir, stage + ".1.prof")).stats} for stage in ["outer", "inner"]}
+        self.assertIn("outer_work", functions["outer"])
+        self.assertNotIn("inner_work", functions["outer"])
+        self.assertIn("inner_work", functions["inner"])
 
 # TODO add groups_to_set tests
 
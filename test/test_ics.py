@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import datetime
+import tempfile
+
+# Make the schedule.parser package importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+
+from schedule.parser.ics import CalendarWriter, fold, week_rule, write_calendars
+import pandas as pd
+
+ROW = {"course_name": "Філософія ", "lecturer_name": "доц. Іваненко І.І.", "group_name": "1",
+       "auditory_name": "1-223", "day_of_week": 2, "lesson_start": 600, "lesson_end": 680, "weeks": [5, 1, 2, 4]}
+
+
+class TestCalendar(unittest.TestCase):
+    def setUp(self):
+        self.writer = CalendarWriter(datetime.date(2024, 9, 4), timestamp=datetime.datetime(2024, 8, 1))
+
+    def test_week_rule(self):
+        self.assertEqual(week_rule([5, 1, 2, 4]), (1, 5, [3]))
+        self.assertEqual(week_rule([7]), (7, 1, []))
+
+    def test_event(self):
+        event = self.writer.event(ROW)
+        self.assertIn("DTSTART;TZID=Europe/Kyiv:20240904T100000", event)
+        self.assertIn("DTEND;TZID=Europe/Kyiv:20240904T112000", event)
+        self.assertIn("RRULE:FREQ=WEEKLY;COUNT=5", event)
+        self.assertIn("EXDATE;TZID=Europe/Kyiv:20240918T100000", event)
+        self.assertIn("SUMMARY:Філософія", event)
+
+    def test_no_weeks(self):
+        self.assertEqual(self.writer.event(dict(ROW, weeks=[])), [])
+
+    def test_fold(self):
+        line = "DESCRIPTION:" + "Іваненко " * 20
+        folded = fold(line)
+        self.assertTrue(all(len(part.encode("utf8")) <= 75 for part in folded.split("\r\n")))
+        self.assertEqual(folded.replace("\r\n ", "").rstrip("\r\n"), line)
+
+    def test_write_calendars_same_file_name(self):
+        data = pd.DataFrame([dict(ROW, group_name=group) for group in ["1 гр.", "1/гр.", "1_гр_2"]])
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_calendars(data, directory, datetime.date(2024, 9, 4))
+            self.assertEqual({group: os.path.basename(path) for group, path in paths.items()},
+                             {"1 гр.": "1_гр.ics", "1/гр.": "1_гр_2.ics", "1_гр_2": "1_гр_2_2.ics"})
+            for group, path in paths.items():
+                with open(path, encoding="utf8") as ics_file:
+                    self.assertIn("X-WR-CALNAME:" + group, ics_file.read())
+
+    def test_write_calendars_split_groups(self):
+        # the rows of a "1,2 гр." cell, split by Handler.split_groups
+        data = pd.DataFrame([dict(ROW, group_name="1"), dict(ROW, group_name="2"),
+                             dict(ROW, group_name="3", day_of_week=3)])
+        with tempfile.TemporaryDirectory() as directory:
+            for by in ["lecturer_name", "auditory_name"]:
+                path, = write_calendars(data, directory, datetime.date(2024, 9, 4), by=by).values()
+                with open(path, encoding="utf8") as ics_file:
+                    lines = ics_file.read().splitlines()
+                self.assertEqual(lines.count("BEGIN:VEVENT"), 2)
+                self.assertIn("DESCRIPTION:доц. Іваненко І.І.\\, 1\\, 2", lines)
+
+            paths = write_calendars(data, directory, datetime.date(2024, 9, 4))
+            uids = dict()
+            for group, path in paths.items():
+                with open(path, encoding="utf8") as ics_file:
+                    uids[group] = [line for line in ics_file.read().splitlines() if line.startswith("UID:")]
+            self.assertEqual(uids["1"], uids["2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Make the schedule.parser package importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+
+from schedule.parser.identity import IdentityDictionary, name_key
+import pandas as pd
+
+
+class TestIdentityDictionary(unittest.TestCase):
+    def setUp(self):
+        self.identities = IdentityDictionary()
+
+    def test_name_key(self):
+        self.assertEqual(name_key("lecturer_name", "доц. Іваненко І. І."), "іваненко і і")
+        self.assertEqual(name_key("lecturer_name", "проф. Іваненко І.І."), "іваненко і і")
+        self.assertEqual(name_key("course_name", " Мікроекономіка "), "мікроекономіка")
+        self.assertEqual(name_key("lecturer_name", None), "")
+
+    def test_lecturers(self):
+        resolve = lambda text: self.identities.resolve("lecturer_name", text)
+        ivanenko = resolve("доц. Іваненко І.І.")
+        self.assertEqual(resolve("доц. Іваненко І. І."), ivanenko)
+        self.assertEqual(resolve("проф. Іваненко І.І."), ivanenko)
+        self.assertEqual(resolve("доц. Іванеко І.І."), ivanenko)
+        self.assertNotEqual(resolve("доц. Іваненко О.І."), ivanenko)
+        self.assertNotEqual(resolve("доц. Петренко І.І."), ivanenko)
+        self.assertIsNone(resolve(None))
+        self.assertEqual(self.identities.name("lecturer_name", ivanenko), "доц. Іваненко І.І.")
+
+    def test_courses(self):
+        resolve = lambda text: self.identities.resolve("course_name", text)
+        micro = resolve("Мікроекономіка (мен, фін)")
+        self.assertEqual(resolve("Мікроекономіка  (фін, мен)"), micro)
+        self.assertNotEqual(resolve("Макроекономіка (мен, фін)"), micro)
+        self.assertNotEqual(resolve("Мікроекономіка (мен)"), micro)
+        self.assertNotEqual(resolve("Англійська мова 1"), resolve("Англійська мова 2"))
+
+    def test_encode(self):
+        data = pd.DataFrame({"course_name": ["Алгоритми", "алгоритми", "Бази даних"],
+                             "lecturer_name": ["доц. Іваненко І.І.", None, "проф. Іваненко І. І."]})
+        encoded = self.identities.encode(data)
+        self.assertEqual(list(encoded["course_identity"]), [1, 1, 2])
+        self.assertEqual(encoded["lecturer_identity"].tolist(), [1, pd.NA, 1])
+        self.assertEqual(str(encoded["lecturer_identity"].dtype), "Int64")
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "identities.json")
+            with IdentityDictionary.editing(path) as identities:
+                first = identities.resolve("course_name", "Алгоритми")
+                second = identities.resolve("course_name", "Бази даних")
+
+            with IdentityDictionary.editing(path) as identities:
+                self.assertEqual(identities.resolve("course_name", "Бази  даних"), second)
+                self.assertEqual(identities.resolve("course_name", "Алгоритми"), first)
+                self.assertEqual(identities.resolve("course_name", "Фізика"), 3)
+
+            self.assertEqual(IdentityDictionary.load(path).size("course_name"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,32 +1,173 @@
 import unittest
 import sys
 import os
+import tempfile
+import io
+import zipfile
+from unittest import mock
 
-# Specify the path to the directory containing the 'scheduler' package
-scheduler_directory = 'E:\Misha\GitHub\FIDO_scheduler_test_task_13.10.2023'
+# Make the schedule.parser package and the synthetic schedule generator importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "benchmark"))
 
-# Check if the directory exists before adding it
-if os.path.exists(scheduler_directory):
-    sys.path.append(scheduler_directory)
-else:
-    print(f"The directory '{scheduler_directory}' does not exist.")
-
-
-from scheduler.read import AbsoluteReader
+from schedule.parser.read import AbsoluteReader, XLSXReader, detect_format, OLE_SIGNATURE, split_workbook, \
+    read_xlsx_sheet
+from schedule.parser.layout import ColumnLayout
+from generate import generate_files, generate_rows, write_xlsx, write_docx, write_docx_parts, docx_cell, docx_run, \
+    WORD_NAMESPACE
+import openpyxl
 import numpy as np
 
-FILES_PATH = "./files/"
 
 class TestReadExcel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.files_dir = tempfile.TemporaryDirectory()
+        generate_files(cls.files_dir.name, rows=60)
+        generate_files(cls.files_dir.name, rows=60, fen=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.files_dir.cleanup()
+
     def test_is_working_Ablosute(self):
-        files = filter(lambda x: os.path.splitext(x)[1] in {".xlsx", ".doc", ".docx"}, os.listdir(FILES_PATH))
+        files_path = self.files_dir.name + "/"
+        files = filter(lambda x: os.path.splitext(x)[1] in {".xlsx", ".doc", ".docx"}, os.listdir(files_path))
         for f in files:
             if not f.startswith("~"):
                 print(f)
-                self.assertTrue(
-                    AbsoluteReader(FILES_PATH+f).read()
+                self.assertFalse(
+                    AbsoluteReader(files_path+f).read().empty
                 )
 
 
+class TestReadTables(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.files_dir = tempfile.TemporaryDirectory()
+        rows = generate_rows(90, seed=3)
+        cls.xlsx_path = os.path.join(cls.files_dir.name, "programmes.xlsx")
+        cls.docx_path = os.path.join(cls.files_dir.name, "programmes.docx")
+        write_xlsx(cls.xlsx_path, rows, tables=3)
+        write_docx(cls.docx_path, rows, tables=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.files_dir.cleanup()
+
+    def test_every_sheet_is_read(self):
+        data = AbsoluteReader(self.xlsx_path).read()
+        self.assertEqual(len(data), 90)
+        self.assertEqual(data["table_name"].value_counts().to_dict(),
+                         {"Програма 1": 30, "Програма 2": 30, "Програма 3": 30})
+
+    def test_every_table_is_read(self):
+        data = AbsoluteReader(self.docx_path).read()
+        self.assertEqual(len(data), 90)
+        self.assertEqual(data["table_name"].value_counts().to_dict(), {"table 1": 30, "table 2": 30, "table 3": 30})
+
+    def test_parallel_sheets(self):
+        with mock.patch("os.cpu_count", return_value=4):
+            parallel = XLSXReader(self.xlsx_path, workers=2).read()
+        self.assertTrue(XLSXReader(self.xlsx_path).read().equals(parallel))
+
+    def test_split_workbook(self):
+        with open(self.xlsx_path, "rb") as xlsx_file:
+            sheets = split_workbook(xlsx_file.read())
+        self.assertEqual([title for title, content in sheets], ["Програма 1", "Програма 2", "Програма 3"])
+
+        for title, content in sheets:
+            workbook = openpyxl.load_workbook(io.BytesIO(content))
+            self.assertEqual(workbook.sheetnames, [title])
+            # the other sheets are not in the part
+            self.assertEqual(sum(name.startswith("xl/worksheets/sheet") for name in
+                                 zipfile.ZipFile(io.BytesIO(content)).namelist()), 1)
+
+        rows = [row for title, content in sheets for row in read_xlsx_sheet(content)[0]]
+        self.assertEqual(rows, list(XLSXReader(self.xlsx_path).iter_rows()))
+
+
+class TestColumnLayout(unittest.TestCase):
+    # reordered columns, an extra "Примітка" column and the header repeated inside the table
+    HEADER = ["Примітка", "День", "Час", "Група", "Дисципліна, викладач", "Аудиторія", "Тижні"]
+    ROWS = [
+        ["", "Понеділок", "8:30-9:50", "1", "Історія доц. Іваненко І.І.", "1-223", "1-7"],
+        ["перенесено", "", "10:00-11:20", "2", "Право проф. Петренко П.П.", "3-101", "2-8"],
+        HEADER,
+        ["", "Вівторок", "8:30-9:50", "лекція", "Філософія ас. Мороз К.Т.", "1-225", "1-14"]
+    ]
+    EXPECTED = [
+        ["Понеділок", "8:30-9:50", "1", "1-7", "1-223"],
+        ["Понеділок", "10:00-11:20", "2", "2-8", "3-101"],
+        ["Вівторок", "8:30-9:50", "лекція", "1-14", "1-225"]
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.files_dir = tempfile.TemporaryDirectory()
+
+        cls.xlsx_path = os.path.join(cls.files_dir.name, "layout.xlsx")
+        wb = openpyxl.Workbook()
+        wb.active.append(["Розклад занять"])
+        wb.active.append(cls.HEADER)
+        for row in cls.ROWS:
+            wb.active.append(row)
+        wb.active.merge_cells("B3:B4")
+        wb.save(cls.xlsx_path)
+
+        cls.docx_path = os.path.join(cls.files_dir.name, "layout.docx")
+        table = "".join("<w:tr>{cells}</w:tr>".format(cells="".join(docx_cell(docx_run(value)) for value in row))
+                        for row in [cls.HEADER] + cls.ROWS)
+        write_docx_parts(cls.docx_path, '<w:document xmlns:w="{ns}"><w:body><w:tbl>{table}</w:tbl></w:body>'
+                                        '</w:document>'.format(ns=WORD_NAMESPACE, table=table))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.files_dir.cleanup()
+
+    def test_detect(self):
+        header_row, layout = ColumnLayout.detect([["Розклад занять"], self.HEADER] + self.ROWS)
+        self.assertEqual(header_row, 1)
+        self.assertEqual(layout.positions, [1, 2, 4, 3, 6, 5])
+        self.assertTrue(layout.is_header(self.HEADER))
+        self.assertFalse(layout.is_header(self.ROWS[0]))
+        self.assertEqual(ColumnLayout.detect([["Розклад занять"]] + self.ROWS[:2]), (None, None))
+
+    def test_reordered_columns(self):
+        for path in (self.xlsx_path, self.docx_path):
+            data = AbsoluteReader(path).read()
+            columns = ["day_of_week_name", "time", "group_name", "weeks", "auditory_name"]
+            self.assertEqual(data[columns].values.tolist(), self.EXPECTED, path)
+            self.assertEqual(data["course_lecturer_rich_text"].map(lambda runs: runs[0].text).tolist(),
+                             [row[4] for row in self.ROWS if row is not self.HEADER])
+
+
+class TestReadMemory(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.files_dir = tempfile.TemporaryDirectory()
+        cls.paths = generate_files(cls.files_dir.name, rows=30)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.files_dir.cleanup()
+
+    def test_detect_format(self):
+        for extension, path in self.paths.items():
+            with open(path, "rb") as f:
+                self.assertEqual(detect_format(f.read()), extension)
+        self.assertEqual(detect_format(OLE_SIGNATURE + b"\0" * 100), ".doc")
+        self.assertIsNone(detect_format(b"not a schedule"))
+
+    def test_bytes_and_file_like(self):
+        for path in self.paths.values():
+            with open(path, "rb") as f:
+                content = f.read()
+            expected = AbsoluteReader(path).read()
+            self.assertTrue(expected.equals(AbsoluteReader(content).read()))
+            self.assertTrue(expected.equals(AbsoluteReader(io.BytesIO(content)).read()))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+
+# Make the schedule.parser package importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+
+from schedule.parser.rooms import RoomCatalog, RoomSolver, BOOKING_COLUMNS, bookings_of, find_conflicts
+import pandas as pd
+
+CONFIG = {
+    "rooms": {
+        "1-225": {"capacity": 120, "type": "лекційна"},
+        "1-226": {"capacity": 100, "type": "лекційна"},
+        "1-313": {"capacity": 30, "type": "семінарська"},
+        "1-314": {"capacity": 25, "type": "семінарська"},
+        "1-315": {"capacity": 30, "type": "семінарська"},
+        "3-101": {"capacity": 30, "type": "семінарська"},
+        "спортзал": {"capacity": 200, "shared": True}
+    },
+    "courses": {"Програмування": {"capacity": 20, "type": "семінарська"}}
+}
+
+
+def schedule(rows):
+    return pd.DataFrame(rows, columns=BOOKING_COLUMNS)
+
+
+class TestRoomSolver(unittest.TestCase):
+    def setUp(self):
+        self.catalog = RoomCatalog.from_dict(CONFIG)
+
+    def test_demand(self):
+        self.assertEqual(self.catalog.demand("Алгоритми", "1-313"), (0, "семінарська", 30))
+        self.assertEqual(self.catalog.demand("програмування", "1-225"), (20, "семінарська", 120))
+        self.assertEqual(self.catalog.demand("Алгоритми", "2-000"), (0, None, 0))
+
+    def test_conflicts(self):
+        data = schedule([
+            ["Алгоритми", "доц. Іваненко І.І.", "лекція", 0, 1, [1, 2], "1-225"],
+            ["Алгоритми", "доц. Іваненко І.І.", "1", 0, 1, [3], "1-225"],
+            ["Бази даних", "проф. Петренко П.П.", "лекція", 0, 1, [2, 4], "1-225"],
+            ["Фізкультура", "", "1", 0, 1, [1, 2], "спортзал"],
+            ["Футбол", "", "2", 0, 1, [1, 2], "спортзал"]
+        ])
+        bookings = bookings_of(data, self.catalog)
+        self.assertEqual(len(bookings), 4)
+        self.assertEqual(sorted(b.course_name for b in find_conflicts(bookings, self.catalog)),
+                         ["Алгоритми", "Бази даних"])
+
+    def test_move(self):
+        data = schedule([
+            ["Алгоритми", "доц. Іваненко І.І.", "1", 0, 2, [1, 2, 3], "1-313"],
+            ["Бази даних", "ас. Коваленко К.К.", "2", 0, 2, [3, 4], "1-313"],
+            ["Бази даних", "ас. Коваленко К.К.", "2", 0, 3, [3, 4], "1-313"]
+        ])
+        solution = RoomSolver(self.catalog).solve(data)
+        self.assertTrue(solution.complete)
+        self.assertEqual(solution.unresolved, [])
+        self.assertEqual(len(solution.moves), 1)
+        move = solution.moves[0]
+        # the booking with more weeks stays, the other goes to a room as large in the same building
+        self.assertEqual((move.course_name, move.from_room, move.to_room), ("Бази даних", "1-313", "1-315"))
+        self.assertEqual(move.rows, [1])
+
+        fixed = solution.apply(data)
+        self.assertEqual(list(fixed["auditory_name"]), ["1-313", "1-315", "1-313"])
+        self.assertEqual(find_conflicts(bookings_of(fixed, self.catalog), self.catalog), [])
+
+    def test_swap(self):
+        data = schedule([
+            ["Алгоритми", "доц. Іваненко І.І.", "лекція", 1, 1, [1, 2], "1-225"],
+            ["Бази даних", "проф. Петренко П.П.", "лекція", 1, 1, [2], "1-225"],
+            # the only other lecture room is taken by a course that fits a seminar room
+            ["Програмування", "ас. Коваленко К.К.", "1", 1, 1, [1, 2], "1-226"]
+        ])
+        solution = RoomSolver(self.catalog).solve(data)
+        self.assertEqual(solution.unresolved, [])
+        self.assertEqual([(m.course_name, m.from_room, m.to_room) for m in solution.moves],
+                         [("Програмування", "1-226", "1-313"), ("Бази даних", "1-225", "1-226")])
+
+    def test_unresolved(self):
+        data = schedule([
+            ["Алгоритми", "доц. Іваненко І.І.", "лекція", 1, 1, [1], "1-225"],
+            ["Бази даних", "проф. Петренко П.П.", "лекція", 1, 1, [1], "1-225"],
+            ["Економіка", "проф. Шевченко Т.Г.", "лекція", 1, 1, [1], "1-226"]
+        ])
+        solution = RoomSolver(self.catalog).solve(data)
+        self.assertEqual(solution.moves, [])
+        self.assertEqual(len(solution.unresolved), 1)
+
+    def test_given_conflicts(self):
+        data = schedule([
+            ["Алгоритми", "доц. Іваненко І.І.", "1", 0, 2, [1, 2, 3], "1-313"],
+            ["Бази даних", "ас. Коваленко К.К.", "2", 0, 2, [3, 4], "1-313"]
+        ])
+        solution = RoomSolver(self.catalog).solve(data, conflicts=[0])
+        self.assertEqual([(m.course_name, m.to_room) for m in solution.moves], [("Алгоритми", "1-315")])
+
+
+if __name__ == "__main__":
+    unittest.main()
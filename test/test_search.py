@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+
+# Make the schedule.parser package importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+
+from schedule.parser.search import SearchIndex, normalize
+import pandas as pd
+
+
+def names(rows):
+    return pd.DataFrame(rows, columns=["course_name", "lecturer_name"])
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.update("a.xlsx", names([
+            ["Мікроекономіка ", "доц. Іваненко І.І."],
+            ["Макроекономіка", "проф. Петренко П.П."],
+            ["Теорія ймовірностей", "доц. Іваненко І.І."]
+        ]))
+        self.index.update("b.xlsx", names([["Мікроекономіка", "ст. викл. Сидоренко С.С."]]))
+
+    def test_normalize(self):
+        self.assertEqual(normalize("доц. Іваненко І. І."), normalize("Доц Іваненко І.І."))
+        self.assertEqual(normalize("П’ятниця"), normalize("П'ятниця"))
+
+    def test_typo(self):
+        match = self.index.search("мікроекономика", field="course_name")[0]
+        self.assertEqual(match.text, "Мікроекономіка")
+        self.assertEqual(match.sources, ["a.xlsx", "b.xlsx"])
+
+    def test_partial(self):
+        self.assertEqual([m.text for m in self.index.search("Іванен")], ["доц. Іваненко І.І."])
+
+    def test_update(self):
+        self.index.update("a.xlsx", names([["Мікроекономіка", "доц. Іваненко І.І."]]))
+        self.assertEqual(self.index.search("теорія ймовірностей"), [])
+
+        self.index.remove("a.xlsx")
+        self.assertEqual(self.index.search("Іваненко"), [])
+        self.assertEqual(self.index.search("Мікроекономіка")[0].sources, ["b.xlsx"])
+
+
+if __name__ == '__main__':
+    unittest.main()
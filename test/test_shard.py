@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import json
+
+# Make the schedule.parser package and the synthetic schedule generator importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "benchmark"))
+
+from schedule.parser.shard import build_manifest, run_shard, merge, ResultStore, faculty_of
+from schedule.parser.pipeline import Pipeline
+from generate import generate_files
+
+
+class TestShard(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.input_dir = os.path.join(cls.directory.name, "input")
+        economics = generate_files(os.path.join(cls.input_dir, "Економіка"), rows=40, seed=1)
+        law = generate_files(os.path.join(cls.input_dir, "Право"), rows=30, seed=2)
+        shutil.copy(law[".docx"], os.path.join(cls.input_dir, "Філософія_БП-1.docx"))
+        cls.paths = {**{"Економіка/" + os.path.basename(p): p for p in economics.values()},
+                     **{"Право/" + os.path.basename(p): p for p in law.values()}}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.work = tempfile.TemporaryDirectory()
+        self.store = ResultStore(os.path.join(self.work.name, "store"))
+
+    def tearDown(self):
+        self.work.cleanup()
+
+    def test_faculty_of(self):
+        self.assertEqual(faculty_of("Право/schedule.xlsx"), "Право")
+        self.assertEqual(faculty_of("Економіка_БП-1_Осінь_2023–2024.xlsx"), "Економіка")
+
+    def test_manifest(self):
+        manifest = build_manifest(self.input_dir, shards=2)
+        self.assertEqual(manifest, build_manifest(self.input_dir, shards=2))
+        self.assertEqual(len(manifest["files"]), 5)
+        shards = {entry["file"]: entry["shard"] for entry in manifest["files"]}
+        # the copy of a file goes to the shard of the original
+        self.assertEqual(shards["Філософія_БП-1.docx"], shards["Право/schedule_30_2.docx"])
+        self.assertEqual(set(shards.values()), {0, 1})
+
+    def test_run_and_merge(self):
+        manifest = build_manifest(self.input_dir, shards=2)
+        with self.assertRaises(Exception):
+            merge(manifest, self.store, os.path.join(self.work.name, "out"))
+
+        first = run_shard(manifest, 0, self.store)
+        self.assertTrue(all(not r["error"] for r in first))
+        # a rerun finds the results of the shard in the store
+        self.assertTrue(all(r["cached"] for r in run_shard(manifest, 0, self.store)))
+        run_shard(manifest, 1, self.store)
+
+        outputs = merge(manifest, self.store, os.path.join(self.work.name, "out"))
+        self.assertEqual(set(outputs), {"Економіка", "Право", "Філософія"})
+        with open(os.path.join(self.work.name, "out", "Філософія.json"), encoding="utf8") as json_file:
+            self.assertEqual(json.load(json_file), Pipeline(self.paths["Право/schedule_30_2.docx"]).to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
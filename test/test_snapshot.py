@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Make the schedule.parser package importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+
+from schedule.parser.snapshot import SnapshotStore, weeks_to_mask, mask_to_weeks
+from schedule.parser.errors import ErrorReport
+import pandas as pd
+
+
+def schedule(rows):
+    return pd.DataFrame(rows, columns=["course_name", "lecturer_name", "group_name", "auditory_name",
+                                       "day_of_week", "lesson_number", "weeks"])
+
+
+DATA = schedule([
+    ["Філософія", "доц. Іваненко І.І.", "1", "1-223", 0, 1, [1, 2, 3]],
+    ["Історія", "проф. Петренко П.П.", "2", "3-101", 1, 2, [1, 2, 15]],
+    ["Право", "ст. викл. Сидоренко", "лекція", "1-223", 2, 3, [5]],
+    ["Історія", "проф. Петренко П.П.", "1", "3-105", 0, 2, [3, 4]]
+])
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(self.root.name)
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def test_weeks_mask(self):
+        self.assertEqual(mask_to_weeks(weeks_to_mask([15, 1, 2])), [1, 2, 15])
+
+    def test_find(self):
+        self.store.publish(DATA)
+        snapshot = self.store.open()
+        self.assertEqual(len(snapshot), 4)
+
+        records = snapshot.records(snapshot.find("group_name", "1"))
+        self.assertEqual([r["course_name"] for r in records], ["Філософія", "Історія"])
+        self.assertEqual(records[1]["weeks"], [3, 4])
+
+        self.assertEqual(len(snapshot.find("auditory_name", "1-223")), 2)
+        self.assertEqual(len(snapshot.find("lecturer_name", "доц. Петренко")), 0)
+
+    def test_versions(self):
+        self.store.publish(DATA)
+        snapshot = self.store.open()
+        self.assertIs(self.store.refresh(snapshot), snapshot)
+
+        self.store.publish(DATA.iloc[:1])
+        self.store.publish(DATA.iloc[:2])
+        self.assertEqual(len(self.store.versions()), 2)
+        self.assertEqual(len(self.store.refresh(snapshot)), 2)
+
+    def test_bad_weeks(self):
+        data = pd.concat([DATA, schedule([["Право", "ст. викл. Сидоренко", "2", "1-223", 3, 1,
+                                           list(range(1, 101))]])], ignore_index=True)
+        errors = ErrorReport()
+        self.store.publish(data, errors)
+        self.assertEqual(len(self.store.open()), 4)
+        self.assertEqual([(e["stage"], e["row"]) for e in errors.errors], [("snapshot", 4)])
+        self.assertEqual(errors.errors[0]["reason"], "weeks 64, 65, 66, 67, 68 outside 0-63")
+
+        with self.assertWarns(UserWarning):
+            self.store.publish(data)
+        self.assertEqual(len(self.store.open()), 4)
+
+    def test_keep_replaced_version(self):
+        store = SnapshotStore(self.root.name, keep=1)
+        first = store.publish(DATA)
+        second = store.publish(DATA.iloc[:1])
+        self.assertEqual(store.versions(), [first, second])
+
+        third = store.publish(DATA.iloc[:2])
+        self.assertEqual(store.versions(), [second, third])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+
+# Make the schedule.parser package importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+
+from schedule.parser.timetable import TimetableIndex, LESSON_COLUMNS
+import pandas as pd
+
+
+def lessons(rows):
+    return pd.DataFrame(rows, columns=LESSON_COLUMNS)
+
+
+class TestTimetableIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TimetableIndex()
+        self.index.update("a.xlsx", lessons([
+            ["Алгоритми ", "лекція", 0, 1, [1, 2, 3, 4], "доц. Іваненко І.І.", "1-225"],
+            ["Алгоритми", "1", 0, 2, [1, 3], "ст. викл. Сидоренко С.С.", "1-313"],
+            ["Алгоритми", "2", 0, 2, [2, 4], "ст. викл. Сидоренко С.С.", "1-313"],
+            ["Алгоритми", "3", 1, 1, [1, 2, 3, 4], "ст. викл. Сидоренко С.С.", "1-313"]
+        ]))
+        self.index.update("b.xlsx", lessons([
+            ["Бази даних", "лекція", 1, 2, [1, 2], "проф. Петренко П.П.", "3-101"],
+            ["Бази даних", "1", 0, 2, [2], "ас. Коваленко К.К.", "3-101"],
+            ["Бази даних", "2", 1, 1, [4], "ас. Коваленко К.К.", "3-101"]
+        ]))
+
+    def test_lessons(self):
+        selected = self.index.lessons("алгоритми", "1")
+        self.assertEqual(sorted((l.group_name, l.lesson_number) for l in selected), [("1", 2), ("лекція", 1)])
+        self.assertEqual([l.group_name for l in self.index.lessons("Алгоритми", None)], ["лекція"])
+
+    def test_compose(self):
+        timetable = self.index.compose([("Алгоритми", "1"), ("Бази даних", "1"), ("Фізика", "1")])
+        self.assertEqual([(l.day_of_week, l.lesson_number) for l in timetable.lessons],
+                         [(0, 1), (0, 2), (0, 2), (1, 2)])
+        self.assertEqual(timetable.clashes, [])
+        self.assertEqual(timetable.unknown, [("Фізика", "1")])
+
+        timetable = self.index.compose([("Алгоритми", "2"), ("Бази даних", "1")])
+        self.assertEqual(len(timetable.clashes), 1)
+        self.assertEqual(timetable.to_dict()["clashes"][0]["weeks"], [2])
+
+    def test_compose_lecture_of_two_groups(self):
+        timetable = self.index.compose([("Алгоритми", "1"), ("Алгоритми", "2")])
+        self.assertEqual([(l.group_name, l.lesson_number) for l in timetable.lessons],
+                         [("лекція", 1), ("1", 2), ("2", 2)])
+        self.assertEqual(timetable.clashes, [])
+        self.assertFalse(self.index.has_clash([("Алгоритми", "1"), ("Алгоритми", "2")]))
+
+        # the same lecture listed with other weeks in another file is held in the same room
+        self.index.update("c.xlsx", lessons([
+            ["Алгоритми", "лекція", 0, 1, [1, 2], "доц. Іваненко І.І.", "1-225"]
+        ]))
+        timetable = self.index.compose([("Алгоритми", "1"), ("Алгоритми", "2")])
+        self.assertEqual(len(timetable.lessons), 4)
+        self.assertEqual(timetable.clashes, [])
+
+    def test_has_clash(self):
+        self.assertFalse(self.index.has_clash([("Алгоритми", "1"), ("Бази даних", "1")]))
+        self.assertTrue(self.index.has_clash([("Алгоритми", "2"), ("Бази даних", "1")]))
+        self.assertTrue(self.index.has_clash([("Алгоритми", "3"), ("Бази даних", "2")]))
+
+    def test_clash_free(self):
+        options = {"Алгоритми": ["1", "2", "3"], "Бази даних": ["1", "2"]}
+        self.assertEqual(self.index.clash_free(options),
+                         [[("Алгоритми", "1"), ("Бази даних", "1")], [("Алгоритми", "3"), ("Бази даних", "1")],
+                          [("Алгоритми", "1"), ("Бази даних", "2")], [("Алгоритми", "2"), ("Бази даних", "2")]])
+        self.assertEqual(len(self.index.clash_free(options, limit=1)), 1)
+
+    def test_update_and_remove(self):
+        self.assertTrue(self.index.has_clash([("Алгоритми", "2"), ("Бази даних", "1")]))
+        self.index.update("b.xlsx", lessons([["Бази даних", "1", 2, 2, [2], "ас. Коваленко К.К.", "3-101"]]))
+        self.assertFalse(self.index.has_clash([("Алгоритми", "2"), ("Бази даних", "1")]))
+
+        self.index.remove("b.xlsx")
+        self.assertEqual(self.index.lessons("Бази даних", "1"), [])
+        self.assertEqual(self.index.sources(), {"a.xlsx"})
+
+
+if __name__ == "__main__":
+    unittest.main()
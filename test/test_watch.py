@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+from unittest import mock
+
+# Make the schedule.parser package importable
+TEST_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIRECTORY, "..", "site"))
+
+from schedule.parser import watch
+from schedule.parser.watch import Watcher, is_schedule_file
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temporary = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temporary.name, "schedules")
+        os.makedirs(self.directory)
+        self.state_path = os.path.join(self.temporary.name, "state.json")
+        self.changed = []
+        self.deleted = []
+
+    def tearDown(self):
+        self.temporary.cleanup()
+
+    def watcher(self, **options):
+        options = {"debounce": 0.2, "polling": True, "poll_interval": 0.01, "state_path": self.state_path,
+                   **options}
+        return Watcher(self.directory, self.changed.append, on_delete=self.deleted.append, **options)
+
+    def write(self, name, content=b"schedule"):
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def settle(self, watcher):
+        watcher.poll(timeout=0.01)
+        time.sleep(0.25)
+        watcher.poll(timeout=0.01)
+
+    def test_is_schedule_file(self):
+        self.assertTrue(is_schedule_file("a/Розклад.xlsx"))
+        self.assertFalse(is_schedule_file("a/~$Розклад.xlsx"))
+        self.assertFalse(is_schedule_file("a/Розклад.json"))
+
+    def test_debounce(self):
+        watcher = self.watcher()
+        path = self.write("a.xlsx")
+        watcher.poll(timeout=0.01)
+        self.assertEqual(self.changed, [])
+
+        time.sleep(0.25)
+        watcher.poll(timeout=0.01)
+        self.assertEqual(self.changed, [path])
+
+        # the same content is not passed on again
+        self.write("a.xlsx")
+        self.settle(watcher)
+        self.assertEqual(self.changed, [path])
+
+    def test_lock_files(self):
+        watcher = self.watcher()
+        self.write("~$a.xlsx")
+        self.settle(watcher)
+        watcher.scan()
+        self.assertEqual(self.changed, [])
+
+    def test_delete(self):
+        watcher = self.watcher()
+        path = self.write("a.docx")
+        self.settle(watcher)
+        os.remove(path)
+        self.settle(watcher)
+        self.assertEqual((self.changed, self.deleted), ([path], [path]))
+
+    def test_unreadable_file(self):
+        path = self.write("a.xlsx")
+        watcher = self.watcher()
+        with mock.patch.object(watch, "file_hash", side_effect=PermissionError("locked")):
+            watcher.scan()
+        self.assertEqual(self.changed, [])
+
+        # retried once the lock is gone
+        time.sleep(0.25)
+        watcher.poll(timeout=0.01)
+        self.assertEqual(self.changed, [path])
+
+    def test_file_deleted_while_settling(self):
+        watcher = self.watcher()
+        path = self.write("a.xlsx")
+        watcher.scan()
+        with mock.patch.object(watch, "file_hash", side_effect=FileNotFoundError(path)):
+            watcher.scan()
+        self.assertEqual(self.deleted, [path])
+
+    def test_restart(self):
+        first = self.write("a.xlsx")
+        second = self.write("b.xlsx")
+        self.watcher().scan()
+        self.assertEqual(sorted(self.changed), [first, second])
+
+        # changed and deleted while the watcher was off
+        self.write("a.xlsx", b"changed")
+        os.remove(second)
+        self.changed.clear()
+        self.watcher().scan()
+        self.assertEqual((self.changed, self.deleted), ([first], [second]))
+
+    def test_known_files(self):
+        path = self.write("a.xlsx")
+        gone = os.path.join(self.directory, "b.xlsx")
+        outside = os.path.join(self.temporary.name, "c.xlsx")
+        self.watcher(state_path=None, known=[path, gone, outside]).scan()
+        self.assertEqual((self.changed, self.deleted), ([path], [gone]))
+
+
+if __name__ == '__main__':
+    unittest.main()